@@ -0,0 +1,73 @@
+# bench_letterbox.py
+"""
+블러 레터박스 필터 그래프 비교: 예전 그래프(입력 2번 참조, 원본 해상도 블러, fps는 마지막)
+vs 현재 _build_letterbox_filter (fps 먼저, split 1회 디코드, 축소 배경 블러).
+lavfi testsrc2(4:3, 60fps)를 입력으로 720p/1080p 목표에 대해 null 출력까지 돌리고
+출력 프레임 수 / 벽시계 시간(fps)과 부모+자식 CPU 시간을 잰다. 인코더는 빼고 필터만 비교한다.
+
+  python bench/bench_letterbox.py [--seconds 10] [--src 1440x1080] [--src-fps 60] [--repeat 3]
+"""
+import argparse, os, subprocess, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.env import get_ffmpeg_path  # noqa: E402
+from src.ffargs import _build_letterbox_filter  # noqa: E402
+
+RADIUS = 20
+BRIGHTNESS = 100
+OUT_FPS = 30
+
+def legacy_blur_filter(w: int, h: int, fps: float, radius: int = RADIUS) -> str:
+  """예전 블러 그래프 (비교용으로 그대로 보존)."""
+  return (
+    f'[0:v]scale={w}:{h}:force_original_aspect_ratio=increase,'
+    f'crop={w}:{h}:(iw-ow)/2:(ih-oh)/2,boxblur={radius}[lb_bg];'
+    f'[0:v]scale={w}:{h}:force_original_aspect_ratio=decrease[lb_fg];'
+    f'[lb_bg][lb_fg]overlay=(main_w-overlay_w)/2:(main_h-overlay_h)/2,'
+    f'setsar=1,fps={fps}[vout]'
+  )
+
+def current_blur_filter(w: int, h: int, fps: float, src_w: int, src_h: int) -> str:
+  state = {"width": w, "height": h, "source_width": src_w, "source_height": src_h,
+           "letterbox_mode": "blur", "letterbox_blur_radius": RADIUS, "letterbox_blur_brightness": BRIGHTNESS}
+  filter_type, expr, _ = _build_letterbox_filter(state, fps)
+  assert filter_type == "filter_complex", "source/target aspect must need a letterbox"
+  return expr
+
+def run(graph: str, args) -> tuple[float, float]:
+  """(벽시계 s, 자식 CPU s)"""
+  cmd = [get_ffmpeg_path(), "-hide_banner", "-nostats", "-loglevel", "error",
+         "-f", "lavfi", "-i", f"testsrc2=size={args.src}:rate={args.src_fps}:duration={args.seconds}",
+         "-filter_complex", graph, "-map", "[vout]", "-r", str(OUT_FPS), "-fps_mode", "cfr",
+         "-f", "null", os.devnull]
+  c0 = os.times()
+  t0 = time.perf_counter()
+  subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+  wall = time.perf_counter() - t0
+  c1 = os.times()
+  return wall, (c1.children_user - c0.children_user) + (c1.children_system - c0.children_system)
+
+def main() -> int:
+  ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  ap.add_argument("--seconds", type=float, default=10, help="synthetic input duration")
+  ap.add_argument("--src", default="1440x1080", help="synthetic input size (must differ in aspect from 16:9)")
+  ap.add_argument("--src-fps", type=int, default=60, help="synthetic input frame rate")
+  ap.add_argument("--repeat", type=int, default=3, help="runs per graph (best is reported)")
+  args = ap.parse_args()
+
+  src_w, src_h = map(int, args.src.lower().split("x"))
+  frames = int(args.seconds * OUT_FPS)
+  print(f"input testsrc2 {args.src}@{args.src_fps} {args.seconds:g}s → {frames} frames @ {OUT_FPS}fps, blur radius {RADIUS}")
+  print(f"{'target':<10} {'graph':<8} {'wall s':>7} {'cpu s':>7} {'fps':>8} {'speedup':>8}")
+  for w, h in ((1280, 720), (1920, 1080)):
+    base = None
+    for name, graph in (("legacy", legacy_blur_filter(w, h, OUT_FPS)),
+                        ("current", current_blur_filter(w, h, OUT_FPS, src_w, src_h))):
+      wall, cpu = min(run(graph, args) for _ in range(max(1, args.repeat)))
+      fps = frames / wall if wall > 0 else 0.0
+      base = base or fps
+      print(f"{f'{w}x{h}':<10} {name:<8} {wall:>7.2f} {cpu:>7.2f} {fps:>8.1f} {fps / base if base else 0:>7.2f}x")
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,105 @@
+# bench_supervisor.py
+"""
+프로세스 감독 방식 비교: Popen + 리더 스레드 2개(예전 방식) vs asyncio 감독자(src/supervisor.py).
+ffmpeg 대신 `-progress pipe:1` 출력을 흉내 내는 파이썬 자식을 1/8/32개 동시에 띄워
+벽시계 시간, 부모 프로세스 CPU 시간, 최대 스레드 수, 받은 진행 줄 수를 잰다.
+
+  python bench/bench_supervisor.py [--blocks 400] [--interval 0.002] [--counts 1,8,32]
+"""
+import argparse, os, re, subprocess, sys, threading, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import src.supervisor as supervisor  # noqa: E402
+
+CHILD = r"""
+import sys, time
+blocks, interval = int(sys.argv[1]), float(sys.argv[2])
+out, err = sys.stdout, sys.stderr
+for i in range(blocks):
+  t = i * 0.04
+  out.write(f"frame={i}\nfps=30.0\nstream_0_0_q=2.0\nbitrate=1150.0kbits/s\ntotal_size={i * 4096}\n"
+            f"out_time_us={int(t * 1e6)}\nout_time_ms={int(t * 1e6)}\n"
+            f"out_time=00:00:{t:09.6f}\ndup_frames=0\ndrop_frames=0\nspeed=1.0x\nprogress=continue\n")
+  out.flush()
+  if i % 20 == 0:
+    err.write(f"[mpeg @ 0x1] packet {i} queued\n"); err.flush()
+  time.sleep(interval)
+out.write("progress=end\n")
+"""
+
+PROG = re.compile(r"out_time=(\d+):(\d+):(\d+\.?\d*)")
+UNDERFLOW = re.compile(r"buffer underflow", re.IGNORECASE)
+
+class Counter:
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.progress = 0
+    self.lines = 0
+
+  def feed(self, s: str):
+    m = PROG.search(s)
+    UNDERFLOW.search(s)
+    with self.lock:
+      self.lines += 1
+      if m:
+        self.progress += 1
+
+def run_threads(cmds: list[list[str]], c: Counter) -> None:
+  """예전 방식: 프로세스마다 Popen + stdout/stderr 리더 스레드."""
+  procs, readers = [], []
+  for cmd in cmds:
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1, encoding="utf-8")
+    for stream in (proc.stdout, proc.stderr):
+      t = threading.Thread(target=lambda st=stream: [c.feed(line.strip()) for line in st], daemon=True)
+      t.start()
+      readers.append(t)
+    procs.append(proc)
+  for proc in procs:
+    proc.wait()
+  for t in readers:
+    t.join()
+
+def run_supervisor(cmds: list[list[str]], c: Counter) -> None:
+  handles = [supervisor.spawn(cmd, lambda stream, line: c.feed(line.strip())) for cmd in cmds]
+  for h in handles:
+    h.wait()
+
+def measure(fn, n: int, args) -> dict:
+  cmds = [[sys.executable, "-c", CHILD, str(args.blocks), str(args.interval)] for _ in range(n)]
+  c = Counter()
+  peak = threading.active_count()
+  stop = threading.Event()
+
+  def sampler():
+    nonlocal peak
+    while not stop.is_set():
+      peak = max(peak, threading.active_count())
+      time.sleep(0.005)
+
+  st = threading.Thread(target=sampler, daemon=True)
+  st.start()
+  cpu0, t0 = time.process_time(), time.perf_counter()
+  fn(cmds, c)
+  wall, cpu = time.perf_counter() - t0, time.process_time() - cpu0
+  stop.set()
+  st.join()
+  return {"wall": wall, "cpu": cpu, "threads": peak - 1, "progress": c.progress, "expected": n * args.blocks}
+
+def main() -> int:
+  ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  ap.add_argument("--blocks", type=int, default=400, help="progress blocks per child")
+  ap.add_argument("--interval", type=float, default=0.002, help="seconds between blocks")
+  ap.add_argument("--counts", default="1,8,32", help="concurrent process counts")
+  args = ap.parse_args()
+
+  supervisor.get_supervisor()  # 루프 스레드는 한 번만 뜬다 → 측정에서 제외
+  print(f"{'procs':>5}  {'model':<10} {'wall s':>7} {'cpu s':>7} {'threads':>7} {'progress':>11}")
+  for n in (int(x) for x in args.counts.split(",") if x.strip()):
+    for name, fn in (("threads", run_threads), ("supervisor", run_supervisor)):
+      r = measure(fn, n, args)
+      print(f"{n:>5}  {name:<10} {r['wall']:>7.2f} {r['cpu']:>7.2f} {r['threads']:>7} "
+            f"{r['progress']:>5}/{r['expected']:<5}")
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,116 @@
+# checkpoint.py
+"""
+구간 인코딩 체크포인트 (GUI 의존 없음).
+resume_root()/<키>/ 에 끝난 구간 ES와 journal.json을 둔다. 키는 입력 파일 지문 + 출력 파라미터
+(muxcache와 같은 기준)라서, 같은 설정으로 다시 돌리면 끝난 구간은 건너뛰고 나머지만 인코딩한다.
+작업이 성공하면 폴더를 지우고, 오래 방치된 폴더는 KEEP_DAYS 뒤에 정리한다.
+"""
+import json, os, shutil, threading, time
+from pathlib import Path
+
+from src.config import user_config_dir
+import src.muxcache as muxcache
+
+RESUME_DIRNAME = "resume"
+JOURNAL_NAME = "journal.json"
+CHECKPOINT_SEC = 60.0      # 체크포인트 구간 길이 목표 (병렬 수가 더 크면 그쪽을 따름)
+KEEP_DAYS = 7
+
+def resume_root(preferred: str | None = None) -> Path:
+  """
+  체크포인트 위치. 재부팅 뒤에도 이어서 해야 하므로 RAM(/dev/shm)이나 부팅 때 비우는 임시 폴더가 아닌
+  사용자 설정 폴더 아래 (작업 폴더를 직접 지정했으면 그 아래).
+  """
+  p = (Path(preferred) if preferred else user_config_dir()) / RESUME_DIRNAME
+  p.mkdir(parents=True, exist_ok=True)
+  return p
+
+def prune(root: Path, keep_days: float = KEEP_DAYS) -> None:
+  cutoff = time.time() - keep_days * 86400
+  try:
+    dirs = [d for d in root.iterdir() if d.is_dir()]
+  except OSError:
+    return
+  for d in dirs:
+    try:
+      j = d / JOURNAL_NAME
+      if (j.stat().st_mtime if j.exists() else d.stat().st_mtime) < cutoff:
+        shutil.rmtree(d, ignore_errors=True)
+    except OSError:
+      pass
+
+class Journal:
+  """구간 계획과 끝난 구간 목록. mark_done은 여러 인코딩 스레드에서 불린다."""
+
+  def __init__(self, path: Path, key: str):
+    self.dir = path
+    self.key = key
+    self.plan: list[tuple[int, int]] = []
+    self._done: dict[int, dict] = {}
+    self._lock = threading.Lock()
+    self._load()
+
+  def _load(self) -> None:
+    try:
+      data = json.loads((self.dir / JOURNAL_NAME).read_text("utf-8"))
+    except (OSError, ValueError):
+      return
+    if data.get("key") != self.key:
+      return
+    self.plan = [(int(a), int(b)) for a, b in data.get("plan", [])]
+    self._done = {int(i): e for i, e in (data.get("done") or {}).items()}
+
+  def _save(self) -> None:
+    # lock 보유 상태에서 호출. 임시 파일 + 교체로 중간에 죽어도 journal이 깨지지 않게
+    data = {"key": self.key, "plan": self.plan, "done": {str(i): e for i, e in self._done.items()},
+            "updated": time.time()}
+    tmp = self.dir / (JOURNAL_NAME + ".tmp")
+    tmp.write_text(json.dumps(data), "utf-8")
+    os.replace(tmp, self.dir / JOURNAL_NAME)
+
+  def start(self, plan: list[tuple[int, int]]) -> None:
+    """이번 실행의 계획. 저장된 계획과 다르면 끝난 구간 기록을 버린다."""
+    with self._lock:
+      plan = [(int(a), int(b)) for a, b in plan]
+      if plan != self.plan:
+        self.plan, self._done = plan, {}
+      self._save()
+
+  def part_path(self, idx: int) -> str:
+    return str(self.dir / f"seg{idx:03d}.m1v")
+
+  def is_done(self, idx: int) -> bool:
+    with self._lock:
+      e = self._done.get(idx)
+    if e is None:
+      return False
+    try:
+      return os.path.getsize(self.part_path(idx)) == int(e.get("size", -1))
+    except OSError:
+      return False
+
+  def mark_done(self, idx: int) -> None:
+    try:
+      size = os.path.getsize(self.part_path(idx))
+    except OSError:
+      return
+    with self._lock:
+      self._done[idx] = {"size": size, "at": time.time()}
+      self._save()
+
+  def discard(self) -> None:
+    shutil.rmtree(self.dir, ignore_errors=True)
+
+def open_journal(state) -> Journal | None:
+  """같은 입력 + 같은 출력 파라미터의 journal (없으면 새로). 입력을 읽을 수 없으면 None."""
+  key = muxcache.make_key(state)
+  if key is None:
+    return None
+  root = resume_root(state.get("scratch_dir") or None)
+  prune(root)
+  d = root / key[:32]
+  try:
+    d.mkdir(parents=True, exist_ok=True)
+  except OSError:
+    return None
+  return Journal(d, key)
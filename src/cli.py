@@ -0,0 +1,253 @@
+# cli.py
+"""
+헤드리스 일괄 변환 CLI (디스플레이 불필요).
+
+  python -m src.cli "songs/**/*.mp4" -o out -j 4 --width 256 --height 256
+  python -m src.cli "songs/**/*.mp4" -o out --also beatoraja     # 한 번 디코드로 MPEG-1 + H.264 720p
+
+진행 상황은 stdout에 JSON lines로 흘려보낸다:
+  {"event": "start" | "log" | "progress" | "status" | "mux" | "done" | "summary", "job": n, "input": ..., ...}
+-o를 쓰면 글롭 기준 폴더("songs/**/*.mp4"면 songs) 아래의 하위 폴더 구조를 출력 폴더에 그대로 만든다.
+출력 경로가 입력 파일이거나 서로 겹치면 변환 전에 "error" 이벤트(output_is_input / duplicate_output)를 내고 끝낸다.
+--also를 쓰면 done은 출력마다 하나씩 나오고 "target"(0 = 기본 출력)이 붙는다.
+--store를 쓰면 summary에 출력 저장소 누적 통계("store": 절약한 바이트/CPU 초 등)가 붙는다.
+"""
+import argparse, glob, itertools, json, os, sys, threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.engine import ConvertJob, ConvertOptions
+import src.outstore as outstore
+from src.mediainfo import media_info
+from src.multiout import MultiJob, OutputProfile, parse_profile, target_options
+
+def _glob_root(pat: str) -> str:
+  """패턴에서 와일드카드가 나오기 전까지의 폴더 ("songs/**/*.mp4" → songs)."""
+  parts = pat.replace("\\", "/").split("/")
+  fixed = list(itertools.takewhile(lambda s: not glob.has_magic(s), parts[:-1]))
+  root = os.sep.join(fixed) if fixed else "."
+  return os.path.abspath(root or os.sep)
+
+def _expand_inputs(patterns: list[str]) -> list[tuple[str, str]]:
+  """(입력 파일, 기준 폴더) 목록. 기준 폴더는 -o 아래에 하위 폴더 구조를 유지할 때 쓴다."""
+  out: list[tuple[str, str]] = []
+  seen: set[str] = set()
+  for pat in patterns:
+    magic = glob.has_magic(pat)
+    matches = sorted(glob.glob(pat, recursive=True)) if magic else [pat]
+    root = _glob_root(pat) if magic else None
+    for m in matches:
+      p = os.path.abspath(m)
+      # 명시한 경로는 없어도 넣어 둔다 → 엔진이 invalid_input으로 보고
+      if (os.path.isfile(p) or not magic) and p not in seen:
+        seen.add(p)
+        out.append((p, root or os.path.dirname(p)))
+  return out
+
+def _path_key(path: str) -> str:
+  return os.path.normcase(os.path.realpath(path))
+
+def _conflicts(plans: list[tuple[str, list[ConvertOptions]]]) -> list[dict]:
+  """출력 경로가 입력 파일이거나 다른 출력과 겹치는 경우 목록 (변환 전에 막는다)."""
+  inputs = {_path_key(path): path for path, _ in plans}
+  owners: dict[str, str] = {}
+  out: list[dict] = []
+  for path, targets in plans:
+    for opts in targets:
+      dst = opts.output_path()
+      key = _path_key(dst)
+      if key in inputs:
+        out.append({"input": path, "output": dst, "error": "output_is_input", "other": inputs[key]})
+      elif key in owners:
+        out.append({"input": path, "output": dst, "error": "duplicate_output", "other": owners[key]})
+      else:
+        owners[key] = path
+  return out
+
+def _parse_color(s: str) -> tuple[int, int, int]:
+  s = s.strip().lstrip("#")
+  if "," in s:
+    r, g, b = (int(v) for v in s.split(",", 2))
+  else:
+    r, g, b = int(s[0:2], 16), int(s[2:4], 16), int(s[4:6], 16)
+  return (r, g, b)
+
+def build_parser() -> argparse.ArgumentParser:
+  d = ConvertOptions()
+  ap = argparse.ArgumentParser(prog="python -m src.cli", description="LR2 BGA batch converter (headless)")
+  ap.add_argument("inputs", nargs="+", help="input files or glob patterns (** supported)")
+  ap.add_argument("-o", "--output-dir", default="", help="output folder (default: next to each input)")
+  ap.add_argument("-j", "--jobs", type=int, default=1, help="files converted concurrently")
+  ap.add_argument("--width", type=int, default=d.width)
+  ap.add_argument("--height", type=int, default=d.height)
+  ap.add_argument("--fps", type=int, default=None, help="output fps (default: locked 30)")
+  ap.add_argument("--bitrate", type=int, default=d.bitrate_k, help="video bitrate in k")
+  ap.add_argument("--buffer", type=int, default=None, help="VBV buffer in k (default: locked 2900)")
+  ap.add_argument("--codec", choices=("MPEG1", "H.264"), default=d.codec)
+  ap.add_argument("--mux", type=int, default=d.mux_k, help="start (or fixed, with --no-auto) muxrate in k")
+  ap.add_argument("--no-auto", action="store_true", help="use --mux as is, no MUX search")
+  ap.add_argument("--max-attempts", type=int, default=d.auto_max_attempts, help="MUX search attempts (0 = unlimited)")
+  ap.add_argument("--mux-jobs", type=int, default=d.mux_parallel_jobs, help="parallel MUX probes per file (0 = auto)")
+  ap.add_argument("--letterbox", choices=("black", "solid", "blur"), default=d.letterbox_mode)
+  ap.add_argument("--letterbox-color", type=_parse_color, default=d.letterbox_color, help="R,G,B or RRGGBB")
+  ap.add_argument("--blur-radius", type=int, default=d.letterbox_blur_radius)
+  ap.add_argument("--blur-brightness", type=int, default=d.letterbox_blur_brightness)
+  ap.add_argument("--no-cache", action="store_true", help="ignore and do not update the MUX cache")
+  ap.add_argument("--segment-jobs", type=int, default=d.segment_jobs,
+                  help="parallel chunk encodes for long inputs (0 = auto, 1 = off)")
+  ap.add_argument("--resume", action="store_true",
+                  help="encode long inputs in checkpointed chunks and keep finished ones so a re-run resumes")
+  ap.add_argument("--mezz-cache", action="store_true",
+                  help="cache filtered frames (FFV1) so re-runs with other bitrate/MUX/codec skip decode+filter")
+  ap.add_argument("--mezz-budget", type=int, default=d.mezzanine_budget_mb, help="filtered-frame cache size in MB")
+  ap.add_argument("--store", action="store_true",
+                  help="reuse finished outputs of identical inputs+settings (hardlink/reflink/copy) and keep new ones")
+  ap.add_argument("--store-budget", type=int, default=d.output_store_budget_mb, help="output store size in MB")
+  ap.add_argument("--store-dir", default="",
+                  help="output store folder (same drive as the outputs lets hits be hardlinks)")
+  ap.add_argument("--no-copy", action="store_true", help="always re-encode, even if the source already matches")
+  ap.add_argument("--also", action="append", type=parse_profile, default=[], metavar="PROFILE",
+                  help="extra output from the same decode: lr2, beatoraja or CODEC:SIZE[:BITRATE] "
+                       "(e.g. H.264:1080p:8000); repeatable")
+  ap.add_argument("--scratch-dir", default="", help="folder for probe files")
+  ap.add_argument("--quiet", action="store_true", help="emit only start/done/summary events")
+  return ap
+
+def options_for(path: str, args: argparse.Namespace, root: str | None = None) -> ConvertOptions:
+  """-o가 있으면 root(글롭 기준 폴더) 아래의 하위 폴더 구조를 출력 폴더에 그대로 만든다."""
+  info = media_info(path)
+  output_dir = os.path.dirname(path)
+  if args.output_dir:
+    rel = os.path.relpath(os.path.dirname(path), root or os.path.dirname(path))
+    output_dir = os.path.abspath(args.output_dir)
+    if rel != "." and not rel.startswith(".."):
+      output_dir = os.path.join(output_dir, rel)
+  return ConvertOptions(
+    input_path=path,
+    output_dir=output_dir,
+    output_name=os.path.splitext(os.path.basename(path))[0],
+    width=args.width,
+    height=args.height,
+    fps_locked=args.fps is None,
+    fps=args.fps if args.fps is not None else 30,
+    bitrate_k=args.bitrate,
+    buffer_locked=args.buffer is None,
+    buffer_k=args.buffer if args.buffer is not None else 2900,
+    mux_k=args.mux,
+    mux_auto=not args.no_auto,
+    codec=args.codec,
+    source_width=info.width,
+    source_height=info.height,
+    letterbox_mode=args.letterbox,
+    letterbox_color=args.letterbox_color,
+    letterbox_blur_radius=args.blur_radius,
+    letterbox_blur_brightness=args.blur_brightness,
+    auto_max_attempts=args.max_attempts,
+    mux_parallel_jobs=args.mux_jobs,
+    mux_cache=not args.no_cache,
+    stream_copy=not args.no_copy,
+    segment_jobs=args.segment_jobs,
+    resume_segments=args.resume,
+    mezzanine_cache=args.mezz_cache,
+    mezzanine_budget_mb=args.mezz_budget,
+    output_store=args.store,
+    output_store_budget_mb=args.store_budget,
+    output_store_dir=args.store_dir,
+    scratch_dir=args.scratch_dir,
+  )
+
+def main(argv: list[str] | None = None) -> int:
+  args = build_parser().parse_args(argv)
+  inputs = _expand_inputs(args.inputs)
+  out_lock = threading.Lock()
+
+  def emit(obj: dict):
+    line = json.dumps(obj, ensure_ascii=False)
+    with out_lock:
+      sys.stdout.write(line + "\n")
+      sys.stdout.flush()
+
+  if not inputs:
+    emit({"event": "summary", "total": 0, "ok": 0, "failed": 0, "error": "no inputs"})
+    return 2
+
+  def plan(item: tuple[str, str]) -> tuple[str, list[ConvertOptions]]:
+    path, root = item
+    options = options_for(path, args, root)
+    if args.also:
+      return path, target_options(options, [OutputProfile("main"), *args.also])
+    return path, [options]
+
+  pool = ThreadPoolExecutor(max_workers=max(1, args.jobs))
+  plans = list(pool.map(plan, inputs))
+  conflicts = _conflicts(plans)
+  if conflicts:
+    for c in conflicts:
+      emit({"event": "error", **c})
+    pool.shutdown(wait=True)
+    emit({"event": "summary", "total": len(inputs), "ok": 0, "failed": len(inputs), "error": "output path conflict"})
+    return 2
+  for _, targets in plans:
+    for opts in targets:
+      os.makedirs(opts.output_dir, exist_ok=True)
+
+  jobs: dict[int, ConvertJob | MultiJob] = {}
+  jobs_lock = threading.Lock()
+  stopping = threading.Event()
+
+  def run_one(idx: int, path: str, targets: list[ConvertOptions]) -> bool:
+    if stopping.is_set():
+      return False
+    last_pct = -1
+
+    def on_event(kind: str, **data):
+      nonlocal last_pct
+      if args.quiet:
+        return
+      if kind == "progress":
+        pct = int(data["frac"] * 100)
+        if pct == last_pct:
+          return
+        last_pct = pct
+      emit({"event": kind, "job": idx, "input": path, **data})
+
+    job = MultiJob(targets, on_event) if args.also else ConvertJob(targets[0], on_event)
+    with jobs_lock:
+      jobs[idx] = job
+    emit({"event": "start", "job": idx, "input": path})
+    try:
+      res = job.run()
+    finally:
+      with jobs_lock:
+        jobs.pop(idx, None)
+    if isinstance(res, list):
+      for target, r in enumerate(res):
+        emit({"event": "done", "job": idx, "target": target, **r.to_dict()})
+      return all(r.ok for r in res)
+    emit({"event": "done", "job": idx, **res.to_dict()})
+    return res.ok
+
+  results: list[bool] = []
+  try:
+    futs = [pool.submit(run_one, i, p, t) for i, (p, t) in enumerate(plans)]
+    for f in futs:
+      results.append(f.result())
+  except KeyboardInterrupt:
+    stopping.set()
+    with jobs_lock:
+      running = list(jobs.values())
+    for job in running:
+      job.cancel()
+    pool.shutdown(wait=True, cancel_futures=True)
+    emit({"event": "summary", "total": len(inputs), "ok": sum(results), "failed": len(inputs) - sum(results),
+          "cancelled": True})
+    return 130
+  pool.shutdown(wait=True)
+  ok = sum(results)
+  summary = {"event": "summary", "total": len(inputs), "ok": ok, "failed": len(inputs) - ok}
+  if args.store:
+    summary["store"] = outstore.stats()
+  emit(summary)
+  return 0 if ok == len(inputs) else 1
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,92 @@
+# command.py
+"""
+설정 상태 → ffmpeg 명령 공유 모델 (GUI 의존 없음).
+인자 벡터(argv), 미리보기 텍스트, 예상 출력 크기를 build_ffmpeg_args 하나에서 만들고,
+각 값은 의존하는 상태 키의 version이 바뀔 때만 다시 계산한다.
+"""
+import os
+from typing import Any, Callable
+
+from src.ffargs import build_ffmpeg_args
+from src.mediainfo import media_info
+
+# build_ffmpeg_args / _build_letterbox_filter가 읽는 키
+ARGV_KEYS = (
+  "input_path", "output_dir", "output_name", "width", "height", "fps_locked", "fps",
+  "bitrate_k", "buffer_locked", "buffer_k", "mux_k", "codec", "source_width", "source_height",
+  "letterbox_mode", "letterbox_color", "letterbox_blur_radius", "letterbox_blur_brightness",
+)
+SIZE_KEYS = ("input_path", "bitrate_k")
+
+class Memo:
+  """state.versions(keys)가 같으면 이전 값을 그대로 돌려준다."""
+
+  def __init__(self, state, keys: tuple[str, ...], fn: Callable[[], Any]):
+    self.state = state
+    self.keys = keys
+    self.fn = fn
+    self._ver: tuple | None = None
+    self._value: Any = None
+
+  def get(self) -> Any:
+    ver = self.state.versions(self.keys)
+    if ver != self._ver:
+      # 버전을 먼저 잡는다: 계산 중에 바뀌면 다음 get에서 다시 계산
+      self._value = self.fn()
+      self._ver = ver
+    return self._value
+
+# 미리보기에서 줄을 바꾸는 옵션 / 값을 따옴표로 감싸는 옵션
+_BREAK_BEFORE = {"-i", "-filter:v", "-filter_complex", "-map", "-r", "-c:v", "-g", "-b:v", "-movflags", "-muxrate"}
+_QUOTE_VALUE = {"-i", "-filter:v", "-filter_complex"}
+
+def format_preview(argv: list[str], *, input_label: str | None = None, output_label: str | None = None) -> str:
+  """argv → 사람이 읽는 여러 줄 명령 (줄 끝 `\\`). 입력/출력 자리는 label로 바꿔 보여줄 수 있다."""
+  if not argv:
+    return ""
+  *opts, out = argv[1:]
+  lines: list[list[str]] = [[os.path.basename(argv[0])]]
+  prev = ""
+  for tok in opts:
+    if tok in _BREAK_BEFORE or (tok == "-an" and lines[-1][0] == "-movflags"):
+      lines.append([])
+    shown = tok
+    if prev in _QUOTE_VALUE:
+      shown = f'"{input_label if prev == "-i" and input_label is not None else tok}"'
+    lines[-1].append(shown)
+    prev = tok
+  lines.append([f'"{output_label if output_label is not None else out}"'])
+  return " \\\n  ".join(" ".join(line) for line in lines)
+
+class CommandModel:
+  def __init__(self, state):
+    self.state = state
+    self._argv = Memo(state, ARGV_KEYS, lambda: build_ffmpeg_args(state))
+    self._preview = Memo(state, ARGV_KEYS, self._render_preview)
+    self._size = Memo(state, SIZE_KEYS, self._estimate_size)
+
+  def argv(self) -> list[str]:
+    return list(self._argv.get())
+
+  def preview(self) -> str:
+    return self._preview.get()
+
+  def estimated_size_bytes(self) -> int | None:
+    return self._size.get()
+
+  def _render_preview(self) -> str:
+    st = self.state
+    out_label = None
+    if not st["output_dir"]:
+      ext = "mp4" if st.get("codec") == "H.264" else "mpg"
+      out_label = os.path.join("<out_dir>", f"{st['output_name'] or 'output'}.{ext}")
+    return format_preview(self._argv.get(), input_label=None if st["input_path"] else "<input>",
+                          output_label=out_label)
+
+  def _estimate_size(self) -> int | None:
+    st = self.state
+    dur = media_info(st.get("input_path", "")).duration
+    if not dur or dur <= 0:
+      return None
+    # ffmpeg의 k는 1000 기준
+    return max(0, int((int(st.get("bitrate_k", 0)) * 1000 / 8.0) * dur))
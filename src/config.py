@@ -1,5 +1,5 @@
 # config.py
-import json, os
+import json, os, shutil, tempfile
 from pathlib import Path
 from src.env import IS_WINDOWS, IS_MAC
 
@@ -19,6 +19,30 @@ def user_config_dir() -> Path:
 
 CFG = user_config_dir() / "config.json"
 
+def scratch_dir(preferred: str | None = None, need_bytes: int = 0) -> Path:
+  """
+  프로브/중간 파일용 작업 폴더 (출력 폴더가 NAS여도 여기만 사용).
+  지정값 → (Linux) /dev/shm tmpfs → 시스템 임시 폴더 순.
+  need_bytes가 있으면 남은 용량이 그보다 적은 후보는 건너뛴다 (컨테이너의 작은 tmpfs 등).
+  """
+  cands: list[Path] = []
+  if preferred:
+    cands.append(Path(preferred))
+  if not IS_WINDOWS and not IS_MAC and os.path.isdir("/dev/shm"):
+    cands.append(Path("/dev/shm") / "lr2bga")
+  cands.append(Path(tempfile.gettempdir()) / "lr2bga")
+  for c in cands:
+    try:
+      c.mkdir(parents=True, exist_ok=True)
+      if not os.access(c, os.W_OK):
+        continue
+      if need_bytes > 0 and c is not cands[-1] and shutil.disk_usage(c).free < need_bytes:
+        continue
+      return c
+    except OSError:
+      continue
+  return Path(tempfile.gettempdir())
+
 def load_cfg() -> dict:
   try:
     return json.loads(CFG.read_text("utf-8")) if CFG.exists() else {}
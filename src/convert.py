@@ -1,248 +1,72 @@
 # convert.py
+"""GUI 어댑터: 변환 엔진(engine.ConvertJob)을 DearPyGui 상태/위젯과 연결한다."""
 import dearpygui.dearpygui as dpg
-import os, tempfile, re, subprocess, threading, signal
+import os, re, threading
 
 from src.env import IS_WINDOWS, get_ffmpeg_path, get_ffprobe_path
 from src.states import global_state
-from src.cmdline import build_ffmpeg_args, ffprobe_duration_sec, quant50_up, \
-     update_command
-
+from src.engine import ConvertJob, ConvertOptions, ConvertResult, safe_remove, _terminate_proc
+from src.multiout import MultiJob, OutputProfile, parse_profiles, target_options
+from src.mediainfo import media_info
+from src.progress import ProgressParser, ProgressThrottle
+import src.supervisor as supervisor
+from src.supervisor import ProcHandle
 import src.ui_map as ui_map
-from src.util import bytes_to_human, nfc
+import src.ui_dispatch as ui_dispatch
+from src.util import bytes_to_human
 
 # ★ 모듈 전역 상태 (여기에서 선언)
-current_proc = None
+current_job: ConvertJob | MultiJob | None = None
+current_proc = None           # 직접 명령 실행(run_convert_custom)용
 cancel_requested = False
-probe_paths: set[str] = set()
 current_outpath: str = ""
 encoding_active = False
 
-def make_temp_outpath(base_dir: str | None, outname: str, mux_k: int, ext: str) -> str:
-  suffix = f".{outname}.probe_mux{mux_k}.tmp.{ext}"
-  if base_dir and os.path.isdir(base_dir):
-    return os.path.join(base_dir, suffix)
-  return os.path.join(tempfile.gettempdir(), suffix)
-
-def safe_remove(path: str):
-  try:
-    if path and os.path.exists(path):
-      os.remove(path)
-  except Exception:
-    pass
-
-def ffmpeg_attempt_mux(mux_k: int, itr: int, *, final_output: bool) -> tuple[bool, bool, str]:
-  global current_proc, current_outpath, probe_paths
-
-  inpath = global_state["input_path"]
-  outdir = global_state["output_dir"]
-  outname = global_state["output_name"] or "output"
-  codec = global_state.get("codec", "MPEG1")
-  use_h264 = (codec == "H.264")
-  ext = "mp4" if use_h264 else "mpg"
-
-  outpath = os.path.join(outdir if outdir else ".", f"{outname}.{ext}") if final_output \
-            else make_temp_outpath(outdir, outname, mux_k, ext)
-
-  args = build_ffmpeg_args(override_mux_k=mux_k, override_outpath=outpath)
-  dur = ffprobe_duration_sec(inpath)
-
-  base_args = args.copy()
-  if "-f" in base_args:
-    f_idx = base_args.index("-f")
-    cmd2 = base_args[:f_idx] + ["-progress", "pipe:1", "-nostats"] + base_args[f_idx:]
-  else:
-    cmd2 = base_args[:-1] + ["-progress", "pipe:1", "-nostats", base_args[-1]]
-
-  if not final_output:
-    if not use_h264:
-      ui_map.log_append(f"[TRY] MUX={quant50_up(mux_k)}k")
-      ui_map.set_service_msg("msg.searching_mux", itr=itr, mux=mux_k)
-  else:
-    if use_h264:
-      ui_map.log_append("[OUTPUT] Codec=H.264")
-    else:
-      ui_map.log_append(f"[OUTPUT] MUX={quant50_up(mux_k)}k")
-    ui_map.set_service_msg("msg.working")
-
-  if not use_h264 and dpg.does_item_exist("mux_input"):
+def _ui_event(kind: str, **data):
+  """엔진 이벤트 → ui_map / 위젯."""
+  if kind == "log":
+    ui_map.log_append(data["msg"])
+  elif kind == "progress":
+    ui_map.set_progress(data["frac"])
+  elif kind == "status":
+    ui_map.set_service_msg(data["key"], **data.get("fmt", {}))
+  elif kind == "mux":
+    ui_dispatch.post(_set_mux_input, int(data["mux_k"]), key="mux_input")
+
+def _set_mux_input(mux_k: int):
+  if dpg.does_item_exist("mux_input"):
     dpg.set_value("mux_input", mux_k)
-  ui_map.set_progress(0.0)
-
-  if cancel_requested:
-    safe_remove(outpath)
-    return (False, False, outpath)
-
-  prog_regex = re.compile(r"out_time=(\d+):(\d+):(\d+\.?\d*)")
-  underflow_regex = re.compile(r"buffer underflow", re.IGNORECASE)
 
-  current_outpath = outpath
-  if not final_output and not use_h264:
-    probe_paths.add(outpath)
-
-  proc = subprocess.Popen(cmd2, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1, shell=False, encoding="utf-8")
-  current_proc = proc
-  underflow_hit = False
-
-  def reader_stdout():
-    nonlocal underflow_hit
-    for line in proc.stdout:  # type: ignore
-      if cancel_requested:
-        try: proc.terminate()
-        except Exception: pass
-        break
-      s = line.strip()
-      m = prog_regex.search(s)
-      if m:
-        hh, mm, ss = m.groups()
-        secs = int(hh) * 3600 + int(mm) * 60 + float(ss)
-        if dur > 0:
-          ui_map.set_progress(min(1.0, secs / dur))
-      if underflow_regex.search(s) and not underflow_hit:
-        underflow_hit = True
-        try: proc.terminate()
-        except Exception: pass
-        ui_map.log_append(f"  [WARN] {s}")
-        break
-
-  def reader_stderr():
-    nonlocal underflow_hit
-    for line in proc.stderr:  # type: ignore
-      if cancel_requested:
-        try: proc.terminate()
-        except Exception: pass
-        break
-      s = line.rstrip()
-      if underflow_regex.search(s) and not underflow_hit:
-        underflow_hit = True
-        try: proc.terminate()
-        except Exception: pass
-        ui_map.log_append(f"  [WARN] {s}")
-        break
-
-  t1 = threading.Thread(target=reader_stdout, daemon=True)
-  t2 = threading.Thread(target=reader_stderr, daemon=True)
-  t1.start(); t2.start()
-  code = proc.wait()
-  t1.join(); t2.join()
-  # current_proc 해제는 cancel에서 kill 할 수 있으니 여기선 그대로 두거나 None 처리
-  # current_proc = None
-
-  if cancel_requested:
-    safe_remove(outpath)
-    ui_map.log_append("  [CANCEL] Cancelled by user")
-    return (False, False, outpath)
-
-  if underflow_hit:
-    safe_remove(outpath)
-    ui_map.log_append("  [ABORT] buffer underflow → stop & removed temp files")
-    return (False, True, outpath)
-
-  ui_map.set_progress(1.0)
-  if code == 0:
-    ui_map.log_append("  [OK] Done ffmpeg (No underflow)")
-    return (True, False, outpath)
-  else:
-    safe_remove(outpath)
-    ui_map.log_append(f"  [ERROR] ffmpeg exit code: {code}")
-    return (False, False, outpath)
-
-def find_min_safe_mux(start_mux_k: int, *, max_mux_k: int = 20000, max_attempts: int = 12) -> int | None:
-  if global_state.get("codec", "MPEG1") == "H.264":
-    return None
-  start_mux_k = quant50_up(int(start_mux_k))
-  attempts = 0
-  unlimited = (max_attempts is None) or (int(max_attempts) <= 0)
-
-  def can_try() -> bool:
-    return unlimited or (attempts < max_attempts)
-
-  if cancel_requested:
-    return None
-
-  if not can_try():
-    return None
-  ok, uf, _ = ffmpeg_attempt_mux(start_mux_k, attempts+1, final_output=False)
-  attempts += 1
-  if cancel_requested:
-    return None
-
-  if ok and not uf:
-    low_unsafe = 0
-    high_safe = start_mux_k
-  else:
-    low_unsafe = start_mux_k
-    step = 50
-    cur = start_mux_k + step
-    high_safe = None
-    while can_try() and cur <= max_mux_k:
-      if cancel_requested:
-        return None
-      ok, uf, _ = ffmpeg_attempt_mux(cur, attempts+1, final_output=False)
-      attempts += 1
-      if ok and not uf:
-        high_safe = cur
-        break
-      low_unsafe = cur
-      step *= 2
-      cur = quant50_up(cur + step)
-    if high_safe is None:
-      ui_map.log_append("[FAIL] 안전 상한을 찾지 못함 (max_mux_k 초과)")
-      return None
-
-  while can_try() and (high_safe - low_unsafe) > 50:
-    if cancel_requested:
-      return None
-    mid = quant50_up((low_unsafe + high_safe) // 2)
-    if mid == high_safe or mid == low_unsafe:
-      break
-    ok, uf, _ = ffmpeg_attempt_mux(mid, attempts+1, final_output=False)
-    attempts += 1
-    if ok and not uf:
-      high_safe = mid
-    else:
-      low_unsafe = mid
-
-  return high_safe
-
-def _terminate_proc(proc):
-  if not proc:
+def _report_result(res: ConvertResult):
+  if res.cancelled:
     return
-  try:
-    if IS_WINDOWS:
-      proc.terminate()
+  if res.underflow:
+    ui_map.set_service_msg("msg.fail_underflow")
+  elif not res.ok:
+    if res.error in ("invalid_input", "invalid_output"):
+      ui_map.set_service_msg("msg.invalid_input")
     else:
-      proc.send_signal(signal.SIGTERM)
-  except Exception:
-    try:
-      proc.terminate()
-    except Exception:
-      pass
-  try:
-    proc.wait(timeout=1.5)
-  except Exception:
-    try:
-      proc.kill()
-    except Exception:
-      pass
+      ui_map.set_service_msg("msg.fail")
+  elif res.output_path and os.path.exists(res.output_path):
+    ui_map.set_service_msg("msg.done", size=(bytes_to_human, res.size_bytes))
+  else:
+    ui_map.set_service_msg("msg.done_nofs")
 
 def cancel_encoding(sender=None, app_data=None, user_data=None):
-  global cancel_requested, current_outpath, probe_paths, current_proc
+  global cancel_requested
   cancel_requested = True
   ui_map.set_service_msg("msg.cancel_requested")
+  job = current_job
+  if job is not None:
+    job.cancel()
   _terminate_proc(current_proc)
-  try:
-    if current_outpath:
-      safe_remove(current_outpath)
-    for p in list(probe_paths):
-      safe_remove(p)
-      probe_paths.discard(p)
-  except Exception:
-    pass
+  if current_outpath:
+    safe_remove(current_outpath)
   ui_map.set_convert_buttons_active(False)
   ui_map.log_append("[CANCEL] Cancelled by user")
 
 def run_convert():
-  ui_map.log_clear()
+  ui_map.log_clear(global_state.get("output_name") or "convert")
   if not global_state["input_path"] or not os.path.exists(global_state["input_path"]):
     ui_map.log_append("[ERROR] Invalid input file path!")
     ui_map.set_service_msg("msg.invalid_input")
@@ -252,107 +76,47 @@ def run_convert():
     ui_map.set_service_msg("msg.invalid_input")
     return
 
+  auto = bool(dpg.get_value("mux_auto_chk")) if dpg.does_item_exist("mux_auto_chk") else bool(global_state.get("mux_auto", True))
+  options = ConvertOptions.from_state(global_state, mux_auto=auto)
+  try:
+    extra = parse_profiles(global_state.get("extra_outputs", ""))
+  except ValueError as e:
+    ui_map.log_append(f"[ERROR] {e}")
+    ui_map.set_service_msg("msg.fail")
+    return
+  if extra:
+    # 같은 디코드로 여러 출력: 첫 출력은 지금 화면의 설정 그대로
+    job = MultiJob(target_options(options, [OutputProfile("main"), *extra]), on_event=_ui_event)
+  else:
+    job = ConvertJob(options, on_event=_ui_event)
+
   def worker():
-    global cancel_requested, probe_paths, current_outpath, encoding_active
+    global current_job, cancel_requested, current_outpath, encoding_active
     cancel_requested = False
-    probe_paths = set()
     current_outpath = ""
+    current_job = job
     encoding_active = True
     ui_map.set_convert_buttons_active(True)
-
     try:
-      codec = global_state.get("codec", "MPEG1")
-      use_h264 = (codec == "H.264")
-      mux_value = int(global_state.get("mux_k", 0))
-      start_mux = quant50_up(mux_value) if not use_h264 else mux_value
-      auto = bool(dpg.get_value("mux_auto_chk")) if dpg.does_item_exist("mux_auto_chk") else bool(global_state.get("mux_auto", True))
-      auto = auto and not use_h264
-      max_mux_k = quant50_up(int(global_state.get("bitrate_k", 0)) * 4) if not use_h264 else 0
-      max_attempts = int(global_state.get("auto_max_attempts", 0))
-
-      if use_h264:
-        update_command()
-        ui_map.log_append("[FINAL] Generating file with codec H.264")
-        ok, uf, outpath = ffmpeg_attempt_mux(start_mux, 0, final_output=True)
-        if cancel_requested:
-          return
-        if uf:
-          ui_map.set_service_msg("msg.fail_underflow")
-          ui_map.log_append("[FAIL] Underflow occurred!")
-        elif not ok:
-          ui_map.set_service_msg("msg.fail")
-          ui_map.log_append("[FAIL] Failed to generate file")
-        else:
-          try:
-            size_bytes = os.path.getsize(outpath) if outpath and os.path.exists(outpath) else 0
-            ui_map.set_service_msg("msg.done", size=(bytes_to_human, size_bytes))
-          except Exception:
-            ui_map.set_service_msg("msg.done_nofs")
-          ui_map.log_append("[DONE] Successfully generated file")
-
-      elif auto:
-        best = find_min_safe_mux(start_mux_k=start_mux, max_mux_k=max_mux_k, max_attempts=max_attempts)
-        if cancel_requested:
-          return
-        if best is None:
-          return
-
-        global_state["mux_k"] = best
-        if dpg.does_item_exist("mux_input"):
-          dpg.set_value("mux_input", int(best))
-        update_command()
-
-        ui_map.log_append(f"[FINAL] Generating file with final safe MUX={best}k")
-        ok, uf, outpath = ffmpeg_attempt_mux(best, 0, final_output=True)
-        if cancel_requested:
-          return
-        if uf:
-          ui_map.set_service_msg("msg.fail_underflow")
-          ui_map.log_append("[FAIL] Underflow occurred!")
-        elif not ok:
-          ui_map.set_service_msg("msg.fail")
-          ui_map.log_append("[FAIL] Failed to generate file")
-        else:
-          try:
-            size_bytes = os.path.getsize(outpath) if outpath and os.path.exists(outpath) else 0
-            # dpg.set_value("service_msg_text", f"변환 완료! (최종 파일 사이즈: {human})")
-            ui_map.set_service_msg("msg.done", size=(bytes_to_human, size_bytes))
-          except Exception:
-            ui_map.set_service_msg("msg.done_nofs")
-          ui_map.log_append("[DONE] Successfully generated file")
+      if isinstance(job, MultiJob):
+        results = job.run()
+        res = next((r for r in results if not r.ok), results[0])
       else:
-        update_command()
-        ui_map.log_append(f"[FINAL] Generating file with user defined MUX={start_mux}k")
-        ok, uf, outpath = ffmpeg_attempt_mux(start_mux, 0, final_output=True)
-        if cancel_requested:
-          return
-        if uf:
-          ui_map.set_service_msg("msg.fail_underflow")
-          ui_map.log_append("[FAIL] Underflow occurred!")
-        elif not ok:
-          ui_map.set_service_msg("msg.fail")
-          ui_map.log_append("[FAIL] Failed to generate file")
-        else:
-          try:
-            size_bytes = os.path.getsize(outpath) if outpath and os.path.exists(outpath) else 0
-            human = bytes_to_human(size_bytes)
-            ui_map.set_service_msg("msg.done", size=(bytes_to_human, size_bytes))
-          except Exception:
-            ui_map.set_service_msg("msg.done_nofs")
-          ui_map.log_append("[DONE] Successfully generated file")
+        res = job.run()
+      if res.mux_k is not None and options.mux_auto and not options.use_h264:
+        global_state["mux_k"] = res.mux_k   # 구독 중인 미리보기는 다음 프레임에 갱신
+      _report_result(res)
     except Exception as e:
       ui_map.log_append(f"[EXC] {e}")
     finally:
-      for p in list(probe_paths):
-        safe_remove(p)
-        probe_paths.discard(p)
+      current_job = None
       encoding_active = False
       ui_map.set_convert_buttons_active(False)
 
   threading.Thread(target=worker, daemon=True).start()
 
 def run_convert_custom():
-  ui_map.log_clear()
+  ui_map.log_clear("custom")
   if not dpg.does_item_exist("cmd_preview"):
     ui_map.log_append("[ERROR] No cmd_preview")
     return
@@ -363,9 +127,8 @@ def run_convert_custom():
   
   def worker():
     import shlex
-    global cancel_requested, current_proc, current_outpath, probe_paths, encoding_active
+    global cancel_requested, current_proc, current_outpath, encoding_active
     cancel_requested = False
-    probe_paths = set()
     current_outpath = ""
     encoding_active = True
     ui_map.set_convert_buttons_active(True)
@@ -414,57 +177,41 @@ def run_convert_custom():
       except Exception:
         pass
       current_outpath = outpath
-      dur = ffprobe_duration_sec(inputs[0]) if inputs else 0.0
+      dur = media_info(inputs[0]).duration if inputs else 0.0
 
       ui_map.log_append("[INFO] Executing custom command")
       ui_map.log_append(">> " + " ".join(args))
       ui_map.set_service_msg("msg.direct_running")
 
-      prog_regex = re.compile(r"out_time=(\d+):(\d+):(\d+\.?\d*)")
       underflow_regex = re.compile(r"buffer underflow", re.IGNORECASE)
 
-      proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1, encoding="utf-8", shell=False)
-      current_proc = proc
       underflow_hit = False
+      proc = ProcHandle(args)
 
-      def reader_stdout():
+      def on_line(stream: str, line: str):
         nonlocal underflow_hit
-        for line in proc.stdout:  # type: ignore
-          if cancel_requested:
-            try: proc.terminate()
-            except Exception: pass
-            break
-          s = (line or "").strip()
-          m = prog_regex.search(s)
-          if m and dur > 0:
-            hh, mm, ss = m.groups()
-            secs = int(hh) * 3600 + int(mm) * 60 + float(ss)
-            ui_map.set_progress(min(1.0, secs / dur))
-          if underflow_regex.search(s):
-            underflow_hit = True
-            ui_map.log_append(f"[WARN] {s}")
-          else:
-            ui_map.log_append(f"  [*] {s}")
-
-      def reader_stderr():
-        nonlocal underflow_hit
-        for line in proc.stderr:  # type: ignore
-          if cancel_requested:
-            try: proc.terminate()
-            except Exception: pass
-            break
-          s = (line or "").rstrip()
-          if underflow_regex.search(s):
-            underflow_hit = True
-            ui_map.log_append(f"[WARN] {s}")
-          else:
-            ui_map.log_append(f"  [*] {s}")
-
-      t1 = threading.Thread(target=reader_stdout, daemon=True)
-      t2 = threading.Thread(target=reader_stderr, daemon=True)
-      t1.start(); t2.start()
+        if cancel_requested:
+          return
+        s = line.strip() if stream == "stdout" else line.rstrip()
+        if underflow_regex.search(s):
+          underflow_hit = True
+          ui_map.log_append(f"[WARN] {s}")
+        else:
+          ui_map.log_append(f"  [*] {s}")
+
+      pi = args.index("-progress") if is_ffmpeg and "-progress" in args else -1
+      if 0 <= pi < len(args) - 1 and args[pi + 1] == "pipe:1":
+        # stdout은 -progress 블록 → 파싱해서 진행률만 (초당 최대 10번), 로그에는 stderr만
+        throttle = ProgressThrottle(lambda snap: ui_map.set_progress(snap.fraction(dur)))
+        parser = ProgressParser(lambda snap: None if cancel_requested or dur <= 0 else throttle.push(snap))
+        proc.subscribe_raw(lambda stream, data: parser.feed(data), streams=("stdout",))
+        proc.subscribe(on_line, streams=("stderr",))
+      else:
+        proc.subscribe(on_line)
+      current_proc = supervisor.start(proc)
+      if cancel_requested:
+        _terminate_proc(proc)
       code = proc.wait()
-      t1.join(); t2.join()
 
       if cancel_requested:
         if current_outpath:
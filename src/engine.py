@@ -0,0 +1,1186 @@
+# engine.py
+"""
+변환 엔진 (GUI 의존 없음: dearpygui/tkinter를 import하지 않는다).
+ConvertOptions로 작업을 받아 ConvertJob.run()이 ConvertResult를 돌려준다.
+진행 상황은 on_event(kind, **data) 콜백으로만 알린다:
+  log(msg) / progress(frac[, speed]) / status(key, fmt) / mux(mux_k)
+  (ffmpeg 진행률은 -progress 블록 단위로 파싱해 초당 최대 10번만 보낸다)
+"""
+import math, os, tempfile, re, threading, shutil, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields, asdict
+from typing import Any, Callable
+
+from src.config import scratch_dir
+from src.ffargs import build_ffmpeg_args, build_remux_args, quant50_up, stream_copy_check, COPY_CODECS, \
+     _build_letterbox_filter
+from src.mediainfo import media_info
+from src.muxsolve import solve_min_mux_k
+from src.peakscan import scan_packets, densest_windows
+from src.segments import segment_jobs, plan_segments, join_elementary
+import src.checkpoint as checkpoint
+import src.mezzanine as mezzanine
+import src.outstore as outstore
+from src.progress import ProgressParser, ProgressSnapshot, ProgressThrottle
+import src.supervisor as supervisor
+from src.supervisor import ProcHandle
+import src.muxcache as muxcache
+import src.muxmodel as muxmodel
+from src.util import bytes_to_human
+
+EventFn = Callable[..., None]
+
+@dataclass
+class ConvertOptions:
+  """작업 하나의 설정. 키 이름은 global_state와 같다 (ffargs 빌더에 그대로 넘김)."""
+  input_path: str = ""
+  output_dir: str = ""
+  output_name: str = ""
+  width: int = 512
+  height: int = 512
+  fps_locked: bool = True
+  fps: int = 30
+  bitrate_k: int = 1600
+  buffer_locked: bool = True
+  buffer_k: int = 2900
+  mux_k: int = 2100
+  mux_auto: bool = True
+  codec: str = "MPEG1"
+  source_width: int = 0
+  source_height: int = 0
+  letterbox_mode: str = "black"
+  letterbox_color: tuple = (255, 255, 255)
+  letterbox_blur_radius: int = 20
+  letterbox_blur_brightness: int = 100
+  auto_max_attempts: int = 0
+  mux_probe_remux: bool = True
+  mux_promote_probe: bool = True
+  mux_parallel_jobs: int = 0
+  mux_solver: bool = True
+  mux_cache: bool = True
+  mux_warm_start: bool = True
+  scratch_dir: str = ""
+  mux_window_probe: bool = True
+  mux_window_sec: float = 10
+  mux_window_count: int = 1
+  stream_copy: bool = True   # 원본이 이미 목표 규격이면 재인코딩 없이 다시 담기만
+  segment_jobs: int = 0      # ES 구간 병렬 인코딩 프로세스 수 (0 = 자동, 1 = 끔)
+  segment_min_sec: float = 120   # 이보다 긴 입력만 구간으로 나눈다
+  resume_segments: bool = False  # 끝난 구간을 체크포인트로 남겨 다음 실행에서 이어서 인코딩 (켜면 긴 입력은 항상 구간 인코딩)
+  mezzanine_cache: bool = False  # 필터 결과(FFV1)를 캐시해 화면 설정이 같은 재실행은 디코드/필터 생략
+  mezzanine_budget_mb: int = mezzanine.DEFAULT_BUDGET_MB
+  mezzanine_dir: str = ""
+  output_store: bool = False     # 완성된 출력을 내용 주소 저장소에 두고, 같은 입력 내용 + 같은 설정이면 링크/복사로 재사용
+  output_store_budget_mb: int = outstore.DEFAULT_BUDGET_MB
+  output_store_dir: str = ""
+
+  @classmethod
+  def from_state(cls, state: dict, **overrides) -> "ConvertOptions":
+    """global_state(또는 같은 키를 가진 dict)의 스냅샷."""
+    names = {f.name for f in fields(cls)}
+    kw = {k: v for k, v in state.items() if k in names}
+    kw.update(overrides)
+    return cls(**kw)
+
+  def as_state(self) -> dict:
+    return asdict(self)
+
+  @property
+  def use_h264(self) -> bool:
+    return self.codec == "H.264"
+
+  def output_path(self) -> str:
+    ext = "mp4" if self.use_h264 else "mpg"
+    return os.path.join(self.output_dir if self.output_dir else ".", f"{self.output_name or 'output'}.{ext}")
+
+@dataclass
+class ConvertResult:
+  input_path: str
+  output_path: str = ""
+  ok: bool = False
+  mux_k: int | None = None
+  attempts: list[tuple[int, bool]] = field(default_factory=list)   # MUX 탐색 (mux_k, 안전 여부)
+  timings: dict[str, float] = field(default_factory=dict)          # 단계별 소요 초
+  size_bytes: int = 0
+  underflow: bool = False
+  cancelled: bool = False
+  cache_hit: bool = False
+  stream_copy: bool = False     # 재인코딩 없이 원본 스트림을 그대로 사용했는지
+  store_hit: bool = False       # 출력 저장소에서 가져왔는지 (인코딩 없음)
+  cpu_seconds: float = 0.0      # 이 작업의 ffmpeg CPU 시간 합 (user + sys)
+  error: str = ""
+
+  def to_dict(self) -> dict[str, Any]:
+    return asdict(self)
+
+# ---------------- 파일/프로세스 헬퍼 ----------------
+
+def make_temp_outpath(base_dir: str | None, outname: str, mux_k: int, ext: str) -> str:
+  suffix = f".{outname}.probe_mux{mux_k}.tmp.{ext}"
+  if base_dir and os.path.isdir(base_dir):
+    return os.path.join(base_dir, suffix)
+  return os.path.join(tempfile.gettempdir(), suffix)
+
+def make_temp_es_path(base_dir: str | None, outname: str) -> str:
+  suffix = f".{outname}.probe_es.tmp.m1v"
+  if base_dir and os.path.isdir(base_dir):
+    return os.path.join(base_dir, suffix)
+  return os.path.join(tempfile.gettempdir(), suffix)
+
+def safe_remove(path: str):
+  try:
+    if path and path != os.devnull and os.path.exists(path):
+      os.remove(path)
+  except Exception:
+    pass
+
+def _with_progress(args: list[str]) -> list[str]:
+  base_args = args.copy()
+  if "-f" in base_args:
+    f_idx = base_args.index("-f")
+    return base_args[:f_idx] + ["-progress", "pipe:1", "-nostats", "-benchmark"] + base_args[f_idx:]
+  return base_args[:-1] + ["-progress", "pipe:1", "-nostats", "-benchmark", base_args[-1]]
+
+# -benchmark 가 끝날 때 stderr에 남기는 프로세스 CPU 시간
+_BENCH_RE = re.compile(r"bench: utime=([\d.]+)s stime=([\d.]+)s")
+
+def _terminate_proc(proc):
+  """SIGTERM 후 유예 시간 안에 안 끝나면 kill. 감독자 루프가 처리하므로 호출자는 막히지 않는다."""
+  if proc:
+    proc.stop()
+
+def mux_parallel_jobs(state: dict) -> int:
+  """동시에 실행할 MUX 프로브 수. 0 이하면 CPU 코어 수 기준 자동."""
+  try:
+    jobs = int(state.get("mux_parallel_jobs", 0))
+  except Exception:
+    jobs = 0
+  if jobs <= 0:
+    jobs = min(8, max(1, (os.cpu_count() or 1) // 2))
+  return jobs
+
+def scratch_need_bytes(state: dict, streams: int) -> int:
+  """작업 폴더에 동시에 놓일 수 있는 파일 크기 추정: 출력 비트레이트 × 길이 × 파일 수."""
+  try:
+    dur = media_info(state.get("input_path", "")).duration or 0.0
+    return int(int(state.get("bitrate_k", 0)) * 1000 / 8 * dur * streams)
+  except Exception:
+    return 0
+
+# ---------------- 작업 ----------------
+
+class ConvertJob:
+  """변환 작업 하나. 프로세스/임시 파일/취소 상태를 작업마다 따로 가진다."""
+
+  def __init__(self, options: ConvertOptions, on_event: EventFn | None = None, *, es_input: str | None = None,
+               store_key: str | None = None):
+    self.options = options
+    self.state = options.as_state()
+    self.on_event: EventFn = on_event or (lambda kind, **data: None)
+    self._cancel = threading.Event()
+    self._lock = threading.Lock()
+    self.running_procs: set = set()
+    self.probe_paths: set[str] = set()
+    self.current_outpath = ""
+    self.mux_history: list[tuple[int, bool]] = []
+    self.timings: dict[str, float] = {}
+    self._probe_dir: str | None = None
+    self.stream_copy = False
+    self._journal: checkpoint.Journal | None = None
+    self.mezz_in: str | None = None          # 캐시 적중: 원본 대신 읽을 필터 결과 파일
+    self._mezz_key: str | None = None
+    self._mezz_final = ""
+    self._mezz_pending: str | None = None    # 캐시 미스: 첫 전체 길이 인코딩이 함께 쓸 임시 파일
+    self.es_input = es_input                 # 이미 인코딩된 ES (여러 출력 작업이 넘김, 이 작업이 지운다)
+    self.store_key = store_key               # 출력 저장소 키 (여러 출력 작업이 바꾸기 전 옵션으로 계산해 넘김)
+    self.cpu_seconds = 0.0                   # -benchmark 로 받은 ffmpeg CPU 시간 합
+
+  # ── 이벤트
+  def _log(self, msg: str):
+    self.on_event("log", msg=msg)
+
+  def _progress(self, frac: float, **extra):
+    self.on_event("progress", frac=frac, **extra)
+
+  def _status(self, key: str, **fmt):
+    self.on_event("status", key=key, fmt=fmt)
+
+  @contextmanager
+  def _timed(self, name: str):
+    t0 = time.monotonic()
+    try:
+      yield
+    finally:
+      self.timings[name] = self.timings.get(name, 0.0) + (time.monotonic() - t0)
+
+  # ── 취소
+  @property
+  def cancel_requested(self) -> bool:
+    return self._cancel.is_set()
+
+  def cancel(self):
+    """실행 중인 모든 ffmpeg를 종료하고 임시/미완성 파일을 지운다 (다른 스레드에서 호출)."""
+    self._cancel.set()
+    with self._lock:
+      procs = list(self.running_procs)
+    for proc in procs:
+      _terminate_proc(proc)
+    try:
+      if self.current_outpath:
+        safe_remove(self.current_outpath)
+      for p in list(self.probe_paths):
+        safe_remove(p)
+        self.probe_paths.discard(p)
+    except Exception:
+      pass
+
+  # ── 경로
+  def probe_dir(self) -> str:
+    """프로브 파일 위치: 출력 폴더(NAS일 수 있음)가 아닌 로컬 작업 폴더 안의 작업별 폴더."""
+    if self._probe_dir is None:
+      # 보존하는 병렬 프로브 + ES (+ 이어 붙이기 전의 구간 파일)
+      need = scratch_need_bytes(self.state, mux_parallel_jobs(self.state) + 2)
+      base = scratch_dir(self.state.get("scratch_dir") or None, need)
+      self._probe_dir = tempfile.mkdtemp(prefix="job-", dir=str(base))
+    return self._probe_dir
+
+  def promote_probe(self, probe_path: str, final_path: str) -> bool:
+    """언더플로우 검사를 통과한 프로브 파일을 최종 출력으로 원자적 이동."""
+    try:
+      try:
+        os.replace(probe_path, final_path)
+      except OSError:
+        # 작업 폴더와 출력 폴더가 다른 장치 → 출력 폴더에 복사한 뒤 그 안에서 원자적 교체
+        part = final_path + ".part"
+        shutil.copyfile(probe_path, part)
+        os.replace(part, final_path)
+        safe_remove(probe_path)
+    except OSError as e:
+      self._log(f"  [WARN] Could not promote probe file: {e}")
+      safe_remove(final_path + ".part")
+      return False
+    self.probe_paths.discard(probe_path)
+    return True
+
+  # ── ffmpeg 실행
+  def _run_ffmpeg(self, cmd: list[str], dur: float, *, on_spawn=None, report_progress: bool = True,
+                  on_progress: Callable[[ProgressSnapshot], None] | None = None) -> tuple[int, bool, int]:
+    """
+    ffmpeg 실행 + 진행률 반영. underflow 감지 시 즉시 중단. (exit code, underflow 여부, 출력 바이트)
+    on_progress가 있으면 진행률 이벤트 대신 스냅샷을 그대로 넘긴다 (감독자 루프 스레드에서 호출).
+    """
+    underflow_regex = re.compile(r"buffer underflow", re.IGNORECASE)
+
+    underflow_hit = False
+    total_size = 0
+    proc = ProcHandle(cmd)
+    if on_progress is not None:
+      throttle = None
+    else:
+      throttle = ProgressThrottle(lambda snap: self._progress(snap.fraction(dur), speed=snap.speed)) \
+                 if report_progress and dur > 0 else None
+
+    # 아래 콜백은 감독자 루프 스레드에서 호출됨
+    def on_snapshot(snap: ProgressSnapshot):
+      nonlocal total_size
+      total_size = snap.total_size or total_size
+      if underflow_hit or self.cancel_requested:
+        return
+      if on_progress is not None:
+        on_progress(snap)
+      elif throttle is not None:
+        throttle.push(snap)
+
+    def on_stderr(stream: str, line: str):
+      nonlocal underflow_hit
+      m = _BENCH_RE.search(line)
+      if m:
+        with self._lock:
+          self.cpu_seconds += float(m.group(1)) + float(m.group(2))
+        return
+      if underflow_hit or self.cancel_requested:
+        return
+      if underflow_regex.search(line):
+        underflow_hit = True
+        proc.terminate()
+        self._log(f"  [WARN] {line.strip()}")
+
+    parser = ProgressParser(on_snapshot)
+    proc.subscribe_raw(lambda stream, data: parser.feed(data), streams=("stdout",))
+    proc.subscribe(on_stderr, streams=("stderr",))
+    supervisor.start(proc)
+    with self._lock:
+      self.running_procs.add(proc)
+    if self.cancel_requested:
+      _terminate_proc(proc)
+    if on_spawn is not None:
+      on_spawn(proc)
+    code = proc.wait()
+    with self._lock:
+      self.running_procs.discard(proc)
+    return (code, underflow_hit, total_size)
+
+  def check_stream_copy(self) -> bool:
+    """원본을 그대로 담을 수 있는지 ffprobe로 확인 (run 시작 시 한 번)."""
+    state = self.state
+    if not state.get("stream_copy", True):
+      return False
+    info = media_info(state["input_path"], exact=True)
+    reason = stream_copy_check(state, info)
+    if reason:
+      if info.codec == COPY_CODECS.get(state.get("codec")):   # 코덱은 맞는데 다른 조건이 안 맞을 때만 알림
+        self._log(f"[COPY] Re-encoding ({reason})")
+      return False
+    self._log(f"[COPY] Source already {info.codec} {info.width}x{info.height}@{info.fps:g} → stream copy")
+    return True
+
+  # ── 필터 결과 캐시 (mezzanine)
+  def setup_mezzanine(self) -> None:
+    """적중이면 mezz_in, 미스면 이번 작업에서 캐시 파일을 함께 만들도록 준비 (run 시작 시 한 번)."""
+    state = self.state
+    if self.stream_copy or not state.get("mezzanine_cache", False):
+      return
+    fps = state["fps"] if not state["fps_locked"] else 30
+    _, filter_expr, _ = _build_letterbox_filter(state, fps)
+    key = mezzanine.make_key(state, filter_expr, fps)
+    if key is None:
+      return
+    hit = mezzanine.lookup(key)
+    st = mezzanine.stats()
+    if hit:
+      self.mezz_in = hit
+      self._log(f"[MEZZ] Hit: encoding from cached filtered frames "
+                f"({st['hits']} hits / {st['misses']} misses, {bytes_to_human(st['bytes'])} cached)")
+      return
+    self._mezz_key = key
+    self._mezz_final = mezzanine.path_for(key, state.get("mezzanine_dir") or None)
+    # 같은 키를 동시에 만드는 다른 작업과 겹치지 않게 작업별 임시 이름 → 끝나면 교체
+    self._mezz_pending = f"{self._mezz_final}.{os.getpid()}-{id(self):x}.part"
+    self._log(f"[MEZZ] Miss: filtered frames will be cached ({st['hits']} hits / {st['misses']} misses)")
+
+  def _take_mezz_out(self) -> str | None:
+    """이번 전체 길이 인코딩에 붙일 캐시 출력 (작업당 한 번)."""
+    p, self._mezz_pending = self._mezz_pending, None
+    if p:
+      self.probe_paths.add(p)
+    return p
+
+  def _finish_mezz(self, tmp: str | None, ok: bool) -> None:
+    if not tmp:
+      return
+    self.probe_paths.discard(tmp)
+    if not ok or self.cancel_requested or self._mezz_key is None:
+      safe_remove(tmp)
+      return
+    state = self.state
+    final = self._mezz_final
+    try:
+      os.replace(tmp, final)
+    except OSError:
+      safe_remove(tmp)
+      return
+    budget = int(state.get("mezzanine_budget_mb", mezzanine.DEFAULT_BUDGET_MB))
+    if mezzanine.store(self._mezz_key, final, state["input_path"], budget):
+      self._log(f"[MEZZ] Cached filtered frames ({bytes_to_human(os.path.getsize(final))})")
+    else:
+      self._log(f"[MEZZ] Filtered frames exceed the {budget} MB budget → not cached")
+
+  def encode_elementary(self) -> tuple[bool, str]:
+    """MUX 탐색용 MPEG-1 ES를 한 번만 인코딩. (성공 여부, ES 경로)"""
+    state = self.state
+    outname = state["output_name"] or "output"
+    es_path = make_temp_es_path(self.probe_dir(), outname)
+
+    dur = media_info(state["input_path"]).duration
+
+    if self.es_input:
+      self._log("[SHARED] Elementary stream from the shared decode")
+      return (True, self.es_input)
+
+    self._log("[COPY] Elementary stream for MUX search" if self.stream_copy else "[ENCODE] Elementary stream for MUX search")
+    self._status("msg.encoding_es")
+    self._progress(0.0)
+
+    if self.cancel_requested:
+      return (False, es_path)
+
+    self.current_outpath = es_path
+    self.probe_paths.add(es_path)
+    with self._timed("encode_es"):
+      plan = self.segment_plan(dur)
+      code = 0 if plan and self._encode_segments(plan, es_path, dur) else None
+      if code is None and not self.cancel_requested:
+        mezz_out = self._take_mezz_out()
+        args = build_ffmpeg_args(state, override_outpath=es_path, elementary=True, stream_copy=self.stream_copy,
+                                 mezzanine_in=self.mezz_in, mezzanine_out=mezz_out)
+        code, _, _ = self._run_ffmpeg(_with_progress(args), dur)
+        self._finish_mezz(mezz_out, code == 0)
+
+    if self.cancel_requested:
+      safe_remove(es_path)
+      self._log("  [CANCEL] Cancelled by user")
+      return (False, es_path)
+    if code != 0:
+      safe_remove(es_path)
+      self._log(f"  [ERROR] ffmpeg exit code: {code}")
+      return (False, es_path)
+    self._progress(1.0)
+    self._log("  [OK] Done ffmpeg (Elementary stream)")
+    return (True, es_path)
+
+  # ── 구간 병렬 인코딩 (+ 체크포인트)
+  def segments_wanted(self, dur: float) -> bool:
+    state = self.state
+    return (not self.stream_copy and not self.options.use_h264
+            and (segment_jobs(state) > 1 or bool(state.get("resume_segments", False)))
+            and dur >= float(state.get("segment_min_sec", 120) or 0))
+
+  def segment_plan(self, dur: float) -> list[tuple[int, int]] | None:
+    """긴 입력이면 [(시작 프레임, 프레임 수)] 구간 계획, 아니면 None (한 번에 인코딩)."""
+    state = self.state
+    if not self.segments_wanted(dur):
+      return None
+    jobs = segment_jobs(state)
+    if state.get("resume_segments", False) and self._journal is None:
+      self._journal = checkpoint.open_journal(state)
+    if self._journal is not None and self._journal.plan:
+      # 이어서 하기: 병렬 수가 바뀌었어도 저장된 계획을 그대로 쓴다
+      return self._journal.plan if len(self._journal.plan) > 1 else None
+    chunks = jobs
+    if self._journal is not None:
+      chunks = max(jobs, math.ceil(dur / checkpoint.CHECKPOINT_SEC))
+    fps = float(state["fps"] if not state["fps_locked"] else 30)
+    try:
+      keys = [t for t, _, k in scan_packets(state["input_path"]) if k]
+    except Exception:
+      keys = []
+    plan = plan_segments(int(round(dur * fps)), fps, chunks, keys)
+    return plan if len(plan) > 1 else None
+
+  def _encode_segments(self, plan: list[tuple[int, int]], es_path: str, dur: float) -> bool:
+    """
+    구간마다 ffmpeg 하나로 닫힌 GOP ES를 인코딩해 es_path로 이어 붙인다.
+    실패하거나 프레임 수가 계획과 다르면 False (호출자가 한 번에 인코딩으로 되돌아감).
+    journal이 있으면 끝난 구간은 남겨 두고 다음 실행에서 건너뛴다.
+    """
+    state = self.state
+    fps = float(state["fps"] if not state["fps_locked"] else 30)
+    journal = self._journal
+    if journal is not None:
+      journal.start(plan)
+      parts = [journal.part_path(i) for i in range(len(plan))]
+      todo = [i for i in range(len(plan)) if not journal.is_done(i)]
+    else:
+      base = os.path.splitext(es_path)[0]
+      parts = [f"{base}.seg{i:03d}.m1v" for i in range(len(plan))]
+      todo = list(range(len(plan)))
+    self.probe_paths.update(parts[i] for i in todo)
+    jobs = max(1, min(len(todo), segment_jobs(state)))
+    seg_avg = dur / len(plan)
+    self._log(f"[SEGMENT] {len(plan)} chunks × ~{seg_avg:.1f}s, {jobs} at a time")
+    if len(todo) < len(plan):
+      self._log(f"[RESUME] {len(plan) - len(todo)}/{len(plan)} chunks already encoded → {len(todo)} left")
+
+    # 진행률: 구간별 out_time 합 / 전체 길이 (스냅샷은 모두 감독자 루프 스레드에서 오므로 잠금 불필요)
+    done_us = [0 if i in todo else int(n / fps * 1_000_000) for i, (_, n) in enumerate(plan)]
+    speeds = [0.0] * len(plan)
+    total_us = max(1, int(dur * 1_000_000))
+    throttle = ProgressThrottle(lambda snap: self._progress(min(1.0, snap.out_time_us / total_us), speed=snap.speed))
+
+    def run_one(i: int) -> bool:
+      start, frames = plan[i]
+      last = i == len(plan) - 1
+      # 마지막 구간은 끝까지, 나머지는 정확히 frames장 (-t는 여유만 두고 -frames:v로 자른다)
+      window = (start / fps, (dur - start / fps) + 1.0 if last else frames / fps + 1.0)
+      args = build_ffmpeg_args(state, override_outpath=parts[i], elementary=True, window=window,
+                               frames=None if last else frames, closed_gop=True, mezzanine_in=self.mezz_in)
+
+      def on_progress(snap: ProgressSnapshot):
+        done_us[i] = snap.out_time_us
+        speeds[i] = 0.0 if snap.end else snap.speed
+        throttle.push(ProgressSnapshot(out_time_us=sum(done_us), speed=sum(speeds)))
+
+      code, _, _ = self._run_ffmpeg(_with_progress(args), window[1], on_progress=on_progress)
+      if code != 0 and not self.cancel_requested:
+        self._log(f"  [SEGMENT] chunk {i + 1}/{len(plan)} failed (exit {code})")
+      if code == 0 and journal is not None and not self.cancel_requested:
+        journal.mark_done(i)
+        self.probe_paths.discard(parts[i])   # 끝난 구간은 취소돼도 지우지 않는다
+      return code == 0
+
+    ok = False
+    try:
+      with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="segment") as pool:
+        ran = all(list(pool.map(run_one, todo)))
+      throttle.flush()
+      if not ran or self.cancel_requested:
+        return False
+      counts = join_elementary(parts, es_path)
+      expected = [n for _, n in plan[:-1]]
+      if counts[:-1] != expected or counts[-1] <= 0:
+        self._log(f"  [SEGMENT] Frame count mismatch {counts} vs {expected}+ → single encode")
+        if journal is not None:
+          journal.discard()
+          self._journal = None
+        return False
+      self._log(f"  [SEGMENT] Joined {sum(counts)} frames")
+      ok = True
+      return True
+    finally:
+      for i, p in enumerate(parts):
+        # 체크포인트 구간은 작업이 성공할 때까지 (run()에서 journal째로 정리) 남긴다
+        if journal is None or (not ok and i in todo and not journal.is_done(i)):
+          safe_remove(p)
+        self.probe_paths.discard(p)
+
+  def attempt_mux(self, mux_k: int, itr: int, *, final_output: bool, es_path: str | None = None,
+                  window: tuple[float, float] | None = None,
+                  on_spawn=None, report_progress: bool = True) -> tuple[bool, bool, str]:
+    state = self.state
+    outname = state["output_name"] or "output"
+    use_h264 = self.options.use_h264
+    ext = "mp4" if use_h264 else "mpg"
+
+    # 남기지 않을 프로브는 null 싱크로: 먹서는 그대로 돌지만 디스크 I/O는 없음 (바이트 수는 progress로 확인)
+    null_sink = not final_output and not use_h264 and \
+                (window is not None or not state.get("mux_promote_probe", True))
+    if final_output:
+      outpath = self.options.output_path()
+    elif null_sink:
+      outpath = os.devnull
+    else:
+      outpath = make_temp_outpath(self.probe_dir(), outname, mux_k, ext)
+
+    mezz_out = None
+    if es_path and not use_h264:
+      # 이미 인코딩된 ES를 stream copy로 다시 먹싱 (재인코딩 없음)
+      args = build_remux_args(es_path, mux_k, outpath, state)
+    else:
+      mezz_out = self._take_mezz_out() if final_output and window is None else None
+      args = build_ffmpeg_args(state, override_mux_k=mux_k, override_outpath=outpath, window=window,
+                               stream_copy=self.stream_copy, mezzanine_in=self.mezz_in, mezzanine_out=mezz_out)
+    dur = window[1] if window is not None else media_info(state["input_path"]).duration
+    cmd2 = _with_progress(args)
+
+    if not final_output:
+      if not use_h264:
+        if window is not None:
+          note = f" (window {window[0]:.1f}s+{window[1]:.1f}s)"
+        else:
+          note = " (remux)" if es_path else ""
+        self._log(f"[TRY] MUX={quant50_up(mux_k)}k" + note)
+        self._status("msg.searching_mux", itr=itr, mux=mux_k)
+    else:
+      if use_h264:
+        self._log("[OUTPUT] Codec=H.264")
+      else:
+        self._log(f"[OUTPUT] MUX={quant50_up(mux_k)}k")
+      self._status("msg.working")
+
+    if not use_h264:
+      self.on_event("mux", mux_k=mux_k)
+    self._progress(0.0)
+
+    if self.cancel_requested:
+      safe_remove(outpath)
+      return (False, False, outpath)
+
+    if not null_sink:
+      self.current_outpath = outpath
+    if not final_output and not use_h264 and not null_sink:
+      self.probe_paths.add(outpath)
+
+    code, underflow_hit, total_size = self._run_ffmpeg(cmd2, dur, on_spawn=on_spawn, report_progress=report_progress)
+    self._finish_mezz(mezz_out, code == 0 and not underflow_hit)
+
+    if self.cancel_requested:
+      safe_remove(outpath)
+      self._log("  [CANCEL] Cancelled by user")
+      return (False, False, outpath)
+
+    if underflow_hit:
+      safe_remove(outpath)
+      self._log("  [ABORT] buffer underflow → stop & removed temp files")
+      return (False, True, outpath)
+
+    self._progress(1.0)
+    if code == 0:
+      if null_sink:
+        self._log(f"  [OK] Done ffmpeg (No underflow, {bytes_to_human(total_size)} to null sink)")
+      else:
+        self._log("  [OK] Done ffmpeg (No underflow)")
+      return (True, False, outpath)
+    else:
+      safe_remove(outpath)
+      self._log(f"  [ERROR] ffmpeg exit code: {code}")
+      return (False, False, outpath)
+
+  # ── MUX 탐색
+  def _probe(self, mux_k: int, itr: int, *, es_path: str | None, windows: list[tuple[float, float]] | None = None,
+             on_spawn=None, report_progress: bool = True,
+             should_record: Callable[[int], bool] | None = None) -> tuple[bool, bool, str]:
+    """
+    MUX 후보 하나 검사. windows가 있으면 모든 구간에서 통과해야 안전 (구간 프로브는 보존하지 않음).
+    should_record(mux_k)가 False면 판정을 mux_history에 남기지 않는다 (병렬 탐색에서 중간에 종료된 후보).
+    """
+    if not windows:
+      ok, uf, path = self.attempt_mux(mux_k, itr, final_output=False, es_path=es_path,
+                                      on_spawn=on_spawn, report_progress=report_progress)
+    else:
+      ok, uf, path = True, False, ""
+      for win in windows:
+        ok, uf, path = self.attempt_mux(mux_k, itr, final_output=False, window=win,
+                                        on_spawn=on_spawn, report_progress=report_progress)
+        if not ok or uf or self.cancel_requested:
+          break
+      path = "" if not (ok and not uf) else path
+    if not self.cancel_requested and (should_record is None or should_record(mux_k)):
+      with self._lock:
+        self.mux_history.append((quant50_up(mux_k), bool(ok and not uf)))
+    return (ok, uf, path)
+
+  def find_min_safe_mux(self, start_mux_k: int, *, max_mux_k: int = 20000, max_attempts: int = 12,
+                        bracket: tuple[int, int] | None = None) -> tuple[int | None, str | None]:
+    """
+    최소 안전 MUX 탐색. (안전 MUX, 보존된 프로브 파일 경로)
+    mux_promote_probe가 켜져 있으면 가장 낮은 안전 프로브 파일만 남기고 나머지는 즉시 삭제.
+    bracket이 주어지면 (하한, 상한) 예측 구간부터 확인한다 (warm start).
+    """
+    state = self.state
+    if self.options.use_h264:
+      return (None, None)
+    start_mux_k = quant50_up(int(start_mux_k))
+    self.mux_history.clear()
+
+    if self.cancel_requested:
+      return (None, None)
+
+    # 프로브 모드: ES를 한 번 인코딩해 두고, 각 후보 muxrate는 stream copy 리먹싱으로만 검사
+    es_path = None
+    if state.get("mux_probe_remux", True):
+      ok, es_path = self.encode_elementary()
+      if self.cancel_requested:
+        return (None, None)
+      if not ok:
+        self._log("[WARN] Falling back to full encode per MUX probe")
+        es_path = None
+
+    try:
+      with self._timed("search"):
+        floor_k = 0
+        if es_path and state.get("mux_solver", True):
+          solved, solved_path, rejected = self._solve_and_confirm(es_path, max_mux_k=max_mux_k)
+          if self.cancel_requested:
+            return (None, None)
+          if solved is not None:
+            return (solved, solved_path)
+          if rejected:
+            # 예측값이 언더플로우 → 그 위에서부터 기존 탐색
+            floor_k = rejected
+            if bracket is not None and bracket[1] <= floor_k:
+              bracket = None
+            start_mux_k = max(start_mux_k, quant50_up(floor_k + 50))
+            if max_attempts and int(max_attempts) > 0:
+              max_attempts = max(1, int(max_attempts) - 1)
+
+        # 전체 인코딩 프로브 모드에서는 가장 빽빽한 구간만으로 탐색한 뒤 전체 길이로 1회 확인
+        windows = self._find_peak_windows() if es_path is None and state.get("mux_window_probe", True) else None
+
+        best, best_path = self._run_search(start_mux_k, max_mux_k=max_mux_k, max_attempts=max_attempts,
+                                           es_path=es_path, floor_k=floor_k, bracket=bracket, windows=windows)
+        if best is None or not windows or self.cancel_requested:
+          return (best, best_path)
+
+        self._log(f"[WINDOW] Confirming MUX={best}k on full length")
+        ok, uf, path = self._probe(best, 0, es_path=None)
+        if self.cancel_requested:
+          return (None, None)
+        if ok and not uf:
+          return (best, path if state.get("mux_promote_probe", True) else None)
+        self._log("[WINDOW] Full-length confirm failed → searching upward")
+        return self._run_search(quant50_up(best + 50), max_mux_k=max_mux_k, max_attempts=max_attempts,
+                                es_path=None, floor_k=best)
+    finally:
+      if es_path and es_path != self.es_input:   # 넘겨받은 ES는 최종 먹싱에도 쓰므로 run()이 끝날 때 지운다
+        safe_remove(es_path)
+        self.probe_paths.discard(es_path)
+
+  def _run_search(self, start_mux_k: int, *, max_mux_k: int, max_attempts: int, es_path: str | None,
+                  floor_k: int = 0, bracket: tuple[int, int] | None = None,
+                  windows: list[tuple[float, float]] | None = None) -> tuple[int | None, str | None]:
+    jobs = mux_parallel_jobs(self.state)
+    if jobs > 1:
+      return self._search_mux_parallel(start_mux_k, max_mux_k=max_mux_k, max_attempts=max_attempts,
+                                       es_path=es_path, jobs=jobs, floor_k=floor_k, bracket=bracket,
+                                       windows=windows)
+    return self._search_mux(start_mux_k, max_mux_k=max_mux_k, max_attempts=max_attempts, es_path=es_path,
+                            floor_k=floor_k, bracket=bracket, windows=windows)
+
+  def _find_peak_windows(self) -> list[tuple[float, float]] | None:
+    """원본 패킷 크기로 비트레이트가 가장 높은 구간(키프레임 정렬)을 찾는다. 의미 없으면 None."""
+    state = self.state
+    inpath = state["input_path"]
+    try:
+      win_sec = float(state.get("mux_window_sec", 10))
+      count = int(state.get("mux_window_count", 1))
+    except Exception:
+      return None
+    dur = media_info(inpath).duration
+    if win_sec <= 0 or dur < win_sec * 3:
+      return None
+    try:
+      pkts = scan_packets(inpath)
+    except Exception:
+      return None
+    wins = densest_windows(pkts, win_sec, count)
+    if not wins or sum(t for _, t in wins) >= dur * 0.5:
+      return None
+    self._log("[WINDOW] Probing densest segments: " +
+              ", ".join(f"{ss:.1f}s+{t:.1f}s" for ss, t in wins))
+    return wins
+
+  def _solve_and_confirm(self, es_path: str, *, max_mux_k: int) -> tuple[int | None, str | None, int | None]:
+    """
+    패킷 크기 기반 해석적 계산 + 확인용 리먹싱 1회. (안전 MUX, 보존 경로, 확인에 실패한 예측 MUX)
+    """
+    state = self.state
+    fps = state["fps"] if not state["fps_locked"] else 30
+    buf = state["buffer_k"] if not state["buffer_locked"] else 2900
+    predicted = solve_min_mux_k(es_path, buffer_k=int(buf), fps=float(fps))
+    if predicted is None:
+      self._log("[SOLVE] Could not read packets → falling back to search")
+      return (None, None, None)
+    predicted = max(50, min(quant50_up(predicted), max_mux_k if max_mux_k > 0 else predicted))
+    self._log(f"[SOLVE] Predicted minimum safe MUX={predicted}k")
+
+    ok, uf, path = self._probe(predicted, 1, es_path=es_path)
+    if self.cancel_requested:
+      return (None, None, None)
+    if ok and not uf:
+      keep_best = bool(state.get("mux_promote_probe", True))
+      return (predicted, path if keep_best else None, None)
+    self._log("[SOLVE] Prediction did not hold → searching upward")
+    return (None, None, predicted)
+
+  def _search_mux(self, start_mux_k: int, *, max_mux_k: int, max_attempts: int, es_path: str | None,
+                  floor_k: int = 0, bracket: tuple[int, int] | None = None,
+                  windows: list[tuple[float, float]] | None = None) -> tuple[int | None, str | None]:
+    attempts = 0
+    unlimited = (max_attempts is None) or (int(max_attempts) <= 0)
+    keep_best = bool(self.state.get("mux_promote_probe", True)) and not windows
+    best_path: str | None = None
+
+    def can_try() -> bool:
+      return unlimited or (attempts < max_attempts)
+
+    def keep(path: str):
+      # 더 낮은 안전 프로브가 나오면 이전 것은 필요 없음
+      nonlocal best_path
+      if not keep_best:
+        return
+      if best_path and best_path != path:
+        safe_remove(best_path)
+        self.probe_paths.discard(best_path)
+      best_path = path
+
+    if not can_try():
+      return (None, None)
+    if bracket is not None:
+      # warm start: 예측 구간의 상한부터 확인 → 안전하면 하한 확인, 아니면 상한 위로 갤럽
+      lo, hi = bracket
+      start_mux_k = hi
+    ok, uf, path = self._probe(start_mux_k, attempts+1, es_path=es_path, windows=windows)
+    attempts += 1
+    if self.cancel_requested:
+      return (None, None)
+
+    if ok and not uf:
+      low_unsafe = floor_k
+      high_safe = start_mux_k
+      keep(path)
+      if bracket is not None and floor_k < lo < high_safe and can_try():
+        ok, uf, path = self._probe(lo, attempts+1, es_path=es_path, windows=windows)
+        attempts += 1
+        if self.cancel_requested:
+          return (None, None)
+        if ok and not uf:
+          high_safe = lo
+          keep(path)
+        else:
+          low_unsafe = lo
+    else:
+      low_unsafe = start_mux_k
+      step = 50
+      cur = start_mux_k + step
+      high_safe = None
+      while can_try() and cur <= max_mux_k:
+        if self.cancel_requested:
+          return (None, None)
+        ok, uf, path = self._probe(cur, attempts+1, es_path=es_path, windows=windows)
+        attempts += 1
+        if ok and not uf:
+          high_safe = cur
+          keep(path)
+          break
+        low_unsafe = cur
+        step *= 2
+        cur = quant50_up(cur + step)
+      if high_safe is None:
+        self._log("[FAIL] 안전 상한을 찾지 못함 (max_mux_k 초과)")
+        return (None, None)
+
+    while can_try() and (high_safe - low_unsafe) > 50:
+      if self.cancel_requested:
+        return (None, None)
+      mid = quant50_up((low_unsafe + high_safe) // 2)
+      if mid == high_safe or mid == low_unsafe:
+        break
+      ok, uf, path = self._probe(mid, attempts+1, es_path=es_path, windows=windows)
+      attempts += 1
+      if ok and not uf:
+        high_safe = mid
+        keep(path)
+      else:
+        low_unsafe = mid
+
+    return (high_safe, best_path)
+
+  def _search_mux_parallel(self, start_mux_k: int, *, max_mux_k: int, max_attempts: int, es_path: str | None,
+                           jobs: int, floor_k: int = 0,
+                           bracket: tuple[int, int] | None = None,
+                           windows: list[tuple[float, float]] | None = None) -> tuple[int | None, str | None]:
+    """
+    k-ary 병렬 탐색: 후보 muxrate 여러 개를 동시에 실행해 구간을 한 번에 좁힌다.
+    구간이 움직이면 더 이상 의미 없는 후보(안전 상한 위 / 위험 하한 아래)는 즉시 종료.
+    """
+    attempts = 0
+    unlimited = (max_attempts is None) or (int(max_attempts) <= 0)
+    keep_best = bool(self.state.get("mux_promote_probe", True)) and not windows
+    lock = threading.Lock()
+    low_unsafe = floor_k
+    high_safe: int | None = None
+    best_path: str | None = None
+
+    # 갤럽 수열: 순차 탐색과 동일 (start, start+50, +100, +200, ...)
+    gallop_cur = start_mux_k
+    gallop_step = 0
+    seed = bracket
+
+    def budget() -> int:
+      return jobs if unlimited else max(0, min(jobs, int(max_attempts) - attempts))
+
+    def next_candidates() -> list[int]:
+      nonlocal gallop_cur, gallop_step, seed
+      n = budget()
+      cands: list[int] = []
+      if seed is not None and n > 0:
+        # warm start 첫 라운드: 예측 구간 양 끝 + 내부 분할점, 이후 갤럽은 상한 위에서 이어감
+        lo, hi = seed
+        seed = None
+        cands = [hi] if n == 1 else [lo, hi]
+        inner = n - len(cands)
+        for i in range(1, inner + 1):
+          c = quant50_up(lo + (hi - lo) * i // (inner + 1))
+          if lo < c < hi and c not in cands:
+            cands.append(c)
+        gallop_cur, gallop_step = quant50_up(hi + 50), 50
+        return sorted(c for c in cands if c > low_unsafe)
+      if high_safe is None:
+        while len(cands) < n and gallop_cur <= max_mux_k:
+          cands.append(gallop_cur)
+          gallop_step = 50 if gallop_step == 0 else gallop_step * 2
+          gallop_cur = quant50_up(gallop_cur + gallop_step)
+        return cands
+      span = high_safe - low_unsafe
+      for i in range(1, n + 1):
+        c = quant50_up(low_unsafe + span * i // (n + 1))
+        if low_unsafe < c < high_safe and c not in cands:
+          cands.append(c)
+      return cands
+
+    def in_bracket(mux_k: int) -> bool:
+      return mux_k > low_unsafe and (high_safe is None or mux_k < high_safe)
+
+    round_no = 0
+    while True:
+      if self.cancel_requested:
+        return (None, None)
+      if high_safe is not None and (high_safe - low_unsafe) <= 50:
+        break
+      cands = next_candidates()
+      if not cands:
+        break
+      round_no += 1
+      self._log(f"[PAR] Round {round_no}: " + ", ".join(f"{c}k" for c in cands))
+
+      procs: dict[int, ProcHandle] = {}
+      dropped: set[int] = set()
+
+      def not_dropped(mux_k: int, dropped=dropped) -> bool:
+        # 구간 밖으로 밀려나 종료된 후보는 실제로 검사된 게 아니므로 기록(캐시/모델 probe 수)에서 뺀다
+        with lock:
+          return mux_k not in dropped
+
+      def spawn_hook(mux_k: int):
+        def _hook(proc):
+          with lock:
+            procs[mux_k] = proc
+            drop = mux_k in dropped
+          if drop:
+            _terminate_proc(proc)
+        return _hook
+
+      def drop_outside():
+        # lock 보유 상태에서 호출
+        for c, pr in list(procs.items()):
+          if c not in dropped and not in_bracket(c):
+            dropped.add(c)
+            _terminate_proc(pr)
+        for c in cands:
+          if c not in procs and not in_bracket(c):
+            dropped.add(c)
+
+      with ThreadPoolExecutor(max_workers=len(cands)) as pool:
+        futs = {}
+        for c in cands:
+          futs[pool.submit(self._probe, c, attempts + 1, es_path=es_path, windows=windows,
+                           on_spawn=spawn_hook(c), report_progress=False, should_record=not_dropped)] = c
+          attempts += 1
+        for fut in as_completed(futs):
+          c = futs[fut]
+          try:
+            ok, uf, path = fut.result()
+          except Exception as e:
+            self._log(f"  [EXC] MUX={c}k: {e}")
+            ok, uf, path = False, False, ""
+          with lock:
+            if self.cancel_requested:
+              continue
+            if c in dropped or not in_bracket(c):
+              # 이미 구간 밖으로 밀려난 후보 → 결과 무시
+              if ok and path:
+                safe_remove(path)
+                self.probe_paths.discard(path)
+              continue
+            if ok and not uf:
+              high_safe = c
+              if keep_best:
+                if best_path and best_path != path:
+                  safe_remove(best_path)
+                  self.probe_paths.discard(best_path)
+                best_path = path
+            else:
+              low_unsafe = c
+            drop_outside()
+            if high_safe is not None:
+              self._progress(min(1.0, 50.0 / max(50, high_safe - low_unsafe)))
+
+      if self.cancel_requested:
+        return (None, None)
+      if high_safe is None and gallop_cur > max_mux_k:
+        self._log("[FAIL] 안전 상한을 찾지 못함 (max_mux_k 초과)")
+        return (None, None)
+
+    if high_safe is None:
+      self._log("[FAIL] 안전 상한을 찾지 못함 (max_mux_k 초과)")
+      return (None, None)
+    return (high_safe, best_path)
+
+  # ── 실행
+  def _finalize(self, best: int, best_path: str | None) -> tuple[bool, bool, str]:
+    """안전 MUX로 최종 파일 생성. 통과한 프로브가 남아 있으면 재인코딩 없이 그대로 사용."""
+    final_path = self.options.output_path()
+    self.state["mux_k"] = best
+    self.on_event("mux", mux_k=int(best))
+    with self._timed("final"):
+      if best_path and os.path.exists(best_path) and self.promote_probe(best_path, final_path):
+        self._log(f"[FINAL] Promoted probe with final safe MUX={best}k")
+        self._progress(1.0)
+        return (True, False, final_path)
+      self._log(f"[FINAL] Generating file with final safe MUX={best}k")
+      return self.attempt_mux(best, 0, final_output=True, es_path=self.es_input)
+
+  def _run_auto(self, result: ConvertResult) -> tuple[bool, bool, str] | None:
+    state = self.state
+    start_mux = quant50_up(int(state.get("mux_k", 0)))
+    max_mux_k = quant50_up(int(state.get("bitrate_k", 0)) * 4)
+    max_attempts = int(state.get("auto_max_attempts", 0))
+
+    cache_key = muxcache.make_key(state) if state.get("mux_cache", True) else None
+    hit = muxcache.lookup(cache_key) if cache_key else None
+    if hit is not None:
+      # 같은 입력 + 같은 파라미터로 이미 찾은 값 → 탐색 없이 바로 최종 인코딩
+      best, best_path = hit[0], None
+      result.cache_hit = True
+      self._log(f"[CACHE] Hit: safe MUX={best}k ({len(hit[1])} attempts saved)")
+    else:
+      feat = muxmodel.features(state, duration_sec=media_info(state["input_path"]).duration)
+      warm = None
+      if state.get("mux_warm_start", True):
+        pred = muxmodel.predict_bracket(feat)
+        if pred is not None:
+          warm = (pred[0], pred[1])
+          self._log(f"[WARM] Predicted bracket {pred[0]}–{pred[1]}k from {pred[2]} past jobs")
+      best, best_path = self.find_min_safe_mux(start_mux_k=start_mux, max_mux_k=max_mux_k,
+                                               max_attempts=max_attempts, bracket=warm)
+      result.attempts = list(self.mux_history)
+      if self.cancel_requested or best is None:
+        return None
+      if cache_key:
+        muxcache.store(cache_key, state["input_path"], best, [list(h) for h in self.mux_history])
+      muxmodel.record(feat, best, probes=len(self.mux_history), seeded=warm is not None)
+      if warm is not None:
+        cold_avg, _ = muxmodel.probe_stats()
+        if cold_avg is not None:
+          self._log(f"[WARM] {len(self.mux_history)} probes (unseeded average {cold_avg:.1f}, "
+                    f"saved {cold_avg - len(self.mux_history):.1f})")
+
+    result.mux_k = best
+    ok, uf, outpath = self._finalize(best, best_path)
+    if self.cancel_requested:
+      return None
+    if uf and hit is not None and cache_key:
+      # 캐시 값이 더 이상 안전하지 않음 → 무효화 후 다시 탐색
+      muxcache.invalidate(cache_key)
+      result.cache_hit = False
+      self._log("[CACHE] Cached MUX underflowed → invalidated, searching again")
+      best, best_path = self.find_min_safe_mux(start_mux_k=quant50_up(best + 50), max_mux_k=max_mux_k,
+                                               max_attempts=max_attempts)
+      result.attempts = list(self.mux_history)
+      if self.cancel_requested or best is None:
+        return None
+      muxcache.store(cache_key, state["input_path"], best, [list(h) for h in self.mux_history])
+      result.mux_k = best
+      ok, uf, outpath = self._finalize(best, best_path)
+    return (ok, uf, outpath)
+
+  # ── 출력 저장소
+  def restore_output(self, result: ConvertResult, key: str) -> bool:
+    """같은 입력 내용 + 같은 설정의 결과가 저장소에 있으면 출력 폴더에 링크/복사하고 True."""
+    final_path = self.options.output_path()
+    with self._timed("store"):
+      got = outstore.restore(key, final_path)
+    if got is None:
+      return False
+    hit, method = got
+    result.ok = result.store_hit = True
+    result.output_path = final_path
+    result.size_bytes = hit["size"]
+    result.mux_k = hit["mux_k"]
+    if hit["mux_k"] is not None:
+      self.on_event("mux", mux_k=int(hit["mux_k"]))
+    self._progress(1.0)
+    self._log(f"[STORE] Hit: {method} from output store "
+              f"({bytes_to_human(hit['size'])}, saved {hit['cpu_sec']:.1f} CPU-s)")
+    return True
+
+  def store_output(self, result: ConvertResult, key: str) -> None:
+    state = self.state
+    budget = int(state.get("output_store_budget_mb", outstore.DEFAULT_BUDGET_MB))
+    with self._timed("store"):
+      ok = outstore.store(key, result.output_path, mux_k=result.mux_k, cpu_sec=self.cpu_seconds,
+                          budget_mb=budget, preferred=state.get("output_store_dir") or None)
+    if ok:
+      self._log(f"[STORE] Saved output ({self.cpu_seconds:.1f} CPU-s)")
+    else:
+      self._log(f"[STORE] Output not stored (over the {budget} MB budget or not writable)")
+
+  def run(self) -> ConvertResult:
+    """작업 실행 (호출한 스레드에서 끝날 때까지 블록)."""
+    state = self.state
+    result = ConvertResult(input_path=state["input_path"])
+    if not state["input_path"] or not os.path.exists(state["input_path"]):
+      self._log("[ERROR] Invalid input file path!")
+      result.error = "invalid_input"
+      return result
+    if not state["output_dir"]:
+      self._log("[ERROR] Invalid output path!")
+      result.error = "invalid_output"
+      return result
+
+    t0 = time.monotonic()
+    store_key = self.store_key
+    try:
+      if store_key is None and state.get("output_store", False):
+        with self._timed("store"):
+          store_key = outstore.make_key(state)
+        # 여러 출력 작업은 공유 디코드 전에 이미 저장소를 확인했다
+        if store_key and not self.es_input and self.restore_output(result, store_key):
+          return result
+      # 저장소와 하드링크로 공유 중인 이전 출력은 제자리에서 덮어쓰지 않도록 먼저 끊는다
+      outstore.unshare(self.options.output_path())
+      if self.es_input:
+        self.probe_paths.add(self.es_input)
+      else:
+        self.stream_copy = result.stream_copy = self.check_stream_copy()
+        self.setup_mezzanine()
+      use_h264 = self.options.use_h264
+      if use_h264:
+        self._log("[FINAL] Generating file with codec H.264")
+        with self._timed("final"):
+          outcome = self.attempt_mux(int(state.get("mux_k", 0)), 0, final_output=True)
+      elif state.get("mux_auto", True):
+        outcome = self._run_auto(result)
+      else:
+        mux = quant50_up(int(state.get("mux_k", 0)))
+        result.mux_k = mux
+        self._log(f"[FINAL] Generating file with user defined MUX={mux}k")
+        es_path = None
+        if self.es_input or self.segments_wanted(media_info(state["input_path"]).duration):
+          # 긴 입력: ES를 구간 병렬로 인코딩한 뒤 한 번만 먹싱
+          ok, es_path = self.encode_elementary()
+          es_path = es_path if ok else None
+        if not self.cancel_requested:
+          with self._timed("final"):
+            outcome = self.attempt_mux(mux, 0, final_output=True, es_path=es_path)
+        else:
+          outcome = None
+
+      if self.cancel_requested:
+        result.cancelled = True
+      elif outcome is None:
+        result.error = "no_safe_mux"
+      else:
+        ok, uf, outpath = outcome
+        result.underflow = uf
+        result.output_path = outpath
+        if uf:
+          self._log("[FAIL] Underflow occurred!")
+        elif not ok:
+          self._log("[FAIL] Failed to generate file")
+          result.error = "ffmpeg_failed"
+        else:
+          result.ok = True
+          try:
+            result.size_bytes = os.path.getsize(outpath) if outpath and os.path.exists(outpath) else 0
+          except OSError:
+            pass
+          self._log("[DONE] Successfully generated file")
+          if store_key:
+            self.store_output(result, store_key)
+    except Exception as e:
+      self._log(f"[EXC] {e}")
+      result.error = str(e) or type(e).__name__
+    finally:
+      for p in list(self.probe_paths):
+        safe_remove(p)
+        self.probe_paths.discard(p)
+      if self._probe_dir:
+        shutil.rmtree(self._probe_dir, ignore_errors=True)
+        self._probe_dir = None
+      if self._journal is not None and result.ok:
+        self._journal.discard()
+        self._journal = None
+      if self.cancel_requested:
+        result.cancelled = True
+      self.timings["total"] = time.monotonic() - t0
+      result.timings = dict(self.timings)
+      result.cpu_seconds = self.cpu_seconds
+      if not result.attempts:
+        result.attempts = list(self.mux_history)
+    return result
+
+def convert(options: ConvertOptions, on_event: EventFn | None = None) -> ConvertResult:
+  """ConvertJob(options).run()의 축약."""
+  return ConvertJob(options, on_event).run()
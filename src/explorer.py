@@ -6,7 +6,7 @@ from tkinter import filedialog
 from src.env import IS_MAC
 from src.util import nfc
 from src.states import set_state, get_state
-from src.cmdline import update_command, update_estimated_size, ffprobe_video_resolution
+from src.mediainfo import media_info
 from src.ui_callbacks import on_res_preset, refresh_letterbox_controls
 
 def _mac_choose_file(prompt="원본 파일 선택"):
@@ -14,6 +14,17 @@ def _mac_choose_file(prompt="원본 파일 선택"):
   script = f'POSIX path of (choose file with prompt "{prompt}")'
   r = subprocess.run(["osascript", "-e", script], capture_output=True, text=True)
   return r.stdout.strip() if r.returncode == 0 and r.stdout.strip() else None
+def _mac_choose_files(prompt="원본 파일 선택"):
+  script = (
+    f'set fs to choose file with prompt "{prompt}" with multiple selections allowed\n'
+    'set out to ""\n'
+    'repeat with f in fs\n'
+    '  set out to out & POSIX path of f & linefeed\n'
+    'end repeat\n'
+    'return out'
+  )
+  r = subprocess.run(["osascript", "-e", script], capture_output=True, text=True)
+  return [l for l in r.stdout.splitlines() if l.strip()] if r.returncode == 0 else []
 def _mac_choose_folder(prompt="출력 폴더 선택"):
   script = f'POSIX path of (choose folder with prompt "{prompt}")'
   r = subprocess.run(["osascript", "-e", script], capture_output=True, text=True)
@@ -23,6 +34,11 @@ def _tk_choose_file():
   path = filedialog.askopenfilename(title="원본 파일 선택")
   root.destroy()
   return path or None
+def _tk_choose_files():
+  root = tk.Tk(); root.withdraw()
+  paths = filedialog.askopenfilenames(title="원본 파일 선택")
+  root.destroy()
+  return list(paths or [])
 def _tk_choose_folder():
   root = tk.Tk(); root.withdraw()
   path = filedialog.askdirectory(title="출력 폴더 선택")
@@ -32,45 +48,59 @@ def pick_file_native():
   if IS_MAC:
     return _mac_choose_file()
   return _tk_choose_file()
+def pick_files_native() -> list[str]:
+  """여러 파일 선택 (큐 추가용)."""
+  if IS_MAC:
+    return _mac_choose_files()
+  return _tk_choose_files()
 def pick_folder_native():
   if IS_MAC:
     return _mac_choose_folder()
   return _tk_choose_folder()
+VIDEO_EXTS = {".mp4", ".m4v", ".mov", ".mkv", ".webm", ".avi", ".wmv", ".flv",
+              ".mpg", ".mpeg", ".m2v", ".ts", ".m2ts", ".ogv"}
+def list_media_files(folder: str) -> list[str]:
+  """폴더(하위 폴더 포함)의 동영상 파일 목록. 숨김 파일/프로브 임시 파일 제외."""
+  out = []
+  for root, dirs, files in os.walk(folder):
+    dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+    for name in sorted(files):
+      if name.startswith("."):
+        continue
+      if os.path.splitext(name)[1].lower() in VIDEO_EXTS:
+        out.append(os.path.join(root, name))
+  return out
 def open_file_native(sender=None, app_data=None, user_data=None):
   path = pick_file_native()
   if not path:
     return
   path = os.path.abspath(path)
 
-  # 입력 파일 경로/이름 반영
-  dpg.set_value("in_path", nfc(path))
-  set_state("input_path", path)
-  base = os.path.splitext(os.path.basename(path))[0]
-  dpg.set_value("out_name", nfc(base))
-  set_state("output_name", base)
-
-  # * 입력 파일과 같은 폴더를 출력 폴더로 자동 설정
-  out_dir = os.path.dirname(path)
-  dpg.set_value("out_dir", nfc(out_dir))
-  set_state("output_dir", out_dir)
+  # 경로/이름/원본 크기/프리셋 해상도를 한 번의 변경으로 (프리뷰/예상 사이즈는 구독으로 갱신)
+  with get_state().batch():
+    # 입력 파일 경로/이름 반영
+    dpg.set_value("in_path", nfc(path))
+    set_state("input_path", path)
+    base = os.path.splitext(os.path.basename(path))[0]
+    dpg.set_value("out_name", nfc(base))
+    set_state("output_name", base)
 
-  src_w, src_h = ffprobe_video_resolution(path)
-  set_state("source_width", src_w)
-  set_state("source_height", src_h)
-  refresh_letterbox_controls()
+    # * 입력 파일과 같은 폴더를 출력 폴더로 자동 설정
+    out_dir = os.path.dirname(path)
+    dpg.set_value("out_dir", nfc(out_dir))
+    set_state("output_dir", out_dir)
 
-  preset = get_state().get("res_preset")
-  if preset in ("720p", "1080p"):
-    on_res_preset("res_preset", preset)
+    info = media_info(path)
+    set_state("source_width", info.width)
+    set_state("source_height", info.height)
+    refresh_letterbox_controls()
 
-  # 프리뷰/예상 사이즈 갱신
-  update_command()
-  update_estimated_size()
+    preset = get_state().get("res_preset")
+    if preset in ("720p", "1080p"):
+      on_res_preset("res_preset", preset)
 def open_dir_native(sender=None, app_data=None, user_data=None):
   path = pick_folder_native()
   if not path:
     return
   dpg.set_value("out_dir", nfc(path))
   set_state("output_dir", path)
-  update_command()
-  update_estimated_size()
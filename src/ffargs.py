@@ -0,0 +1,376 @@
+# ffargs.py
+"""
+ffmpeg 인자 생성 (순수 함수, GUI 의존 없음).
+state를 넘기지 않으면 GUI의 global_state를 사용한다.
+"""
+import os, math, re
+from dataclasses import dataclass
+
+from src.states import get_state
+from src.env import path_native, get_ffmpeg_path
+from src.mediainfo import MediaInfo, media_info
+from src.segments import GOP_FRAMES
+from src.mezzanine import FFV1_ARGS
+
+LETTERBOX_TOLERANCE_PX = 5
+LETTERBOX_BLUR_DOWNSCALE = 4   # 블러 배경을 이 배율로 줄여서 계산
+
+def is_letterbox_needed(state) -> bool:
+  try:
+    w = int(state.get("width", 0))
+    h = int(state.get("height", 0))
+    src_w = int(state.get("source_width", 0))
+    src_h = int(state.get("source_height", 0))
+  except Exception:
+    return True
+  if w <= 0 or h <= 0 or src_w <= 0 or src_h <= 0:
+    return True
+  scaled_w = round(h * src_w / src_h)
+  scaled_h = round(w * src_h / src_w)
+  return not (
+    abs(scaled_w - w) <= LETTERBOX_TOLERANCE_PX and
+    abs(scaled_h - h) <= LETTERBOX_TOLERANCE_PX
+  )
+
+def _normalize_letterbox_color(state) -> tuple[int, int, int]:
+  raw = state.get("letterbox_color", (0, 0, 0))
+  if not isinstance(raw, (list, tuple)):
+    raw = (0, 0, 0)
+  comps: list[float] = []
+  for idx in range(3):
+    try:
+      comps.append(float(raw[idx]))
+    except Exception:
+      comps.append(0.0)
+  max_val = max(comps) if comps else 0.0
+  scale = 255.0 if max_val <= 1.0001 else 1.0
+  result: list[int] = []
+  for value in comps:
+    try:
+      scaled = value * scale if scale == 255.0 else value
+    except Exception:
+      scaled = 0.0
+    result.append(max(0, min(255, int(round(scaled)))))
+  while len(result) < 3:
+    result.append(0)
+  return (result[0], result[1], result[2])
+
+def preset_resolution(preset: str, src_w: int = 0, src_h: int = 0) -> tuple[int, int] | None:
+  """해상도 프리셋 → (w, h). 720p/1080p는 원본 비율 유지(가로 짝수). Custom이면 None."""
+  if preset == "Custom":
+    return None
+  if preset in ("720p", "1080p"):
+    target_h = 720 if preset == "720p" else 1080
+    if src_w > 0 and src_h > 0:
+      target_w = int(round(target_h * src_w / src_h))
+      if target_w % 2:
+        target_w += 1
+    else:
+      target_w = 1280 if target_h == 720 else 1920
+    return (max(1, target_w), target_h)
+  try:
+    w, h = map(int, str(preset).lower().split("x"))
+  except Exception:
+    w, h = 512, 512
+  return (w, h)
+
+def quant50_up(k: int) -> int:
+  """50k 단위 상향 양자화 (2134 -> 2150)"""
+  return int(math.ceil(k / 50.0)) * 50
+def quant50_down(k: int) -> int:
+  """50k 단위 하향 양자화 (2134 -> 2100)"""
+  return (int(k) // 50) * 50
+def _blur_bg_size(w: int, h: int) -> tuple[int, int]:
+  """블러 배경을 만드는 축소 해상도 (짝수, yuv420p 크로마 때문에 최소 8px)."""
+  f = LETTERBOX_BLUR_DOWNSCALE
+  return (max(8, (w // f) & ~1), max(8, (h // f) & ~1))
+# ---------------- 필터 그래프 플래너 ----------------
+# 같은 결과를 내는 가장 싼 체인을 고른다.
+# - fps: 프레임을 줄이면 맨 앞(버릴 프레임은 스케일/패드하지 않음), 늘리면 맨 뒤(복제 전에 한 번만 처리)
+# - 원본 크기 그대로인 scale, 목표 크기 그대로인 pad, 이미 1:1인 setsar는 뺀다
+# - 블러 배경처럼 뭉개질 단계만 빠른 스케일러, 화면에 그대로 보이는 단계는 기본(bicubic) 유지
+# 생략 판단은 ffprobe로 확인한 pix_fmt/sar가 있을 때만 한다. 모르면 예전과 같은 보수적인 체인.
+
+@dataclass(frozen=True)
+class FilterPlan:
+  filter_type: str                 # "filter:v" | "filter_complex"
+  expr: str
+  map_output: str | None = None
+  skipped: tuple[str, ...] = ()    # 생략한 단계 (디버그용)
+
+  def as_tuple(self) -> tuple[str, str, str | None]:
+    return (self.filter_type, self.expr, self.map_output)
+
+def _fit_decrease(src_w: int, src_h: int, w: int, h: int) -> tuple[int, int]:
+  """scale=w:h:force_original_aspect_ratio=decrease 결과 크기 (ffmpeg av_rescale과 같은 반올림)."""
+  tmp_w = (h * src_w + src_h // 2) // src_h
+  tmp_h = (w * src_h + src_w // 2) // src_w
+  return (min(w, tmp_w), min(h, tmp_h))
+
+def _exact_source(info: MediaInfo | None) -> bool:
+  """크기/픽셀 형식/SAR까지 믿을 수 있는 정보인가 (헤더 파서 결과는 pix_fmt/sar가 비어 있음)."""
+  return (info is not None and not info.native and info.width > 0 and info.height > 0
+          and info.pix_fmt == "yuv420p")
+
+def _square_pixels(info: MediaInfo) -> bool:
+  # 0:1(미지정)은 setsar=1을 빼면 출력 헤더의 화면비 정보가 달라질 수 있으므로 정사각으로 보지 않는다
+  return info.sar == "1:1"
+
+def _source_info(state, w: int, h: int) -> MediaInfo | None:
+  """플래너용 입력 정보. 단계를 생략할 수 있어 보일 때만 ffprobe(exact)로 보강한다."""
+  path = state.get("input_path", "")
+  if not path:
+    return None
+  info = media_info(path)
+  if info.native and info.width > 0 and info.height > 0:
+    src = (info.width, info.height)
+    if src == (w, h) or _fit_decrease(info.width, info.height, w, h) == src:
+      info = media_info(path, exact=True)
+  return info
+
+def plan_video_filter(state, fps: float, info: MediaInfo | None = None) -> FilterPlan:
+  w = int(state.get("width", 0))
+  h = int(state.get("height", 0))
+  if w <= 0 or h <= 0:
+    return FilterPlan("filter:v", f'scale={w}:{h},setsar=1,fps={fps}')
+
+  exact = _exact_source(info)
+  src_fps = info.fps if info is not None else 0.0
+  fps_first = not (0 < src_fps < float(fps) - 1e-3)
+  skipped: list[str] = []
+
+  def chain(stages: list[str]) -> str:
+    fps_stage = f'fps={fps}'
+    return ",".join([fps_stage, *stages] if fps_first else [*stages, fps_stage])
+
+  if not is_letterbox_needed(state):
+    stages = []
+    scale_skip = exact and (info.width, info.height) == (w, h)
+    if scale_skip:
+      skipped.append("scale")
+    else:
+      stages.append(f'scale={w}:{h}')
+    if scale_skip and _square_pixels(info):
+      skipped.append("setsar")
+    else:
+      stages.append('setsar=1')
+    return FilterPlan("filter:v", chain(stages), None, tuple(skipped))
+
+  fit_skip = exact and _fit_decrease(info.width, info.height, w, h) == (info.width, info.height)
+  fit = f'scale={w}:{h}:force_original_aspect_ratio=decrease'
+
+  mode = str(state.get("letterbox_mode", "black") or "black").lower()
+  if mode == "blur":
+    radius = state.get("letterbox_blur_radius", 20)
+    try:
+      radius = int(radius)
+    except Exception:
+      radius = 20
+    radius = max(4, min(120, radius))
+    brightness = state.get("letterbox_blur_brightness", 100)
+    try:
+      brightness = int(brightness)
+    except Exception:
+      brightness = 100
+    brightness = max(20, min(100, brightness))
+    brightness_factor = brightness / 100.0
+    brightness_filter = ""
+    if brightness < 100:
+      brightness_expr = f"{brightness_factor:.3f}".rstrip("0").rstrip(".")
+      if not brightness_expr:
+        brightness_expr = "1"
+      brightness_filter = f",lutyuv=y='val*{brightness_expr}':u=val:v=val"
+    # 디코드 한 번을 split으로 나눈다. 배경은 1/LETTERBOX_BLUR_DOWNSCALE 크기에서
+    # (반경도 같은 비율로 줄여) 블러한 뒤 키운다. 어차피 뭉개지므로 축소는 fast_bilinear.
+    bw, bh = _blur_bg_size(w, h)
+    bg_radius = max(1, min(round(radius / LETTERBOX_BLUR_DOWNSCALE), min(bw, bh) // 4 - 1))
+    if fit_skip:
+      skipped.append("scale")
+    fg = "[lb_fg_src]" if fit_skip else "[lb_fg]"
+    vf = (
+      f'[0:v]{"fps=" + str(fps) + "," if fps_first else ""}split=2[lb_src][lb_fg_src];'
+      f'[lb_src]scale={bw}:{bh}:force_original_aspect_ratio=increase:flags=fast_bilinear,'
+      f'crop={bw}:{bh}:(iw-ow)/2:(ih-oh)/2,boxblur={bg_radius}{brightness_filter},'
+      f'scale={w}:{h}:flags=bilinear[lb_bg];'
+      + ("" if fit_skip else f'[lb_fg_src]{fit}[lb_fg];') +
+      f'[lb_bg]{fg}overlay=(main_w-overlay_w)/2:(main_h-overlay_h)/2,'
+      f'setsar=1{"" if fps_first else ",fps=" + str(fps)}[vout]'
+    )
+    return FilterPlan("filter_complex", vf, "[vout]", tuple(skipped))
+
+  pad = f'pad={w}:{h}:(ow-iw)/2:(oh-ih)/2'
+  if mode == "solid":
+    r, g, b = _normalize_letterbox_color(state)
+    pad = f'{pad}:color=0x{r:02x}{g:02x}{b:02x}'
+
+  stages = []
+  if fit_skip:
+    skipped.append("scale")
+    fitted = (info.width, info.height)
+  else:
+    stages.append(fit)
+    fitted = _fit_decrease(info.width, info.height, w, h) if exact else None
+  if fitted == (w, h):
+    skipped.append("pad")
+  else:
+    stages.append(pad)
+  if fit_skip and _square_pixels(info):
+    skipped.append("setsar")
+  else:
+    stages.append('setsar=1')
+  return FilterPlan("filter:v", chain(stages), None, tuple(skipped))
+
+def _build_letterbox_filter(state, fps: float) -> tuple[str, str, str | None]:
+  w, h = int(state.get("width", 0)), int(state.get("height", 0))
+  info = _source_info(state, w, h) if w > 0 and h > 0 else None
+  return plan_video_filter(state, fps, info).as_tuple()
+# ---------------- stream copy ----------------
+STREAM_COPY_BITRATE_TOLERANCE = 0.05   # 원본 비트레이트가 목표보다 이만큼까지 높아도 허용
+COPY_CODECS = {"MPEG1": "mpeg1video", "H.264": "h264"}
+
+def stream_copy_check(state, info: MediaInfo) -> str:
+  """
+  원본 비디오 스트림을 재인코딩 없이(-c:v copy) 그대로 담아도 되는지. 되면 "", 안 되면 이유.
+  info는 ffprobe 결과(exact)여야 한다: 코덱/크기/fps/pix_fmt/SAR/비트레이트가 모두 목표와 맞아야 함.
+  """
+  if info.native or not info.ok:
+    return "no exact probe"
+  codec = COPY_CODECS.get(str(state.get("codec", "MPEG1")))
+  if info.codec != codec:
+    return f"codec {info.codec or '?'} != {codec}"
+  w, h = int(state.get("width", 0)), int(state.get("height", 0))
+  if (info.width, info.height) != (w, h):
+    return f"size {info.width}x{info.height} != {w}x{h}"
+  fps = float(state["fps"] if not state["fps_locked"] else 30)
+  if abs(info.fps - fps) > 1e-3:
+    return f"fps {info.fps:g} != {fps:g}"
+  if info.pix_fmt != "yuv420p":
+    return f"pix_fmt {info.pix_fmt or '?'}"
+  if info.sar != "1:1":
+    return f"sar {info.sar or '?'}"
+  br = int(state.get("bitrate_k", 0)) * 1000
+  if info.bit_rate <= 0 or info.bit_rate > br * (1 + STREAM_COPY_BITRATE_TOLERANCE):
+    return f"bitrate {info.bit_rate // 1000}k > {br // 1000}k"
+  return ""
+
+def _out_path(p: str) -> str:
+  # null 싱크(os.devnull)는 경로 정규화하지 않음 (Windows의 NUL)
+  return p if p == os.devnull else path_native(p)
+def _video_encode_args(state) -> list[str]:
+  fps = state["fps"] if not state["fps_locked"] else 30
+  br = state["bitrate_k"]
+  buf = state["buffer_k"] if not state["buffer_locked"] else 2900
+  use_h264 = (state.get("codec", "MPEG1") == "H.264")
+  return ["-r", str(fps), "-fps_mode", "cfr",
+          "-c:v", "libx264" if use_h264 else "mpeg1video", "-pix_fmt", "yuv420p",
+          "-g", str(GOP_FRAMES), "-keyint_min", "1", "-bf", "2", "-sc_threshold", "40",
+          "-b:v", f"{br}k", "-minrate", f"{br}k", "-maxrate", f"{br}k", "-bufsize", f"{buf}k"]
+def build_ffmpeg_args(state=None, *, override_mux_k: int | None = None, override_outpath: str | None = None,
+                      elementary: bool = False, window: tuple[float, float] | None = None,
+                      stream_copy: bool = False, frames: int | None = None, closed_gop: bool = False,
+                      mezzanine_in: str | None = None, mezzanine_out: str | None = None) -> list[str]:
+  state = get_state() if state is None else state
+  w = state["width"]
+  h = state["height"]
+  fps = state["fps"] if not state["fps_locked"] else 30
+  codec = state.get("codec", "MPEG1")
+  use_h264 = (codec == "H.264")
+  mux = override_mux_k if override_mux_k is not None else state["mux_k"]
+  if not use_h264:
+    mux = quant50_up(int(mux))  # 50k 정렬
+
+  inpath = state["input_path"]
+  outdir = state["output_dir"]
+  outname = state["output_name"] or "output"
+  ext = "mp4" if use_h264 else "mpg"
+  outpath = override_outpath if override_outpath else os.path.join(outdir if outdir else ".", f"{outname}.{ext}")
+
+  args = [get_ffmpeg_path(), "-hide_banner", "-y", "-fflags", "+genpts"]
+  if window is not None:
+    # 입력 구간만 인코딩 (시작은 키프레임 정렬을 가정한 빠른 탐색)
+    args.extend(["-ss", f"{window[0]:.3f}", "-t", f"{window[1]:.3f}"])
+  if mezzanine_in:
+    # 이미 필터를 거친 캐시(mezzanine)에서 읽는다 → 필터 없이 인코딩만
+    args.extend(["-i", path_native(mezzanine_in)])
+  else:
+    args.extend(["-i", path_native(inpath) if inpath else "IN.MP4"])
+  if stream_copy:
+    # 원본이 이미 목표 규격 (stream_copy_check 통과) → 디코드/인코딩 없이 다시 담기만
+    args.extend(["-c:v", "copy"])
+  else:
+    if not mezzanine_in:
+      filter_type, filter_expr, map_output = _build_letterbox_filter(state, fps)
+      if mezzanine_out:
+        # 필터 결과를 split해서 무손실 캐시 파일에도 쓴다 (본 출력은 마지막 인자로 유지)
+        if filter_type == "filter:v":
+          filter_expr = f"[0:v]{filter_expr}[vout]"
+        filter_expr = filter_expr[:-len("[vout]")] + ",split=2[vout][mezz]"
+        filter_type, map_output = "filter_complex", "[vout]"
+      args.extend([f"-{filter_type}", filter_expr])
+      if mezzanine_out:
+        args.extend(["-map", "[mezz]", *FFV1_ARGS, _out_path(mezzanine_out)])
+      if map_output:
+        args.extend(["-map", map_output])
+    args.extend(_video_encode_args(state))
+  # 구간 인코딩: 정확히 frames장, 닫힌 GOP로 → 이어 붙인 ES가 한 번에 인코딩한 것처럼 이어진다
+  if frames is not None:
+    args.extend(["-frames:v", str(int(frames))])
+  if closed_gop and not stream_copy:
+    args.extend(["-flags", "+cgop"])
+  if use_h264:
+    args.extend([
+      "-movflags", "+faststart",
+      "-an", "-f", "mp4", _out_path(outpath)
+    ])
+  elif elementary:
+    # MUX 탐색용 원시 스트림(ES). -muxrate는 먹서에만 영향을 주므로 인코딩은 한 번이면 충분
+    args.extend([
+      "-an", "-f", "mpeg1video", _out_path(outpath)
+    ])
+  else:
+    args.extend([
+      "-muxrate", f"{mux}k",
+      "-an", "-f", "mpeg", _out_path(outpath)
+    ])
+  return args
+def build_remux_args(es_path: str, mux_k: int, outpath: str, state=None) -> list[str]:
+  """인코딩된 ES를 재인코딩 없이 주어진 muxrate로 MPEG-PS에 다시 담는 명령."""
+  state = get_state() if state is None else state
+  fps = state["fps"] if not state["fps_locked"] else 30
+  return [
+    get_ffmpeg_path(), "-hide_banner", "-y", "-fflags", "+genpts",
+    "-r", str(fps), "-i", path_native(es_path),
+    "-c:v", "copy", "-muxrate", f"{quant50_up(int(mux_k))}k",
+    "-an", "-f", "mpeg", _out_path(outpath)
+  ]
+
+# ---------------- 한 번 디코드, 여러 출력 ----------------
+_LABEL_RE = re.compile(r"\[(?!0:v\])([^\]]+)\]")
+
+def _branch_filter(state, fps: float, idx: int) -> str:
+  """출력 idx의 필터 체인을 [in{idx}] → [vout_{idx}] 로 (블러 그래프의 내부 라벨도 출력마다 따로)."""
+  filter_type, expr, _ = _build_letterbox_filter(state, fps)
+  if filter_type == "filter:v":
+    return f"[in{idx}]{expr}[vout_{idx}]"
+  return _LABEL_RE.sub(lambda m: f"[{m.group(1)}_{idx}]", expr).replace("[0:v]", f"[in{idx}]")
+
+def build_multi_args(states: list, outpaths: list[str]) -> list[str]:
+  """
+  입력을 한 번만 디코드해 split으로 나누고 출력마다 자기 필터/인코더로 보내는 명령.
+  MPEG-1 출력은 ES(-f mpeg1video: MUX는 출력별로 나중에 리먹싱), H.264 출력은 최종 mp4.
+  states[0]의 입력을 쓴다. 마지막 인자는 마지막 출력 경로.
+  """
+  inpath = states[0]["input_path"]
+  args = [get_ffmpeg_path(), "-hide_banner", "-y", "-fflags", "+genpts",
+          "-i", path_native(inpath) if inpath else "IN.MP4"]
+  graph = [f"[0:v]split={len(states)}" + "".join(f"[in{i}]" for i in range(len(states)))]
+  for i, st in enumerate(states):
+    graph.append(_branch_filter(st, st["fps"] if not st["fps_locked"] else 30, i))
+  args.extend(["-filter_complex", ";".join(graph)])
+  for i, (st, outpath) in enumerate(zip(states, outpaths)):
+    args.extend(["-map", f"[vout_{i}]", *_video_encode_args(st)])
+    if st.get("codec", "MPEG1") == "H.264":
+      args.extend(["-movflags", "+faststart", "-an", "-f", "mp4", _out_path(outpath)])
+    else:
+      args.extend(["-an", "-f", "mpeg1video", _out_path(outpath)])
+  return args
@@ -0,0 +1,209 @@
+# jobqueue.py
+"""
+다중 파일 변환 큐 (GUI 의존 없음).
+항목마다 설정 스냅샷(ConvertOptions)을 가지고, 정해진 수의 워커 스레드가 순서대로 꺼내 실행한다.
+상태 변화는 리스너(item_id, kind)로 알린다: kind = "added" | "status" | "progress" | "log" | "removed"
+"""
+import itertools, threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+from src.engine import ConvertJob, ConvertOptions, ConvertResult
+from src.logstore import LogStore
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+MAX_LOG_LINES = 2000
+
+@dataclass
+class QueueItem:
+  id: int
+  options: ConvertOptions
+  status: str = QUEUED
+  progress: float = 0.0
+  log: LogStore = field(default_factory=lambda: LogStore(max_lines=MAX_LOG_LINES))
+  result: ConvertResult | None = None
+  job: ConvertJob | None = None
+
+  @property
+  def name(self) -> str:
+    return self.options.output_name or self.options.input_path
+
+Listener = Callable[[int, str], None]
+
+class JobQueue:
+  def __init__(self, workers: int = 2):
+    self._lock = threading.Lock()
+    self._cv = threading.Condition(self._lock)
+    self._items: dict[int, QueueItem] = {}
+    self._pending: deque[int] = deque()
+    self._ids = itertools.count(1)
+    self._listeners: list[Listener] = []
+    self._threads: list[threading.Thread] = []
+    self._target_workers = max(1, int(workers))
+    self._busy = 0
+
+  # ── 리스너
+  def on_change(self, cb: Listener) -> None:
+    self._listeners.append(cb)
+
+  def _notify(self, item_id: int, kind: str) -> None:
+    for cb in list(self._listeners):
+      try:
+        cb(item_id, kind)
+      except Exception:
+        pass
+
+  # ── 조회
+  def items(self) -> list[QueueItem]:
+    with self._lock:
+      return list(self._items.values())
+
+  def get(self, item_id: int) -> QueueItem | None:
+    with self._lock:
+      return self._items.get(item_id)
+
+  def counts(self) -> dict[str, int]:
+    out = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+    with self._lock:
+      for it in self._items.values():
+        out[it.status] = out.get(it.status, 0) + 1
+    return out
+
+  # ── 조작
+  def add(self, options: ConvertOptions) -> int:
+    with self._cv:
+      item_id = next(self._ids)
+      self._items[item_id] = QueueItem(id=item_id, options=options)
+      self._pending.append(item_id)
+      self._ensure_workers()
+      self._cv.notify()
+    self._notify(item_id, "added")
+    return item_id
+
+  def cancel(self, item_id: int) -> None:
+    with self._cv:
+      it = self._items.get(item_id)
+      if it is None:
+        return
+      job = it.job if it.status == RUNNING else None
+      if it.status == QUEUED:
+        try:
+          self._pending.remove(item_id)
+        except ValueError:
+          pass
+        it.status = CANCELLED
+    if job is not None:
+      job.cancel()
+    self._notify(item_id, "status")
+
+  def cancel_all(self) -> None:
+    for it in self.items():
+      if it.status in (QUEUED, RUNNING):
+        self.cancel(it.id)
+
+  def retry(self, item_id: int) -> None:
+    """실패/취소된 항목을 같은 설정으로 다시 대기열에 넣는다."""
+    with self._cv:
+      it = self._items.get(item_id)
+      if it is None or it.status not in (FAILED, CANCELLED, DONE):
+        return
+      it.status, it.progress, it.result, it.job = QUEUED, 0.0, None, None
+      it.log.clear()
+      self._pending.append(item_id)
+      self._ensure_workers()
+      self._cv.notify()
+    self._notify(item_id, "status")
+
+  def remove(self, item_id: int) -> None:
+    with self._cv:
+      it = self._items.get(item_id)
+      if it is None or it.status == RUNNING:
+        return
+      if it.status == QUEUED:
+        try:
+          self._pending.remove(item_id)
+        except ValueError:
+          pass
+      del self._items[item_id]
+    self._notify(item_id, "removed")
+
+  def clear_finished(self) -> None:
+    for it in self.items():
+      if it.status in (DONE, FAILED, CANCELLED):
+        self.remove(it.id)
+
+  def set_workers(self, n: int) -> None:
+    """동시 실행 수 변경. 줄이면 실행 중인 작업이 끝난 워커부터 물러난다."""
+    with self._cv:
+      self._target_workers = max(1, int(n))
+      self._ensure_workers()
+      self._cv.notify_all()
+
+  @property
+  def workers(self) -> int:
+    return self._target_workers
+
+  # ── 워커
+  def _ensure_workers(self) -> None:
+    # lock 보유 상태에서 호출
+    self._threads = [t for t in self._threads if t.is_alive()]
+    while len(self._threads) < self._target_workers and len(self._threads) < len(self._pending) + self._busy:
+      t = threading.Thread(target=self._worker, daemon=True)
+      self._threads.append(t)
+      t.start()
+
+  def _worker(self) -> None:
+    me = threading.current_thread()
+    while True:
+      with self._cv:
+        while True:
+          if self._threads.index(me) >= self._target_workers:
+            # 워커 수를 줄였음 → 물러남
+            self._threads.remove(me)
+            return
+          if self._pending:
+            break
+          if not self._cv.wait(timeout=30) and not self._pending:
+            # 한동안 할 일이 없으면 종료 (add 시 다시 생성)
+            self._threads.remove(me)
+            return
+        item_id = self._pending.popleft()
+        it = self._items.get(item_id)
+        if it is None or it.status != QUEUED:
+          continue
+        it.status = RUNNING
+        it.log.open_file(it.name)
+        it.job = ConvertJob(it.options, self._event_fn(item_id))
+        job = it.job
+        self._busy += 1
+      self._notify(item_id, "status")
+      try:
+        res = job.run()
+      except Exception as e:
+        res = ConvertResult(input_path=it.options.input_path, error=str(e))
+      with self._cv:
+        self._busy -= 1
+        it.log.close_file()
+        it.result = res
+        it.job = None
+        if res.cancelled or it.status == CANCELLED:
+          it.status = CANCELLED
+        else:
+          it.status = DONE if res.ok else FAILED
+          if res.ok:
+            it.progress = 1.0
+      self._notify(item_id, "status")
+
+  def _event_fn(self, item_id: int):
+    def _on_event(kind: str, **data):
+      it = self._items.get(item_id)
+      if it is None:
+        return
+      if kind == "progress":
+        it.progress = float(data["frac"])
+        self._notify(item_id, "progress")
+      elif kind == "log":
+        it.log.append(data["msg"])
+        self._notify(item_id, "log")
+    return _on_event
@@ -0,0 +1,184 @@
+# logstore.py
+"""
+로그 저장소 (GUI 의존 없음).
+- LogStore: 줄 수/바이트 상한이 있는 링 버퍼. 새 줄만 NFC 정규화하고, version으로 변경 여부를 알린다
+  (화면은 version이 바뀐 프레임에서만 text()를 다시 그리면 된다).
+- LogFile: 작업별 전체 로그 파일. 실제 쓰기는 백그라운드 writer 스레드 하나가 모아서 처리한다.
+"""
+import atexit, queue, re, threading, time
+from collections import deque
+from pathlib import Path
+
+from src.config import user_config_dir
+from src.util import nfc
+
+MAX_LINES = 5000
+MAX_BYTES = 1024 * 1024
+KEEP_LOG_FILES = 100
+
+class LogStore:
+  def __init__(self, max_lines: int = MAX_LINES, max_bytes: int = MAX_BYTES):
+    self.max_lines = max_lines
+    self.max_bytes = max_bytes
+    self.version = 0          # append/clear마다 증가
+    self.dropped = 0          # 상한 때문에 화면에서 밀려난 줄 수 (파일에는 남아 있음)
+    self._lines: deque[str] = deque()
+    self._sizes: deque[int] = deque()
+    self._bytes = 0
+    self._lock = threading.Lock()
+    self._text_cache: tuple[int, str] = (-1, "")
+    self._file: LogFile | None = None
+
+  def append(self, msg: str) -> None:
+    line = nfc(msg.rstrip())
+    size = len(line.encode("utf-8")) + 1
+    with self._lock:
+      self._lines.append(line)
+      self._sizes.append(size)
+      self._bytes += size
+      while len(self._lines) > 1 and (len(self._lines) > self.max_lines or self._bytes > self.max_bytes):
+        self._lines.popleft()
+        self._bytes -= self._sizes.popleft()
+        self.dropped += 1
+      self.version += 1
+      f = self._file
+    if f is not None:
+      f.write(line)
+
+  def clear(self) -> None:
+    with self._lock:
+      self._lines.clear()
+      self._sizes.clear()
+      self._bytes = 0
+      self.dropped = 0
+      self.version += 1
+
+  def lines(self) -> list[str]:
+    with self._lock:
+      return list(self._lines)
+
+  def text(self) -> str:
+    """화면용 전체 텍스트. 같은 version이면 캐시를 그대로 돌려준다."""
+    with self._lock:
+      ver, txt = self._text_cache
+      if ver != self.version:
+        txt = "".join(line + "\n" for line in self._lines)
+        self._text_cache = (self.version, txt)
+      return txt
+
+  # ── 파일
+  @property
+  def path(self) -> str:
+    f = self._file
+    return f.path if f is not None else ""
+
+  def open_file(self, name: str) -> str:
+    """이후 append되는 줄을 새 로그 파일에도 쓴다. 이전 파일은 닫는다. (파일 경로)"""
+    self.close_file()
+    self._file = LogFile(new_log_path(name))
+    return self._file.path
+
+  def close_file(self) -> None:
+    f, self._file = self._file, None
+    if f is not None:
+      f.close()
+
+# ---------------- 작업별 로그 파일 ----------------
+
+def log_dir() -> Path:
+  p = user_config_dir() / "logs"
+  p.mkdir(parents=True, exist_ok=True)
+  return p
+
+def _prune_logs(d: Path, keep: int = KEEP_LOG_FILES) -> None:
+  try:
+    files = sorted(d.glob("*.log"), key=lambda p: p.stat().st_mtime)
+  except OSError:
+    return
+  for p in files[:max(0, len(files) - keep)]:
+    try:
+      p.unlink()
+    except OSError:
+      pass
+
+def new_log_path(name: str) -> str:
+  d = log_dir()
+  _prune_logs(d)
+  safe = re.sub(r'[\\/:*?"<>|\s]+', "_", name or "job").strip("._")[:60] or "job"
+  base = d / f"{time.strftime('%Y%m%d-%H%M%S')}-{safe}"
+  path, n = base.with_suffix(".log"), 1
+  while path.exists():
+    n += 1
+    path = Path(f"{base}-{n}.log")
+  return str(path)
+
+class LogFile:
+  """write()는 큐에 넣기만 한다 (호출 스레드는 디스크를 기다리지 않음)."""
+
+  def __init__(self, path: str):
+    self.path = path
+    self._fh = None
+    _writer.put(("open", self, ""))
+
+  def write(self, line: str) -> None:
+    _writer.put(("write", self, line))
+
+  def close(self) -> None:
+    _writer.put(("close", self, ""))
+
+class _Writer:
+  """모든 LogFile의 쓰기를 처리하는 백그라운드 스레드 하나. 큐가 빌 때마다 flush."""
+
+  def __init__(self):
+    self._q: queue.SimpleQueue = queue.SimpleQueue()
+    self._thread: threading.Thread | None = None
+    self._lock = threading.Lock()
+    self._dirty: set[LogFile] = set()
+
+  def put(self, item) -> None:
+    self._q.put(item)
+    with self._lock:
+      if self._thread is None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+  def _run(self) -> None:
+    while True:
+      item = self._q.get()
+      if item is None:
+        self._flush()
+        return
+      op, f, line = item
+      try:
+        if op == "write":
+          if f._fh is not None:
+            f._fh.write(line + "\n")
+            self._dirty.add(f)
+        elif op == "open":
+          f._fh = open(f.path, "a", encoding="utf-8")
+        elif f._fh is not None:
+          f._fh.close()
+          f._fh = None
+          self._dirty.discard(f)
+      except OSError:
+        pass
+      if self._q.empty():
+        self._flush()
+
+  def _flush(self) -> None:
+    for f in list(self._dirty):
+      try:
+        if f._fh is not None:
+          f._fh.flush()
+      except OSError:
+        pass
+    self._dirty.clear()
+
+  def shutdown(self, timeout: float = 2.0) -> None:
+    t = self._thread
+    if t is not None and t.is_alive():
+      self._q.put(None)
+      t.join(timeout)
+
+_writer = _Writer()
+atexit.register(_writer.shutdown)
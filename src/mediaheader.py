@@ -0,0 +1,373 @@
+# mediaheader.py
+"""
+프로세스를 띄우지 않는 컨테이너 헤더 파서 (mmap, 헤더 페이지만 읽음).
+MP4/MOV, Matroska/WebM, AVI, MPEG-PS에서 길이/해상도/fps/코덱을 바로 얻는다.
+확신할 수 없으면 None → 호출 측이 ffprobe로 폴백.
+"""
+import mmap, os, struct
+
+PS_SCAN_BYTES = 4 * 1024 * 1024    # MPEG-PS: 시퀀스 헤더/마지막 SCR을 찾을 앞뒤 범위
+
+# MP4 fourcc → ffprobe codec_name
+_MP4_CODECS = {
+  b"avc1": "h264", b"avc3": "h264", b"hvc1": "hevc", b"hev1": "hevc",
+  b"mp4v": "mpeg4", b"av01": "av1", b"vp09": "vp9", b"mjpa": "mjpeg", b"jpeg": "mjpeg",
+  b"apcn": "prores", b"apch": "prores", b"apcs": "prores", b"apco": "prores", b"ap4h": "prores",
+}
+_MKV_CODECS = {
+  "V_MPEG4/ISO/AVC": "h264", "V_MPEGH/ISO/HEVC": "hevc", "V_VP8": "vp8", "V_VP9": "vp9",
+  "V_AV1": "av1", "V_MPEG1": "mpeg1video", "V_MPEG2": "mpeg2video", "V_MJPEG": "mjpeg",
+  "V_MPEG4/ISO/ASP": "mpeg4", "V_THEORA": "theora", "V_PRORES": "prores",
+}
+_AVI_CODECS = {
+  "XVID": "mpeg4", "DIVX": "mpeg4", "DX50": "mpeg4", "FMP4": "mpeg4", "MP4V": "mpeg4",
+  "H264": "h264", "X264": "h264", "AVC1": "h264", "MJPG": "mjpeg", "MPG1": "mpeg1video",
+  "MPG2": "mpeg2video", "WMV3": "wmv3", "WMV2": "wmv2", "WMV1": "wmv1", "VP80": "vp8",
+}
+# MPEG-1/2 frame_rate_code
+_PS_FPS = {1: 24000 / 1001, 2: 24.0, 3: 25.0, 4: 30000 / 1001, 5: 30.0, 6: 50.0, 7: 60000 / 1001, 8: 60.0}
+
+def parse_header(path: str) -> dict | None:
+  """
+  {"duration", "width", "height", "fps", "codec", "nb_frames"} (알 수 없는 값은 0/"").
+  길이와 해상도를 모두 얻지 못하면 None.
+  """
+  try:
+    with open(path, "rb") as f:
+      size = os.fstat(f.fileno()).st_size
+      if size < 16:
+        return None
+      with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        head = mm[:12]
+        if head[4:8] in (b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip"):
+          info = _parse_mp4(mm, size)
+        elif head[:4] == b"\x1a\x45\xdf\xa3":
+          info = _parse_mkv(mm, size)
+        elif head[:4] == b"RIFF" and head[8:12] in (b"AVI ", b"AVIX"):
+          info = _parse_avi(mm, size)
+        elif head[:4] == b"\x00\x00\x01\xba":
+          info = _parse_ps(mm, size)
+        else:
+          info = None
+  except (OSError, ValueError, struct.error, IndexError):
+    return None
+  if not info or info.get("duration", 0) <= 0 or info.get("width", 0) <= 0 or info.get("height", 0) <= 0:
+    return None
+  return info
+
+# ---------------- MP4 / MOV ----------------
+
+def _boxes(mm, start: int, end: int):
+  """(type, 내용 시작, 박스 끝) 순회."""
+  pos = start
+  while pos + 8 <= end:
+    size, typ = struct.unpack_from(">I4s", mm, pos)
+    hdr = 8
+    if size == 1:
+      size = struct.unpack_from(">Q", mm, pos + 8)[0]
+      hdr = 16
+    elif size == 0:
+      size = end - pos
+    if size < hdr or pos + size > end:
+      return
+    yield (typ, pos + hdr, pos + size)
+    pos += size
+
+def _child(mm, start: int, end: int, typ: bytes):
+  for t, s, e in _boxes(mm, start, end):
+    if t == typ:
+      return (s, e)
+  return None
+
+def _parse_mp4(mm, size: int) -> dict | None:
+  moov = _child(mm, 0, size, b"moov")
+  if moov is None:
+    return None
+  duration = 0.0
+  mvhd = _child(mm, *moov, b"mvhd")
+  if mvhd is not None:
+    s = mvhd[0]
+    if mm[s] == 1:
+      timescale, dur = struct.unpack_from(">IQ", mm, s + 20)
+    else:
+      timescale, dur = struct.unpack_from(">II", mm, s + 12)
+    if timescale:
+      duration = dur / timescale
+
+  for t, s, e in _boxes(mm, *moov):
+    if t != b"trak":
+      continue
+    mdia = _child(mm, s, e, b"mdia")
+    if mdia is None:
+      continue
+    hdlr = _child(mm, *mdia, b"hdlr")
+    if hdlr is None or mm[hdlr[0] + 8:hdlr[0] + 12] != b"vide":
+      continue
+
+    w = h = 0
+    tkhd = _child(mm, s, e, b"tkhd")
+    if tkhd is not None:
+      off = tkhd[0] + (88 if mm[tkhd[0]] == 1 else 76)
+      tw, th = struct.unpack_from(">II", mm, off)
+      w, h = tw >> 16, th >> 16
+
+    fps, frames, codec, trk_dur = 0.0, 0, "", 0.0
+    mdhd = _child(mm, *mdia, b"mdhd")
+    timescale = 0
+    if mdhd is not None:
+      ms = mdhd[0]
+      if mm[ms] == 1:
+        timescale, mdur = struct.unpack_from(">IQ", mm, ms + 20)
+      else:
+        timescale, mdur = struct.unpack_from(">II", mm, ms + 12)
+      if timescale:
+        trk_dur = mdur / timescale
+    minf = _child(mm, *mdia, b"minf")
+    stbl = _child(mm, *minf, b"stbl") if minf else None
+    if stbl is not None:
+      stsd = _child(mm, *stbl, b"stsd")
+      if stsd is not None and stsd[1] - stsd[0] >= 8 + 8 + 36:
+        entry = stsd[0] + 8
+        fourcc = mm[entry + 4:entry + 8]
+        codec = _MP4_CODECS.get(bytes(fourcc), bytes(fourcc).decode("latin-1").strip())
+        # VisualSampleEntry: 헤더 8 + reserved 6 + dref 2 + pre_defined/reserved 16 → width, height
+        cw, ch = struct.unpack_from(">HH", mm, entry + 32)
+        if cw and ch:
+          w, h = cw, ch
+      stts = _child(mm, *stbl, b"stts")
+      if stts is not None:
+        n = struct.unpack_from(">I", mm, stts[0] + 4)[0]
+        total = 0
+        for i in range(min(n, (stts[1] - stts[0] - 8) // 8)):
+          total += struct.unpack_from(">I", mm, stts[0] + 8 + i * 8)[0]
+        frames = total
+        if trk_dur > 0 and frames:
+          fps = frames / trk_dur
+    return {
+      "duration": duration or trk_dur,
+      "width": w, "height": h,
+      "fps": fps, "codec": codec, "nb_frames": frames,
+    }
+  return None
+
+# ---------------- Matroska / WebM ----------------
+
+_EBML_UNKNOWN = -1
+
+def _vint(mm, pos: int, *, keep_marker: bool) -> tuple[int, int]:
+  """EBML 가변 길이 정수 → (값, 길이)."""
+  first = mm[pos]
+  if first == 0:
+    raise ValueError("bad vint")
+  length = 8 - first.bit_length() + 1
+  val = first if keep_marker else first & ((1 << (8 - length)) - 1)
+  all_ones = val == (1 << (8 - length)) - 1
+  for i in range(1, length):
+    b = mm[pos + i]
+    val = (val << 8) | b
+    all_ones = all_ones and b == 0xFF
+  if not keep_marker and all_ones:
+    return (_EBML_UNKNOWN, length)
+  return (val, length)
+
+def _elements(mm, start: int, end: int):
+  """(id, 데이터 시작, 데이터 끝) 순회. 크기 미정(unknown)이면 end까지."""
+  pos = start
+  while pos < end:
+    eid, il = _vint(mm, pos, keep_marker=True)
+    size, sl = _vint(mm, pos + il, keep_marker=False)
+    data = pos + il + sl
+    stop = end if size == _EBML_UNKNOWN else min(end, data + size)
+    yield (eid, data, stop)
+    if size == _EBML_UNKNOWN:
+      return
+    pos = stop
+
+def _uint(mm, s: int, e: int) -> int:
+  return int.from_bytes(mm[s:e], "big") if e > s else 0
+
+def _parse_mkv(mm, size: int) -> dict | None:
+  seg = None
+  for eid, s, e in _elements(mm, 0, size):
+    if eid == 0x18538067:
+      seg = (s, e)
+      break
+  if seg is None:
+    return None
+
+  info = tracks = None
+  for eid, s, e in _elements(mm, *seg):
+    if eid == 0x114D9B74:           # SeekHead → Info/Tracks 위치로 바로 점프
+      for sid, ss, se in _elements(mm, s, e):
+        if sid != 0x4DBB:
+          continue
+        target = pos = None
+        for cid, cs, ce in _elements(mm, ss, se):
+          if cid == 0x53AB:
+            target = _uint(mm, cs, ce)
+          elif cid == 0x53AC:
+            pos = seg[0] + _uint(mm, cs, ce)
+        if pos is None or pos >= size:
+          continue
+        if target == 0x1549A966 and info is None:
+          info = _element_at(mm, pos, size, 0x1549A966)
+        elif target == 0x1654AE6B and tracks is None:
+          tracks = _element_at(mm, pos, size, 0x1654AE6B)
+    elif eid == 0x1549A966 and info is None:
+      info = (s, e)
+    elif eid == 0x1654AE6B and tracks is None:
+      tracks = (s, e)
+    elif eid == 0x1F43B675:         # Cluster: 여기부터는 데이터
+      break
+    if info is not None and tracks is not None:
+      break
+  if info is None or tracks is None:
+    return None
+
+  scale, dur = 1_000_000, 0.0
+  for cid, cs, ce in _elements(mm, *info):
+    if cid == 0x2AD7B1:
+      scale = _uint(mm, cs, ce) or scale
+    elif cid == 0x4489:
+      dur = struct.unpack_from(">f" if ce - cs == 4 else ">d", mm, cs)[0]
+
+  for tid, ts, te in _elements(mm, *tracks):
+    if tid != 0xAE:
+      continue
+    ttype, codec, frame_ns, w, h = 0, "", 0, 0, 0
+    for cid, cs, ce in _elements(mm, ts, te):
+      if cid == 0x83:
+        ttype = _uint(mm, cs, ce)
+      elif cid == 0x86:
+        codec = bytes(mm[cs:ce]).decode("ascii", "replace").rstrip("\x00")
+      elif cid == 0x23E383:
+        frame_ns = _uint(mm, cs, ce)
+      elif cid == 0xE0:
+        for vid, vs, ve in _elements(mm, cs, ce):
+          if vid == 0xB0:
+            w = _uint(mm, vs, ve)
+          elif vid == 0xBA:
+            h = _uint(mm, vs, ve)
+    if ttype != 1:
+      continue
+    duration = dur * scale / 1e9
+    fps = 1e9 / frame_ns if frame_ns else 0.0
+    return {
+      "duration": duration, "width": w, "height": h, "fps": fps,
+      "codec": _MKV_CODECS.get(codec, codec.lower()),
+      "nb_frames": int(round(duration * fps)) if fps else 0,
+    }
+  return None
+
+def _element_at(mm, pos: int, end: int, expect_id: int) -> tuple[int, int] | None:
+  """pos에 있는 요소가 expect_id면 (데이터 시작, 끝)."""
+  for eid, s, e in _elements(mm, pos, end):
+    return (s, e) if eid == expect_id else None
+  return None
+
+# ---------------- AVI ----------------
+
+def _chunks(mm, start: int, end: int):
+  """RIFF 청크 (fourcc, 데이터 시작, 데이터 끝, LIST 타입 또는 b"")."""
+  pos = start
+  while pos + 8 <= end:
+    fourcc, size = struct.unpack_from("<4sI", mm, pos)
+    data = pos + 8
+    stop = min(end, data + size)
+    if fourcc in (b"LIST", b"RIFF"):
+      yield (fourcc, data + 4, stop, bytes(mm[data:data + 4]))
+    else:
+      yield (fourcc, data, stop, b"")
+    pos = data + size + (size & 1)
+
+def _parse_avi(mm, size: int) -> dict | None:
+  hdrl = None
+  for fourcc, s, e, kind in _chunks(mm, 12, size):
+    if fourcc == b"LIST" and kind == b"hdrl":
+      hdrl = (s, e)
+      break
+  if hdrl is None:
+    return None
+  usec_per_frame = total_frames = w = h = 0
+  odml_frames = 0
+  for fourcc, s, e, kind in _chunks(mm, *hdrl):
+    if fourcc == b"avih":
+      usec_per_frame = struct.unpack_from("<I", mm, s)[0]
+      total_frames = struct.unpack_from("<I", mm, s + 16)[0]
+      w, h = struct.unpack_from("<II", mm, s + 32)
+    elif fourcc == b"LIST" and kind == b"odml":
+      dmlh = next((c for c in _chunks(mm, s, e) if c[0] == b"dmlh"), None)
+      if dmlh is not None:
+        odml_frames = struct.unpack_from("<I", mm, dmlh[1])[0]
+    elif fourcc == b"LIST" and kind == b"strl":
+      strh = strf = None
+      for cf, cs, ce, _ in _chunks(mm, s, e):
+        if cf == b"strh":
+          strh = cs
+        elif cf == b"strf":
+          strf = cs
+      if strh is None or mm[strh:strh + 4] != b"vids":
+        continue
+      handler = bytes(mm[strh + 4:strh + 8]).decode("latin-1").upper().strip("\x00 ")
+      scale, rate = struct.unpack_from("<II", mm, strh + 20)
+      length = struct.unpack_from("<I", mm, strh + 32)[0]
+      if strf is not None:
+        bw, bh = struct.unpack_from("<ii", mm, strf + 4)
+        if bw > 0 and bh != 0:
+          w, h = bw, abs(bh)
+        comp = bytes(mm[strf + 16:strf + 20]).decode("latin-1").upper().strip("\x00 ")
+        handler = comp or handler
+      frames = max(length, odml_frames, total_frames)
+      fps = rate / scale if scale else (1e6 / usec_per_frame if usec_per_frame else 0.0)
+      return {
+        "duration": frames / fps if fps else 0.0,
+        "width": w, "height": h, "fps": fps,
+        "codec": _AVI_CODECS.get(handler, handler.lower()),
+        "nb_frames": frames,
+      }
+  return None
+
+# ---------------- MPEG-PS ----------------
+
+def _scr(mm, pos: int) -> int | None:
+  """pack header(00 00 01 BA) 위치에서 SCR base(90kHz)를 읽는다."""
+  b = mm[pos + 4:pos + 10]
+  if len(b) < 6:
+    return None
+  if b[0] >> 6 == 0b01:       # MPEG-2
+    return ((b[0] >> 3) & 0x07) << 30 | (b[0] & 0x03) << 28 | b[1] << 20 | \
+           (b[2] >> 3) << 15 | (b[2] & 0x03) << 13 | b[3] << 5 | (b[4] >> 3)
+  if b[0] >> 4 == 0b0010:     # MPEG-1
+    return ((b[0] >> 1) & 0x07) << 30 | b[1] << 22 | (b[2] >> 1) << 15 | b[3] << 7 | (b[4] >> 1)
+  return None
+
+def _parse_ps(mm, size: int) -> dict | None:
+  head_end = min(size, PS_SCAN_BYTES)
+  seq = mm.find(b"\x00\x00\x01\xb3", 0, head_end)
+  if seq < 0 or seq + 8 > size:
+    return None
+  b = mm[seq + 4:seq + 8]
+  w = (b[0] << 4) | (b[1] >> 4)
+  h = ((b[1] & 0x0F) << 8) | b[2]
+  fps = _PS_FPS.get(b[3] & 0x0F, 0.0)
+  # 시퀀스 확장(ext id 1)이 바로 뒤따르면 MPEG-2
+  ext = mm.find(b"\x00\x00\x01\xb5", seq + 12, min(size, seq + 256))
+  nxt = mm.find(b"\x00\x00\x01", seq + 4, min(size, seq + 256))
+  codec = "mpeg2video" if ext >= 0 and ext == nxt and mm[ext + 4] >> 4 == 1 else "mpeg1video"
+
+  first = _scr(mm, 0)
+  last = None
+  pos = size
+  lower = max(0, size - PS_SCAN_BYTES)
+  while last is None:
+    pos = mm.rfind(b"\x00\x00\x01\xba", lower, pos)
+    if pos < 0:
+      break
+    last = _scr(mm, pos)
+  if first is None or last is None or last <= first:
+    return None
+  duration = (last - first) / 90000.0 + (1.0 / fps if fps else 0.0)
+  return {
+    "duration": duration, "width": w, "height": h, "fps": fps,
+    "codec": codec, "nb_frames": int(round(duration * fps)) if fps else 0,
+  }
@@ -0,0 +1,155 @@
+# mediainfo.py
+"""
+입력 미디어 정보 서비스: ffprobe JSON 호출 한 번으로 길이/해상도/fps/코덱/프레임 수/비트레이트를 얻고
+(경로, 크기, mtime) 기준으로 캐시한다. 같은 파일을 다시 물어보면 프로세스를 띄우지 않는다.
+흔한 컨테이너는 먼저 헤더만 직접 읽고(mediaheader), 판단이 안 될 때만 ffprobe를 띄운다.
+"""
+import json, os, threading
+from dataclasses import dataclass
+
+from src.env import get_ffprobe_path, path_native
+import src.supervisor as supervisor
+from src.mediaheader import parse_header
+
+@dataclass(frozen=True)
+class MediaInfo:
+  duration: float = 0.0     # 초
+  width: int = 0
+  height: int = 0
+  fps: float = 0.0
+  codec: str = ""
+  pix_fmt: str = ""
+  nb_frames: int = 0
+  bit_rate: int = 0         # bps (비디오 스트림, 없으면 컨테이너 전체)
+  sar: str = ""             # sample_aspect_ratio (예: "1:1")
+  native: bool = False      # 헤더 파서 결과 (pix_fmt/sar 등은 비어 있을 수 있음)
+
+  @property
+  def ok(self) -> bool:
+    return self.duration > 0 or (self.width > 0 and self.height > 0)
+
+EMPTY = MediaInfo()
+
+_lock = threading.Lock()
+_cache: dict[str, tuple[int, int, MediaInfo]] = {}
+
+def _rate(s) -> float:
+  try:
+    if isinstance(s, str) and "/" in s:
+      num, den = s.split("/", 1)
+      return float(num) / float(den) if float(den) else 0.0
+    return float(s or 0)
+  except (TypeError, ValueError):
+    return 0.0
+
+def _int(v) -> int:
+  try:
+    return int(float(v))
+  except (TypeError, ValueError):
+    return 0
+
+def _run_ffprobe(path: str) -> MediaInfo:
+  ffprobe = get_ffprobe_path()
+  cmd = [
+    ffprobe,
+    "-v", "error",
+    "-probesize", "50M",
+    "-analyzeduration", "50M",
+    "-select_streams", "v:0",
+    "-show_entries",
+    "format=duration,bit_rate:"
+    "stream=codec_type,codec_name,width,height,coded_width,coded_height,"
+    "avg_frame_rate,r_frame_rate,pix_fmt,nb_frames,bit_rate,sample_aspect_ratio,duration",
+    "-of", "json",
+    path_native(path),
+  ]
+  try:
+    data = json.loads(supervisor.check_output(cmd) or "{}")
+  except Exception:
+    return EMPTY
+
+  fmt = data.get("format", {}) or {}
+  st = next((s for s in data.get("streams", []) or [] if s.get("codec_type") == "video"), {})
+
+  w = _int(st.get("width")) or _int(st.get("coded_width"))
+  h = _int(st.get("height")) or _int(st.get("coded_height"))
+  if w <= 0 or h <= 0:
+    # 최후 수단: 첫 프레임을 살짝 디코드해서 frame-level width/height 얻기
+    try:
+      out = supervisor.check_output([
+        ffprobe, "-v", "error",
+        "-read_intervals", "%+#1",
+        "-select_streams", "v:0",
+        "-show_entries", "frame=width,height",
+        "-of", "csv=p=0:s=x",
+        path_native(path),
+      ]).strip()
+      if out and "x" in out.splitlines()[0]:
+        w_str, h_str = out.splitlines()[0].strip().split("x", 1)
+        w, h = _int(w_str), _int(h_str)
+    except Exception:
+      pass
+
+  duration = _rate(fmt.get("duration")) or _rate(st.get("duration"))
+  fps = _rate(st.get("avg_frame_rate")) or _rate(st.get("r_frame_rate"))
+  nb_frames = _int(st.get("nb_frames"))
+  if nb_frames <= 0 and duration > 0 and fps > 0:
+    nb_frames = int(round(duration * fps))
+  return MediaInfo(
+    duration=duration,
+    width=max(0, w),
+    height=max(0, h),
+    fps=fps,
+    codec=str(st.get("codec_name") or ""),
+    pix_fmt=str(st.get("pix_fmt") or ""),
+    nb_frames=nb_frames,
+    bit_rate=_int(st.get("bit_rate")) or _int(fmt.get("bit_rate")),
+    sar=str(st.get("sample_aspect_ratio") or ""),
+  )
+
+def _from_header(path: str, size: int) -> MediaInfo | None:
+  h = parse_header(path)
+  if h is None:
+    return None
+  return MediaInfo(
+    duration=h["duration"],
+    width=h["width"],
+    height=h["height"],
+    fps=h["fps"],
+    codec=h["codec"],
+    nb_frames=h["nb_frames"],
+    bit_rate=int(size * 8 / h["duration"]),
+    native=True,
+  )
+
+def media_info(path: str, *, exact: bool = False) -> MediaInfo:
+  """
+  캐시된 MediaInfo. 파일이 없거나 읽을 수 없으면 빈 MediaInfo.
+  exact=True면 헤더 파서 결과 대신 ffprobe 결과를 보장한다 (pix_fmt/sar/스트림 비트레이트가 필요할 때).
+  """
+  if not path:
+    return EMPTY
+  try:
+    st = os.stat(path)
+  except OSError:
+    return EMPTY
+  key = os.path.abspath(path)
+  with _lock:
+    hit = _cache.get(key)
+    if hit is not None and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+      if not (exact and hit[2].native):
+        return hit[2]
+  info = None if exact else _from_header(path, st.st_size)
+  if info is None:
+    info = _run_ffprobe(path)
+  with _lock:
+    _cache[key] = (st.st_size, st.st_mtime_ns, info)
+  return info
+
+def invalidate(path: str | None = None) -> None:
+  """특정 파일(또는 전체) 캐시 제거."""
+  with _lock:
+    if path is None:
+      _cache.clear()
+    else:
+      _cache.pop(os.path.abspath(path), None)
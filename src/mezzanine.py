@@ -0,0 +1,161 @@
+# mezzanine.py
+"""
+필터를 거친 프레임 스트림 캐시 (GUI 의존 없음).
+디코드 + scale/pad/boxblur/fps 결과를 무손실 FFV1(.mkv)로 한 번 저장해 두고, 같은 입력 + 같은 화면 설정이면
+다음 인코딩은 원본 대신 이 파일을 필터 없이 읽는다 (비트레이트/버퍼/MUX/코덱만 바꾼 재실행이 빨라짐).
+키 = 입력 파일 지문 + 해상도/fps/레터박스(최종 필터 식). 색인/통계는 SQLite(user_config_dir()/mezzanine.sqlite3),
+파일은 바이트 예산을 넘으면 가장 오래 쓰지 않은 것부터 지운다(LRU).
+"""
+import hashlib, json, os, sqlite3, tempfile, threading, time
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.config import user_config_dir
+from src.util import file_fingerprint
+
+DB_PATH = user_config_dir() / "mezzanine.sqlite3"
+DEFAULT_BUDGET_MB = 4096
+EXT = "mkv"
+
+# 디코드가 빠른 무손실: 키프레임만(-g 1) → 구간 인코딩의 -ss 탐색도 정확하고 싸다
+FFV1_ARGS = ["-c:v", "ffv1", "-level", "3", "-g", "1", "-slices", "4", "-slicecrc", "0",
+             "-pix_fmt", "yuv420p", "-an", "-f", "matroska"]
+
+_lock = threading.Lock()
+
+@contextmanager
+def _db():
+  with _lock:
+    conn = sqlite3.connect(str(DB_PATH), timeout=5)
+    try:
+      _ensure_schema(conn)
+      yield conn
+      conn.commit()
+    finally:
+      conn.close()
+
+def _ensure_schema(conn: sqlite3.Connection) -> None:
+  conn.execute(
+    "CREATE TABLE IF NOT EXISTS mezzanine ("
+    " key TEXT PRIMARY KEY,"
+    " path TEXT NOT NULL,"
+    " input_path TEXT NOT NULL,"
+    " size INTEGER NOT NULL,"
+    " created REAL NOT NULL,"
+    " last_used REAL NOT NULL,"
+    " hits INTEGER NOT NULL DEFAULT 0)"
+  )
+  conn.execute("CREATE INDEX IF NOT EXISTS mezzanine_last_used ON mezzanine(last_used)")
+  conn.execute("CREATE TABLE IF NOT EXISTS mezzanine_stats (name TEXT PRIMARY KEY, value REAL NOT NULL)")
+
+def _bump(conn: sqlite3.Connection, name: str, by: float = 1) -> None:
+  conn.execute(
+    "INSERT INTO mezzanine_stats (name, value) VALUES (?, ?)"
+    " ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, by))
+
+def cache_dir(preferred: str | None = None) -> Path:
+  """캐시 파일 위치. 크기가 크므로 기본은 /dev/shm이 아닌 시스템 임시 폴더."""
+  p = Path(preferred) if preferred else Path(tempfile.gettempdir()) / "lr2bga" / "mezzanine"
+  p.mkdir(parents=True, exist_ok=True)
+  return p
+
+def make_key(state, filter_expr: str, fps: float) -> str | None:
+  try:
+    fp = file_fingerprint(state.get("input_path", ""))
+  except OSError:
+    return None
+  blob = json.dumps({"input": fp, "width": int(state.get("width", 0)), "height": int(state.get("height", 0)),
+                     "fps": float(fps), "filter": filter_expr}, sort_keys=True)
+  return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def path_for(key: str, preferred: str | None = None) -> str:
+  return str(cache_dir(preferred) / f"{key[:32]}.{EXT}")
+
+def lookup(key: str) -> str | None:
+  """적중 시 파일 경로 (최근 사용 시각/적중 수 갱신). 색인만 남고 파일이 없어졌으면 항목을 지우고 None."""
+  try:
+    with _db() as conn:
+      row = conn.execute("SELECT path, size FROM mezzanine WHERE key = ?", (key,)).fetchone()
+      if row is not None:
+        path, size = row
+        try:
+          if os.path.getsize(path) == int(size):
+            conn.execute("UPDATE mezzanine SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+            _bump(conn, "hits")
+            return path
+        except OSError:
+          pass
+        conn.execute("DELETE FROM mezzanine WHERE key = ?", (key,))
+      _bump(conn, "misses")
+      return None
+  except Exception:
+    return None
+
+def store(key: str, path: str, input_path: str, budget_mb: int = DEFAULT_BUDGET_MB) -> bool:
+  """완성된 캐시 파일을 색인에 올리고 예산에 맞춰 정리. 파일 하나가 예산보다 크면 바로 지우고 False."""
+  try:
+    size = os.path.getsize(path)
+  except OSError:
+    return False
+  budget = max(0, int(budget_mb)) * 1024 * 1024
+  if size > budget:
+    _remove(path)
+    return False
+  now = time.time()
+  try:
+    with _db() as conn:
+      conn.execute(
+        "INSERT OR REPLACE INTO mezzanine (key, path, input_path, size, created, last_used, hits)"
+        " VALUES (?, ?, ?, ?, ?, ?, 0)", (key, path, input_path, size, now, now))
+      _bump(conn, "stored")
+      _bump(conn, "bytes_written", size)
+      _evict(conn, budget)
+    return True
+  except Exception:
+    return False
+
+def _evict(conn: sqlite3.Connection, budget: int) -> None:
+  rows = conn.execute("SELECT key, path, size FROM mezzanine ORDER BY last_used DESC").fetchall()
+  total = 0
+  for key, path, size in rows:
+    total += int(size)
+    if total > budget:
+      _remove(path)
+      conn.execute("DELETE FROM mezzanine WHERE key = ?", (key,))
+      _bump(conn, "evicted")
+
+def _remove(path: str) -> None:
+  try:
+    os.remove(path)
+  except OSError:
+    pass
+
+def invalidate(key: str | None = None) -> int:
+  """키 하나 (없으면 전체) 삭제. 파일도 지운다. 삭제된 항목 수."""
+  try:
+    with _db() as conn:
+      if key is not None:
+        rows = conn.execute("SELECT key, path FROM mezzanine WHERE key = ?", (key,)).fetchall()
+      else:
+        rows = conn.execute("SELECT key, path FROM mezzanine").fetchall()
+      for k, path in rows:
+        _remove(path)
+        conn.execute("DELETE FROM mezzanine WHERE key = ?", (k,))
+      return len(rows)
+  except Exception:
+    return 0
+
+def stats() -> dict:
+  """{"entries", "bytes", "hits", "misses", "stored", "evicted", "bytes_written", "hit_rate"}"""
+  out = {"entries": 0, "bytes": 0, "hits": 0, "misses": 0, "stored": 0, "evicted": 0, "bytes_written": 0}
+  try:
+    with _db() as conn:
+      n, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM mezzanine").fetchone()
+      out["entries"], out["bytes"] = int(n), int(total)
+      for name, value in conn.execute("SELECT name, value FROM mezzanine_stats"):
+        out[name] = int(value)
+  except Exception:
+    pass
+  looked = out["hits"] + out["misses"]
+  out["hit_rate"] = out["hits"] / looked if looked else 0.0
+  return out
@@ -0,0 +1,206 @@
+# multiout.py
+"""
+한 번 디코드해서 여러 규격으로 출력 (GUI 의존 없음).
+예: LR2용 MPEG-1 512x512 + beatoraja용 H.264 720p를 ffmpeg 한 번(split 필터 그래프)으로 만든다.
+MPEG-1 출력은 이 한 번에서 ES만 만들고, MUX 자동 탐색/먹싱은 출력마다 그 ES를 리먹싱해서 한다
+(ConvertJob(es_input=...)). H.264 출력은 이 한 번에서 바로 최종 mp4가 된다.
+"""
+import dataclasses, os, re, shutil, tempfile, threading, time
+from dataclasses import dataclass
+
+from src.config import scratch_dir
+from src.engine import ConvertJob, ConvertOptions, ConvertResult, EventFn, safe_remove, scratch_need_bytes, \
+     _with_progress
+from src.ffargs import build_multi_args, preset_resolution
+from src.mediainfo import media_info
+import src.outstore as outstore
+
+@dataclass(frozen=True)
+class OutputProfile:
+  """출력 하나의 규격. None인 항목은 기본 설정(ConvertOptions)을 그대로 쓴다."""
+  name: str
+  codec: str | None = None
+  res_preset: str | None = None      # "512x512" / "720p" 등 (preset_resolution, 720p/1080p는 원본 비율 유지)
+  bitrate_k: int | None = None
+  letterbox_mode: str | None = None
+  mux_k: int | None = None
+  mux_auto: bool | None = None
+
+  def apply(self, base: ConvertOptions) -> ConvertOptions:
+    kw = {k: v for k, v in (("codec", self.codec), ("bitrate_k", self.bitrate_k),
+                            ("letterbox_mode", self.letterbox_mode), ("mux_k", self.mux_k),
+                            ("mux_auto", self.mux_auto)) if v is not None}
+    size = preset_resolution(self.res_preset, base.source_width, base.source_height) if self.res_preset else None
+    if size is not None:
+      kw["width"], kw["height"] = size
+    return dataclasses.replace(base, **kw)
+
+PROFILES = {
+  "lr2": OutputProfile("lr2", codec="MPEG1", res_preset="512x512", bitrate_k=1600),
+  "beatoraja": OutputProfile("beatoraja", codec="H.264", res_preset="720p", bitrate_k=4000),
+}
+
+def parse_profile(spec: str) -> OutputProfile:
+  """이름(PROFILES) 또는 "CODEC:해상도[:비트레이트k]" (예: "H.264:1080p:8000", "MPEG1:256x256")."""
+  spec = spec.strip()
+  if spec.lower() in PROFILES:
+    return PROFILES[spec.lower()]
+  parts = spec.split(":")
+  codec = {"mpeg1": "MPEG1", "h.264": "H.264", "h264": "H.264"}.get(parts[0].lower())
+  if codec is None or len(parts) < 2 or len(parts) > 3:
+    raise ValueError(f"unknown output profile: {spec}")
+  name = re.sub(r"[^\w.-]+", "_", spec).strip("_").lower()   # 출력 파일 이름 접미사로도 쓰인다
+  return OutputProfile(name, codec=codec, res_preset=parts[1],
+                       bitrate_k=int(parts[2].lower().rstrip("k")) if len(parts) == 3 else None)
+
+def parse_profiles(text: str) -> list[OutputProfile]:
+  """쉼표로 구분한 프로필 목록 (빈 항목은 무시)."""
+  return [parse_profile(s) for s in str(text or "").split(",") if s.strip()]
+
+def target_options(base: ConvertOptions, profiles: list[OutputProfile]) -> list[ConvertOptions]:
+  """출력별 옵션. 경로가 겹치면 뒤쪽 출력 이름에 _<프로필 이름>을 붙인다."""
+  out: list[ConvertOptions] = []
+  seen: set[str] = set()
+  for prof in profiles:
+    opts = prof.apply(base)
+    if opts.output_path() in seen:
+      opts = dataclasses.replace(opts, output_name=f"{opts.output_name or 'output'}_{prof.name}")
+    seen.add(opts.output_path())
+    out.append(opts)
+  return out
+
+class MultiJob:
+  """
+  여러 출력 작업. run()은 출력 순서대로 ConvertResult 목록을 돌려준다.
+  이벤트는 ConvertJob과 같고, MUX 단계의 이벤트에는 target(출력 번호)이 붙는다.
+  """
+
+  def __init__(self, targets: list[ConvertOptions], on_event: EventFn | None = None):
+    if not targets:
+      raise ValueError("no output targets")
+    self.targets = targets
+    self.on_event: EventFn = on_event or (lambda kind, **data: None)
+    # 공유 디코드 단계의 ffmpeg 실행/취소/임시 파일은 첫 출력 설정의 ConvertJob에 맡긴다
+    self._pass = ConvertJob(targets[0], self.on_event)
+    self._children: list[ConvertJob] = []
+    self._lock = threading.Lock()
+
+  @property
+  def cancel_requested(self) -> bool:
+    return self._pass.cancel_requested
+
+  def cancel(self):
+    self._pass.cancel()
+    with self._lock:
+      children = list(self._children)
+    for job in children:
+      job.cancel()
+
+  def _tagged(self, idx: int) -> EventFn:
+    return lambda kind, **data: self.on_event(kind, target=idx, **data)
+
+  def run(self) -> list[ConvertResult]:
+    """작업 실행 (호출한 스레드에서 끝날 때까지 블록)."""
+    job = self._pass
+    results = [ConvertResult(input_path=o.input_path, output_path=o.output_path()) for o in self.targets]
+    first = self.targets[0]
+    if not first.input_path or not os.path.exists(first.input_path):
+      job._log("[ERROR] Invalid input file path!")
+      for r in results:
+        r.error = "invalid_input"
+      return results
+    if not first.output_dir:
+      job._log("[ERROR] Invalid output path!")
+      for r in results:
+        r.error = "invalid_output"
+      return results
+
+    t0 = time.monotonic()
+    # 공유 디코드가 쓰는 MPEG-1 ES 전부
+    need = sum(scratch_need_bytes(o.as_state(), 1) for o in self.targets if not o.use_h264)
+    work_dir = tempfile.mkdtemp(prefix="multi-", dir=str(scratch_dir(first.scratch_dir or None, need)))
+    try:
+      # 출력 저장소에 이미 있는 출력은 공유 디코드에서 뺀다
+      keys: dict[int, str] = {}
+      pending: list[int] = []
+      for i, opts in enumerate(self.targets):
+        key = outstore.make_key(opts.as_state()) if opts.output_store else None
+        if key:
+          keys[i] = key
+          if ConvertJob(opts, self._tagged(i)).restore_output(results[i], key):
+            continue
+        outstore.unshare(opts.output_path())
+        pending.append(i)
+      if not pending:
+        return results
+
+      targets = [self.targets[i] for i in pending]
+      outpaths = [os.path.join(work_dir, f"out{i}.m1v") if not self.targets[i].use_h264
+                  else self.targets[i].output_path() for i in pending]
+      states = [o.as_state() for o in targets]
+      dur = media_info(first.input_path).duration
+      names = ", ".join(f"{o.codec} {o.width}x{o.height}" for o in targets)
+      job._log(f"[MULTI] One decode → {len(targets)} outputs ({names})")
+      job._status("msg.encoding_es")
+      job._progress(0.0)
+      for p in outpaths:
+        job.probe_paths.add(p)
+      job.current_outpath = ""
+      with job._timed("encode_shared"):
+        code, _, _ = job._run_ffmpeg(_with_progress(build_multi_args(states, outpaths)), dur)
+      if job.cancel_requested:
+        for i in pending:
+          results[i].cancelled = True
+        return results
+      if code != 0:
+        job._log(f"  [ERROR] ffmpeg exit code: {code}")
+        for i in pending:
+          results[i].error = "ffmpeg_failed"
+        return results
+      job._progress(1.0)
+      job._log("  [OK] Done ffmpeg (shared decode)")
+
+      shared = job.timings.get("encode_shared", 0.0)
+      cpu_share = job.cpu_seconds / len(pending)   # 공유 디코드의 CPU 시간은 출력 수로 나눠 각 출력에 매긴다
+      for n, (i, path) in enumerate(zip(pending, outpaths)):
+        opts = self.targets[i]
+        if opts.use_h264:
+          job.probe_paths.discard(path)
+          res = results[i]
+          res.ok = True
+          res.size_bytes = os.path.getsize(path) if os.path.exists(path) else 0
+          res.timings = {"encode_shared": shared}
+          res.cpu_seconds = cpu_share
+          if i in keys:
+            out = ConvertJob(opts, self._tagged(i))
+            out.cpu_seconds = cpu_share
+            out.store_output(res, keys[i])
+          continue
+        # MPEG-1: 공유 ES를 넘겨서 MUX 탐색(또는 고정 MUX) + 리먹싱만 (저장소 확인은 위에서 끝남)
+        child_opts = dataclasses.replace(opts, mux_probe_remux=True, stream_copy=False, mezzanine_cache=False)
+        # 저장소 키는 위에서 원래 옵션으로 계산한 것 (child_opts의 stream_copy 등이 달라 다시 만들면 키가 어긋남)
+        child = ConvertJob(child_opts, self._tagged(i), es_input=path, store_key=keys.get(i))
+        child.cpu_seconds = cpu_share
+        job.probe_paths.discard(path)
+        with self._lock:
+          self._children.append(child)
+        if self.cancel_requested:
+          child.cancel()
+        res = results[i] = child.run()
+        res.timings["encode_shared"] = shared
+        if res.cancelled:
+          for j in pending[n + 1:]:
+            results[j].cancelled = True
+          break
+      return results
+    finally:
+      for p in list(job.probe_paths):
+        safe_remove(p)
+        job.probe_paths.discard(p)
+      shutil.rmtree(work_dir, ignore_errors=True)
+      if job.cancel_requested:
+        for r in results:
+          if not r.ok:
+            r.cancelled = True
+      for r in results:
+        r.timings["total"] = time.monotonic() - t0
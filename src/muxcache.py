@@ -0,0 +1,115 @@
+# muxcache.py
+"""
+MUX 탐색 결과 영구 캐시 (SQLite, user_config_dir()/mux_cache.sqlite3).
+키 = 입력 파일 지문 + 스트림에 영향을 주는 모든 인코딩 파라미터.
+값 = 찾은 안전 mux_k + 시도 기록. 최대 항목 수를 넘으면 가장 오래 쓰지 않은 것부터 삭제(LRU).
+"""
+import hashlib, json, sqlite3, threading, time
+from contextlib import contextmanager
+
+from src.config import user_config_dir
+from src.ffargs import _build_letterbox_filter, _normalize_letterbox_color
+from src.util import file_fingerprint
+
+DB_PATH = user_config_dir() / "mux_cache.sqlite3"
+MAX_ENTRIES = 2000
+
+_lock = threading.Lock()
+
+@contextmanager
+def _db():
+  with _lock:
+    conn = sqlite3.connect(str(DB_PATH), timeout=5)
+    try:
+      _ensure_schema(conn)
+      yield conn
+      conn.commit()
+    finally:
+      conn.close()
+
+def _ensure_schema(conn: sqlite3.Connection) -> None:
+  conn.execute(
+    "CREATE TABLE IF NOT EXISTS mux_cache ("
+    " key TEXT PRIMARY KEY,"
+    " input_path TEXT NOT NULL,"
+    " mux_k INTEGER NOT NULL,"
+    " history TEXT NOT NULL,"
+    " created REAL NOT NULL,"
+    " last_used REAL NOT NULL)"
+  )
+  conn.execute("CREATE INDEX IF NOT EXISTS mux_cache_last_used ON mux_cache(last_used)")
+
+def stream_params(state) -> dict:
+  """출력 스트림(=안전 MUX)에 영향을 주는 파라미터만 모은다."""
+  fps = state["fps"] if not state["fps_locked"] else 30
+  buf = state["buffer_k"] if not state["buffer_locked"] else 2900
+  _, filter_expr, _ = _build_letterbox_filter(state, fps)
+  return {
+    "width": int(state.get("width", 0)),
+    "height": int(state.get("height", 0)),
+    "fps": float(fps),
+    "bitrate_k": int(state.get("bitrate_k", 0)),
+    "buffer_k": int(buf),
+    "codec": str(state.get("codec", "MPEG1")),
+    "letterbox_mode": str(state.get("letterbox_mode", "black")),
+    "letterbox_color": list(_normalize_letterbox_color(state)),
+    "letterbox_blur_radius": state.get("letterbox_blur_radius", 20),
+    "letterbox_blur_brightness": state.get("letterbox_blur_brightness", 100),
+    "filter": filter_expr,
+    "stream_copy": bool(state.get("stream_copy", True)),
+  }
+
+def make_key(state) -> str | None:
+  path = state.get("input_path", "")
+  try:
+    fp = file_fingerprint(path)
+  except OSError:
+    return None
+  blob = json.dumps({"input": fp, "params": stream_params(state)}, sort_keys=True)
+  return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def lookup(key: str) -> tuple[int, list] | None:
+  """적중 시 (mux_k, 시도 기록)을 반환하고 최근 사용 시각을 갱신."""
+  try:
+    with _db() as conn:
+      row = conn.execute("SELECT mux_k, history FROM mux_cache WHERE key = ?", (key,)).fetchone()
+      if row is None:
+        return None
+      conn.execute("UPDATE mux_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+      return (int(row[0]), json.loads(row[1]))
+  except Exception:
+    return None
+
+def store(key: str, input_path: str, mux_k: int, history: list) -> None:
+  now = time.time()
+  try:
+    with _db() as conn:
+      conn.execute(
+        "INSERT OR REPLACE INTO mux_cache (key, input_path, mux_k, history, created, last_used)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        (key, input_path, int(mux_k), json.dumps(history), now, now),
+      )
+      _evict(conn, MAX_ENTRIES)
+  except Exception:
+    pass
+
+def _evict(conn: sqlite3.Connection, max_entries: int) -> None:
+  conn.execute(
+    "DELETE FROM mux_cache WHERE key IN ("
+    " SELECT key FROM mux_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+    (max(0, int(max_entries)),),
+  )
+
+def invalidate(key: str | None = None, *, input_path: str | None = None) -> int:
+  """키 하나 / 특정 입력 파일 / (둘 다 없으면) 전체 캐시 삭제. 삭제된 항목 수 반환."""
+  try:
+    with _db() as conn:
+      if key is not None:
+        cur = conn.execute("DELETE FROM mux_cache WHERE key = ?", (key,))
+      elif input_path is not None:
+        cur = conn.execute("DELETE FROM mux_cache WHERE input_path = ?", (input_path,))
+      else:
+        cur = conn.execute("DELETE FROM mux_cache")
+      return int(cur.rowcount or 0)
+  except Exception:
+    return 0
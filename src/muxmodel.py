@@ -0,0 +1,146 @@
+# muxmodel.py
+"""
+MUX 탐색 warm start: 완료된 작업마다 (특징 → 최종 안전 MUX)를 기록하고,
+작은 선형 회귀(ridge 최소제곱)로 다음 탐색의 시작 구간 [예측-2σ, 예측+2σ]를 제안한다.
+"""
+import math, os, sqlite3, threading, time
+from contextlib import contextmanager
+
+from src.muxcache import DB_PATH
+
+MIN_SAMPLES = 8
+MAX_SAMPLES = 5000
+RIDGE = 1e-3
+MIN_SIGMA_K = 50.0
+
+_lock = threading.Lock()
+
+@contextmanager
+def _db():
+  with _lock:
+    conn = sqlite3.connect(str(DB_PATH), timeout=5)
+    try:
+      conn.execute(
+        "CREATE TABLE IF NOT EXISTS mux_history ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " features TEXT NOT NULL,"
+        " mux_k INTEGER NOT NULL,"
+        " probes INTEGER NOT NULL,"
+        " seeded INTEGER NOT NULL,"
+        " created REAL NOT NULL)"
+      )
+      yield conn
+      conn.commit()
+    finally:
+      conn.close()
+
+def features(state, *, duration_sec: float) -> list[float]:
+  """회귀 특징: 상수항, 비트레이트, 버퍼, 픽셀 수, fps, 원본 비트레이트(복잡도 근사)."""
+  fps = state["fps"] if not state["fps_locked"] else 30
+  buf = state["buffer_k"] if not state["buffer_locked"] else 2900
+  pixels = int(state.get("width", 0)) * int(state.get("height", 0))
+  try:
+    src_kbps = os.path.getsize(state.get("input_path", "")) * 8 / 1000.0 / duration_sec if duration_sec > 0 else 0.0
+  except OSError:
+    src_kbps = 0.0
+  return [
+    1.0,
+    float(state.get("bitrate_k", 0)),
+    float(buf),
+    pixels / 1e5,
+    float(fps),
+    src_kbps / 1000.0,
+  ]
+
+def record(feat: list[float], mux_k: int, *, probes: int, seeded: bool) -> None:
+  try:
+    with _db() as conn:
+      conn.execute(
+        "INSERT INTO mux_history (features, mux_k, probes, seeded, created) VALUES (?, ?, ?, ?, ?)",
+        (",".join(f"{v:.6g}" for v in feat), int(mux_k), int(probes), int(bool(seeded)), time.time()),
+      )
+      conn.execute(
+        "DELETE FROM mux_history WHERE id NOT IN (SELECT id FROM mux_history ORDER BY id DESC LIMIT ?)",
+        (MAX_SAMPLES,),
+      )
+  except Exception:
+    pass
+
+def _load() -> list[tuple[list[float], int, int, int]]:
+  try:
+    with _db() as conn:
+      rows = conn.execute("SELECT features, mux_k, probes, seeded FROM mux_history").fetchall()
+  except Exception:
+    return []
+  out = []
+  for feat, mux_k, probes, seeded in rows:
+    try:
+      out.append(([float(v) for v in feat.split(",")], int(mux_k), int(probes), int(seeded)))
+    except ValueError:
+      continue
+  return out
+
+def _solve(a: list[list[float]], b: list[float]) -> list[float] | None:
+  """가우스 소거 (부분 피벗)."""
+  n = len(b)
+  m = [row[:] + [b[i]] for i, row in enumerate(a)]
+  for col in range(n):
+    piv = max(range(col, n), key=lambda r: abs(m[r][col]))
+    if abs(m[piv][col]) < 1e-12:
+      return None
+    m[col], m[piv] = m[piv], m[col]
+    for r in range(n):
+      if r != col:
+        f = m[r][col] / m[col][col]
+        if f:
+          for c in range(col, n + 1):
+            m[r][c] -= f * m[col][c]
+  return [m[i][n] / m[i][i] for i in range(n)]
+
+def fit(samples: list[tuple[list[float], int, int, int]]) -> tuple[list[float], float] | None:
+  """ridge 최소제곱 → (계수, 잔차 표준편차 k)."""
+  if len(samples) < MIN_SAMPLES:
+    return None
+  dim = len(samples[0][0])
+  xtx = [[0.0] * dim for _ in range(dim)]
+  xty = [0.0] * dim
+  for x, y, _, _ in samples:
+    if len(x) != dim:
+      continue
+    for i in range(dim):
+      xty[i] += x[i] * y
+      for j in range(dim):
+        xtx[i][j] += x[i] * x[j]
+  for i in range(1, dim):
+    xtx[i][i] += RIDGE * (xtx[i][i] or 1.0)
+  coef = _solve(xtx, xty)
+  if coef is None:
+    return None
+  sq = 0.0
+  for x, y, _, _ in samples:
+    pred = sum(c * v for c, v in zip(coef, x))
+    sq += (pred - y) ** 2
+  sigma = max(MIN_SIGMA_K, math.sqrt(sq / max(1, len(samples) - dim)))
+  return (coef, sigma)
+
+def predict_bracket(feat: list[float]) -> tuple[int, int, int] | None:
+  """(하한, 상한, 학습 샘플 수). 50k 정렬. 기록이 부족하면 None."""
+  samples = _load()
+  model = fit(samples)
+  if model is None:
+    return None
+  coef, sigma = model
+  pred = sum(c * v for c, v in zip(coef, feat))
+  lo = max(50, int(pred - 2 * sigma) // 50 * 50)
+  hi = max(lo + 50, int(math.ceil((pred + 2 * sigma) / 50.0)) * 50)
+  return (lo, hi, len(samples))
+
+def probe_stats() -> tuple[float | None, float | None]:
+  """(warm start 없이 평균 프로브 수, warm start 평균 프로브 수)."""
+  samples = _load()
+  cold = [p for _, _, p, s in samples if not s]
+  warm = [p for _, _, p, s in samples if s]
+  return (
+    sum(cold) / len(cold) if cold else None,
+    sum(warm) / len(warm) if warm else None,
+  )
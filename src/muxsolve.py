@@ -0,0 +1,114 @@
+# muxsolve.py
+"""
+인코딩된 MPEG-1 ES의 패킷 크기/DTS만으로 MPEG-PS 먹서의 최소 안전 muxrate를 계산.
+
+ffmpeg mpeg 먹서는 SCR이 어떤 패킷의 DTS를 지날 때 그 패킷이 아직 버퍼에 다 들어오지
+않았으면 "buffer underflow"를 낸다. 먹서는 muxrate R로 데이터를 보내고, 디코더 버퍼(B)에
+빈 공간이 있을 때만 앞서 보낼 수 있으므로 언더플로우가 없으려면 모든 i < j에 대해
+
+  R * t_j >= S_j                       (시작부터 j까지)
+  R * (t_j - t_i) >= S_j - S_i - B     (i 소비 직후 버퍼가 가득 찬 상태에서 j까지)
+
+가 성립해야 한다 (S_j: j까지 누적 바이트, t_j: preload를 더한 DTS).
+점 (0, 0), (t_i, S_i + B)의 하부 볼록 껍질에 대한 접선 기울기가 곧 필요한 R이므로
+패킷 수 n에 대해 O(n log n)으로 한 번에 계산한다.
+"""
+import math
+
+from src.env import get_ffprobe_path, path_native
+import src.supervisor as supervisor
+
+# ffmpeg mpeg 먹서 기본값
+PACK_SIZE = 2048
+PACK_OVERHEAD = 12 + 6 + 10      # pack header + PES header + PTS/DTS
+MUX_PRELOAD_SEC = 0.5
+# 비디오 버퍼 = 6KiB + VBV(bufsize) (libavformat/mpegenc.c)
+VIDEO_BUFFER_EXTRA = 6 * 1024
+
+def probe_packets(path: str, fps: float) -> tuple[list[float], list[int]]:
+  """ffprobe 한 번으로 (DTS 초, 패킷 크기) 목록을 읽는다. DTS가 없으면 프레임 번호/fps로 대체."""
+  cmd = [
+    get_ffprobe_path(),
+    "-v", "error",
+    "-select_streams", "v:0",
+    "-show_entries", "packet=dts_time,size",
+    "-of", "csv=p=0",
+    path_native(path),
+  ]
+  out = supervisor.check_output(cmd)
+  times: list[float] = []
+  sizes: list[int] = []
+  step = 1.0 / fps if fps and fps > 0 else 1.0 / 30
+  for line in out.splitlines():
+    parts = line.strip().split(",")
+    if len(parts) < 2:
+      continue
+    try:
+      size = int(parts[1])
+    except ValueError:
+      continue
+    try:
+      t = float(parts[0])
+    except ValueError:
+      t = len(times) * step
+    times.append(t)
+    sizes.append(size)
+  return (times, sizes)
+
+def min_safe_rate_bytes(times: list[float], sizes: list[int], buffer_bytes: int, *,
+                        preload: float = MUX_PRELOAD_SEC) -> float:
+  """언더플로우가 없는 최소 전송률(bytes/s). times는 DTS 순서(오름차순)여야 한다."""
+  if not times:
+    return 0.0
+  t0 = times[0]
+  payload = PACK_SIZE - PACK_OVERHEAD
+  hx: list[float] = [0.0]
+  hy: list[float] = [0.0]
+  best = 0.0
+  cum = 0.0
+  last_t = 0.0
+  for t_raw, size in zip(times, sizes):
+    t = max(t_raw - t0 + preload, last_t + 1e-6)
+    last_t = t
+    cum += size * PACK_SIZE / payload
+
+    # 질의: 껍질 위 점에서 (t, cum)까지의 최대 기울기 (껍질을 따라 단봉형)
+    lo, hi = 0, len(hx) - 1
+    while lo < hi:
+      mid = (lo + hi) // 2
+      a = (cum - hy[mid]) / (t - hx[mid])
+      b = (cum - hy[mid + 1]) / (t - hx[mid + 1])
+      if a < b:
+        lo = mid + 1
+      else:
+        hi = mid
+    r = (cum - hy[lo]) / (t - hx[lo])
+    if r > best:
+      best = r
+
+    # 이 패킷이 소비된 직후의 제약점을 하부 껍질에 추가
+    px, py = t, cum + buffer_bytes
+    while len(hx) >= 2:
+      ax, ay, bx, by = hx[-2], hy[-2], hx[-1], hy[-1]
+      if (bx - ax) * (py - ay) - (by - ay) * (px - ax) > 0:
+        break
+      hx.pop(); hy.pop()
+    hx.append(px); hy.append(py)
+  return best
+
+def solve_min_mux_k(es_path: str, *, buffer_k: int, fps: float) -> int | None:
+  """ES 파일에서 최소 안전 muxrate(k, 50k 상향 정렬)를 계산. 실패하면 None."""
+  try:
+    times, sizes = probe_packets(es_path, fps)
+  except Exception:
+    return None
+  if not sizes:
+    return None
+  order = sorted(range(len(times)), key=times.__getitem__)
+  times = [times[i] for i in order]
+  sizes = [sizes[i] for i in order]
+  buffer_bytes = VIDEO_BUFFER_EXTRA + int(buffer_k) * 1000 // 8
+  rate = min_safe_rate_bytes(times, sizes, buffer_bytes)
+  if rate <= 0:
+    return None
+  return int(math.ceil(rate * 8 / 1000 / 50.0)) * 50
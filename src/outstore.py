@@ -0,0 +1,296 @@
+# outstore.py
+"""
+완성된 출력 파일 저장소 (내용 주소 방식, GUI 의존 없음).
+키 = 입력 파일 내용 해시(경로/mtime 무관) + 출력에 영향을 주는 모든 설정. 곡 폴더마다 같은 영상이
+복사돼 있어도 한 번만 인코딩하고, 나머지는 저장된 결과를 출력 폴더에 하드링크 → reflink → 복사 순으로 넣는다.
+새 출력을 저장할 때는 하드링크하지 않는다(reflink → 복사): 곡 폴더의 파일을 고쳐도 저장소 파일은 그대로.
+적중으로 하드링크한 출력이 나중에 고쳐지면 크기/mtime 확인에서 걸러져 그 항목은 버린다.
+색인/통계는 SQLite(user_config_dir()/outstore.sqlite3), 파일은 용량 한도를 넘으면 가장 오래 쓰지 않은 것부터 지운다(LRU).
+저장소 파일을 지워도 하드링크로 넣은 출력 파일은 그대로 남는다.
+"""
+import hashlib, json, os, shutil, sqlite3, sys, threading, time
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.config import user_config_dir
+from src.ffargs import quant50_up
+import src.muxcache as muxcache
+
+DB_PATH = user_config_dir() / "outstore.sqlite3"
+DEFAULT_BUDGET_MB = 8192
+
+_lock = threading.Lock()
+
+@contextmanager
+def _db():
+  with _lock:
+    conn = sqlite3.connect(str(DB_PATH), timeout=5)
+    try:
+      _ensure_schema(conn)
+      yield conn
+      conn.commit()
+    finally:
+      conn.close()
+
+def _ensure_schema(conn: sqlite3.Connection) -> None:
+  conn.execute(
+    "CREATE TABLE IF NOT EXISTS outstore ("
+    " key TEXT PRIMARY KEY,"
+    " path TEXT NOT NULL,"
+    " size INTEGER NOT NULL,"
+    " mtime_ns INTEGER NOT NULL DEFAULT 0,"
+    " mux_k INTEGER,"
+    " cpu_sec REAL NOT NULL DEFAULT 0,"
+    " created REAL NOT NULL,"
+    " last_used REAL NOT NULL,"
+    " hits INTEGER NOT NULL DEFAULT 0)"
+  )
+  if "mtime_ns" not in {r[1] for r in conn.execute("PRAGMA table_info(outstore)")}:
+    # 예전 색인: mtime이 없는 항목은 확인할 수 없으므로 lookup에서 버려진다
+    conn.execute("ALTER TABLE outstore ADD COLUMN mtime_ns INTEGER NOT NULL DEFAULT 0")
+  conn.execute("CREATE INDEX IF NOT EXISTS outstore_last_used ON outstore(last_used)")
+  # 내용 해시는 비싸므로 (경로, 크기, mtime)이 같으면 다시 계산하지 않는다
+  conn.execute(
+    "CREATE TABLE IF NOT EXISTS outstore_digest ("
+    " path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, digest TEXT NOT NULL)"
+  )
+  conn.execute("CREATE TABLE IF NOT EXISTS outstore_stats (name TEXT PRIMARY KEY, value REAL NOT NULL)")
+
+def _bump(conn: sqlite3.Connection, name: str, by: float = 1) -> None:
+  conn.execute(
+    "INSERT INTO outstore_stats (name, value) VALUES (?, ?)"
+    " ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, by))
+
+def store_dir(preferred: str | None = None) -> Path:
+  """
+  저장소 위치. 하드링크/reflink는 같은 드라이브 안에서만 되므로, 출력 폴더와 같은 드라이브를 지정하면
+  적중은 추가 용량 없이 끝난다 (다른 드라이브면 복사).
+  """
+  p = Path(preferred) if preferred else user_config_dir() / "outstore"
+  p.mkdir(parents=True, exist_ok=True)
+  return p
+
+def content_digest(path: str, chunk: int = 1024 * 1024) -> str:
+  """입력 파일 전체의 blake2b. 같은 파일(경로/크기/mtime)은 색인에 저장된 값을 쓴다."""
+  st = os.stat(path)
+  ap = os.path.abspath(path)
+  try:
+    with _db() as conn:
+      row = conn.execute("SELECT size, mtime_ns, digest FROM outstore_digest WHERE path = ?", (ap,)).fetchone()
+    if row is not None and int(row[0]) == st.st_size and int(row[1]) == st.st_mtime_ns:
+      return row[2]
+  except Exception:
+    pass
+  h = hashlib.blake2b(digest_size=20)
+  with open(path, "rb") as f:
+    while True:
+      data = f.read(chunk)
+      if not data:
+        break
+      h.update(data)
+  digest = f"{st.st_size}:{h.hexdigest()}"
+  try:
+    with _db() as conn:
+      conn.execute("INSERT OR REPLACE INTO outstore_digest (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                   (ap, st.st_size, st.st_mtime_ns, digest))
+  except Exception:
+    pass
+  return digest
+
+def output_params(state) -> dict:
+  """출력 파일 내용을 정하는 설정: 스트림 파라미터(muxcache) + MUX (자동이면 탐색 결과도 입력/설정으로 정해짐)."""
+  params = muxcache.stream_params(state)
+  if params["codec"] != "H.264":
+    params["mux"] = "auto" if state.get("mux_auto", True) else quant50_up(int(state.get("mux_k", 0)))
+  return params
+
+def make_key(state) -> str | None:
+  try:
+    digest = content_digest(state.get("input_path", ""))
+  except OSError:
+    return None
+  blob = json.dumps({"input": digest, "params": output_params(state)}, sort_keys=True)
+  return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def path_for(key: str, ext: str, preferred: str | None = None) -> str:
+  d = store_dir(preferred) / key[:2]
+  d.mkdir(parents=True, exist_ok=True)
+  return str(d / f"{key}.{ext}")
+
+# ---------------- 링크 / 복사 ----------------
+
+def _reflink(src: str, dst: str) -> bool:
+  """복사 없이 블록 공유 (Btrfs/XFS의 FICLONE, APFS의 clonefile). 지원하지 않으면 False."""
+  try:
+    if sys.platform.startswith("linux"):
+      import fcntl
+      FICLONE = 0x40049409
+      with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+      return True
+    if sys.platform == "darwin":
+      import ctypes
+      libc = ctypes.CDLL("/usr/lib/libSystem.dylib", use_errno=True)
+      return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+  except (OSError, AttributeError):
+    pass
+  _remove(dst)
+  return False
+
+def place(src: str, dst: str, *, hardlink: bool = True) -> str:
+  """
+  src를 dst에 넣는다: 하드링크(hardlink=True일 때) → reflink → 복사. 임시 이름으로 만든 뒤 원자적 교체.
+  사용한 방법("hardlink" | "reflink" | "copy")을 반환. 실패하면 OSError.
+  """
+  tmp = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+  _remove(tmp)
+  try:
+    method = ""
+    if hardlink:
+      try:
+        os.link(src, tmp)
+        method = "hardlink"
+      except OSError:
+        pass
+    if not method:
+      if _reflink(src, tmp):
+        method = "reflink"
+      else:
+        shutil.copyfile(src, tmp)
+        method = "copy"
+    os.replace(tmp, dst)
+  except OSError:
+    _remove(tmp)
+    raise
+  return method
+
+def unshare(path: str) -> None:
+  """다른 곳과 하드링크로 공유 중인 파일이면 지운다 (제자리 덮어쓰기가 저장소 파일까지 바꾸지 않게)."""
+  try:
+    if os.stat(path).st_nlink > 1:
+      os.remove(path)
+  except OSError:
+    pass
+
+# ---------------- 색인 ----------------
+
+def lookup(key: str) -> dict | None:
+  """
+  적중 시 {"path", "size", "mux_k", "cpu_sec"}. 파일이 없어졌거나 크기/mtime이 저장할 때와 다르면
+  (하드링크된 출력이 제자리에서 고쳐진 경우 등) 항목과 파일을 지우고 None.
+  """
+  try:
+    with _db() as conn:
+      row = conn.execute("SELECT path, size, mtime_ns, mux_k, cpu_sec FROM outstore WHERE key = ?",
+                         (key,)).fetchone()
+      if row is not None:
+        path, size, mtime_ns, mux_k, cpu_sec = row
+        try:
+          st = os.stat(path)
+          if st.st_size == int(size) and st.st_mtime_ns == int(mtime_ns):
+            return {"path": path, "size": int(size), "mux_k": mux_k, "cpu_sec": float(cpu_sec)}
+          _remove(path)
+        except OSError:
+          pass
+        conn.execute("DELETE FROM outstore WHERE key = ?", (key,))
+      _bump(conn, "misses")
+      return None
+  except Exception:
+    return None
+
+def restore(key: str, dst: str) -> tuple[dict, str] | None:
+  """저장된 결과를 dst에 넣는다. (항목, 방법) 또는 None(미스/실패). 적중 통계(절약한 바이트/CPU 초)를 올린다."""
+  hit = lookup(key)
+  if hit is None:
+    return None
+  try:
+    method = place(hit["path"], dst)
+  except OSError:
+    return None
+  try:
+    with _db() as conn:
+      conn.execute("UPDATE outstore SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+      _bump(conn, "hits")
+      _bump(conn, "bytes_saved", hit["size"])
+      _bump(conn, "cpu_saved", hit["cpu_sec"])
+      _bump(conn, f"placed_{method}")
+  except Exception:
+    pass
+  return (hit, method)
+
+def store(key: str, output_path: str, *, mux_k: int | None, cpu_sec: float,
+          budget_mb: int = DEFAULT_BUDGET_MB, preferred: str | None = None) -> bool:
+  """완성된 출력을 저장소에 넣고(reflink → 복사, 출력과 파일을 공유하지 않음) 한도에 맞춰 정리. 파일 하나가 한도보다 크면 False."""
+  try:
+    size = os.path.getsize(output_path)
+  except OSError:
+    return False
+  budget = max(0, int(budget_mb)) * 1024 * 1024
+  if size > budget:
+    return False
+  ext = os.path.splitext(output_path)[1].lstrip(".") or "bin"
+  path = path_for(key, ext, preferred)
+  try:
+    place(output_path, path, hardlink=False)
+    mtime_ns = os.stat(path).st_mtime_ns
+  except OSError:
+    return False
+  now = time.time()
+  try:
+    with _db() as conn:
+      conn.execute(
+        "INSERT OR REPLACE INTO outstore (key, path, size, mtime_ns, mux_k, cpu_sec, created, last_used, hits)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)", (key, path, size, mtime_ns, mux_k, float(cpu_sec), now, now))
+      _bump(conn, "stored")
+      _evict(conn, budget)
+    return True
+  except Exception:
+    _remove(path)
+    return False
+
+def _evict(conn: sqlite3.Connection, budget: int) -> None:
+  rows = conn.execute("SELECT key, path, size FROM outstore ORDER BY last_used DESC").fetchall()
+  total = 0
+  for key, path, size in rows:
+    total += int(size)
+    if total > budget:
+      _remove(path)
+      conn.execute("DELETE FROM outstore WHERE key = ?", (key,))
+      _bump(conn, "evicted")
+
+def _remove(path: str) -> None:
+  try:
+    os.remove(path)
+  except OSError:
+    pass
+
+def invalidate(key: str | None = None) -> int:
+  """키 하나 (없으면 전체) 삭제. 저장소 파일도 지운다 (출력 폴더의 파일은 그대로). 삭제된 항목 수."""
+  try:
+    with _db() as conn:
+      if key is not None:
+        rows = conn.execute("SELECT key, path FROM outstore WHERE key = ?", (key,)).fetchall()
+      else:
+        rows = conn.execute("SELECT key, path FROM outstore").fetchall()
+      for k, path in rows:
+        _remove(path)
+        conn.execute("DELETE FROM outstore WHERE key = ?", (k,))
+      return len(rows)
+  except Exception:
+    return 0
+
+def stats() -> dict:
+  """{"entries", "bytes", "hits", "misses", "stored", "evicted", "bytes_saved", "cpu_saved", "hit_rate"}"""
+  out = {"entries": 0, "bytes": 0, "hits": 0, "misses": 0, "stored": 0, "evicted": 0,
+         "bytes_saved": 0, "cpu_saved": 0.0}
+  try:
+    with _db() as conn:
+      n, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM outstore").fetchone()
+      out["entries"], out["bytes"] = int(n), int(total)
+      for name, value in conn.execute("SELECT name, value FROM outstore_stats"):
+        out[name] = float(value) if name == "cpu_saved" else int(value)
+  except Exception:
+    pass
+  looked = out["hits"] + out["misses"]
+  out["hit_rate"] = out["hits"] / looked if looked else 0.0
+  return out
@@ -0,0 +1,78 @@
+# peakscan.py
+"""
+패킷 크기만 훑어서(디코드 없음) 비트스트림이 가장 빽빽한 구간을 찾는다.
+구간 경계는 키프레임에 맞춰 -ss/-t 로 잘라도 GOP가 깨지지 않게 한다.
+"""
+from src.env import get_ffprobe_path, path_native
+import src.supervisor as supervisor
+
+def scan_packets(path: str) -> list[tuple[float, int, bool]]:
+  """(시각 초, 패킷 크기, 키프레임 여부) 목록. 시각 순 정렬."""
+  cmd = [
+    get_ffprobe_path(),
+    "-v", "error",
+    "-select_streams", "v:0",
+    "-show_entries", "packet=pts_time,dts_time,size,flags",
+    "-of", "csv=p=0",
+    path_native(path),
+  ]
+  out = supervisor.check_output(cmd)
+  pkts: list[tuple[float, int, bool]] = []
+  for line in out.splitlines():
+    parts = line.strip().split(",")
+    if len(parts) < 4:
+      continue
+    t = None
+    for raw in parts[:2]:
+      try:
+        t = float(raw)
+        break
+      except ValueError:
+        continue
+    if t is None:
+      continue
+    try:
+      size = int(parts[2])
+    except ValueError:
+      continue
+    pkts.append((t, size, "K" in parts[3]))
+  pkts.sort(key=lambda p: p[0])
+  return pkts
+
+def densest_windows(pkts: list[tuple[float, int, bool]], window_sec: float, count: int = 1) -> list[tuple[float, float]]:
+  """
+  바이트 합이 가장 큰 window_sec 구간을 겹치지 않게 최대 count개 찾는다.
+  반환: [(시작 초, 길이 초)] — 시작은 직전 키프레임, 끝은 다음 키프레임으로 확장.
+  """
+  if not pkts or window_sec <= 0 or count <= 0:
+    return []
+  t0 = pkts[0][0]
+  t_end = pkts[-1][0]
+  keys = [t for t, _, k in pkts if k] or [t0]
+  taken: list[tuple[float, float]] = []
+  result: list[tuple[float, float]] = []
+
+  for _ in range(count):
+    best_sum, best_start = -1, None
+    lo = 0
+    acc = 0
+    for hi in range(len(pkts)):
+      acc += pkts[hi][1]
+      while pkts[hi][0] - pkts[lo][0] >= window_sec:
+        acc -= pkts[lo][1]
+        lo += 1
+      start = pkts[lo][0]
+      if any(s < start + window_sec and start < e for s, e in taken):
+        continue
+      if acc > best_sum:
+        best_sum, best_start = acc, start
+    if best_start is None:
+      break
+    start = max([k for k in keys if k <= best_start] or [t0])
+    end = min([k for k in keys if k >= best_start + window_sec] or [t_end])
+    if end <= start:
+      end = t_end
+    taken.append((start, end))
+    result.append((max(0.0, start - t0), end - start))
+  result.sort()
+  return result
@@ -0,0 +1,125 @@
+# progress.py
+"""
+ffmpeg `-progress` 출력 파서.
+블록(key=value 줄들 … progress=continue|end)이 끝날 때마다 ProgressSnapshot 하나를 만든다.
+바이트를 그대로 받으므로 텍스트 디코드/줄 버퍼링이 필요 없다 (supervisor.ProcHandle.subscribe_raw와 짝).
+
+ProgressThrottle은 스냅샷을 초당 최대 hz번만 넘기고, 그 사이에 온 것은 최신 하나만 남긴다.
+"""
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+PROGRESS_HZ = 10.0
+
+@dataclass(frozen=True)
+class ProgressSnapshot:
+  frame: int = 0
+  fps: float = 0.0
+  bitrate_kbps: float = 0.0
+  total_size: int = 0       # 지금까지 쓴 출력 바이트
+  out_time_us: int = 0
+  speed: float = 0.0
+  end: bool = False         # progress=end (성공 여부와 무관하게 마지막 블록)
+
+  @property
+  def out_time(self) -> float:
+    return self.out_time_us / 1_000_000
+
+  def fraction(self, duration: float) -> float:
+    if duration <= 0:
+      return 0.0
+    return max(0.0, min(1.0, self.out_time / duration))
+
+SnapshotFn = Callable[[ProgressSnapshot], None]
+
+def _int(v: bytes | None) -> int:
+  try:
+    return int(v) if v else 0
+  except ValueError:
+    return 0
+
+def _float(v: bytes | None, suffix: bytes = b"") -> float:
+  if not v:
+    return 0.0
+  if suffix and v.endswith(suffix):
+    v = v[:-len(suffix)]
+  try:
+    return float(v)
+  except ValueError:   # N/A
+    return 0.0
+
+def _out_time_us(block: dict[bytes, bytes]) -> int:
+  us = _int(block.get(b"out_time_us"))
+  if us > 0:
+    return us
+  # 오래된 ffmpeg: out_time=HH:MM:SS.micro 만 있음
+  hh, _, rest = (block.get(b"out_time") or b"").partition(b":")
+  mm, _, ss = rest.partition(b":")
+  try:
+    return int((int(hh) * 3600 + int(mm) * 60 + float(ss)) * 1_000_000)
+  except ValueError:
+    return 0
+
+class ProgressParser:
+  """-progress 바이트 스트림 → 블록마다 on_snapshot(snapshot). last에는 마지막 스냅샷."""
+
+  def __init__(self, on_snapshot: SnapshotFn | None = None):
+    self.on_snapshot = on_snapshot
+    self.last: ProgressSnapshot | None = None
+    self._buf = b""
+    self._block: dict[bytes, bytes] = {}
+
+  def feed(self, data: bytes) -> None:
+    *lines, self._buf = (self._buf + data).split(b"\n")
+    for line in lines:
+      key, sep, val = line.partition(b"=")
+      if not sep:
+        continue
+      key, val = key.strip(), val.strip()
+      if key == b"progress":
+        self._finish(val == b"end")
+      else:
+        self._block[key] = val
+
+  def _finish(self, end: bool) -> None:
+    b = self._block
+    snap = ProgressSnapshot(
+      frame=_int(b.get(b"frame")),
+      fps=_float(b.get(b"fps")),
+      bitrate_kbps=_float(b.get(b"bitrate"), b"kbits/s"),
+      total_size=_int(b.get(b"total_size")),
+      out_time_us=_out_time_us(b),
+      speed=_float(b.get(b"speed"), b"x"),
+      end=end,
+    )
+    self._block = {}
+    self.last = snap
+    if self.on_snapshot is not None:
+      self.on_snapshot(snap)
+
+class ProgressThrottle:
+  """스냅샷을 초당 최대 hz번만 deliver. 사이에 온 것은 최신 하나만 남았다가 다음 push/flush 때 나간다.
+  end 스냅샷은 항상 바로 나간다."""
+
+  def __init__(self, deliver: SnapshotFn, hz: float = PROGRESS_HZ, clock: Callable[[], float] = time.monotonic):
+    self._deliver = deliver
+    self._interval = 1.0 / hz if hz > 0 else 0.0
+    self._clock = clock
+    self._last = float("-inf")
+    self._pending: ProgressSnapshot | None = None
+
+  def push(self, snap: ProgressSnapshot) -> None:
+    now = self._clock()
+    if snap.end or now - self._last >= self._interval:
+      self._pending = None
+      self._last = now
+      self._deliver(snap)
+    else:
+      self._pending = snap
+
+  def flush(self) -> None:
+    snap, self._pending = self._pending, None
+    if snap is not None:
+      self._last = self._clock()
+      self._deliver(snap)
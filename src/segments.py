@@ -0,0 +1,85 @@
+# segments.py
+"""
+긴 입력의 구간 병렬 인코딩 도우미 (GUI 의존 없음).
+- plan_segments: 출력 타임라인을 GOP 배수 프레임 경계로 N등분한다. 경계는 원본 키프레임 바로 뒤로 당겨
+  각 구간의 -ss 탐색이 버리는 디코드를 줄인다.
+- join_elementary: 구간별 MPEG-1 ES를 바이트 그대로 이어 붙인다 (중간의 sequence end code만 제거).
+  이어 붙이면서 picture start code를 세어 구간별 프레임 수를 확인한다.
+"""
+import bisect, os
+
+GOP_FRAMES = 18               # ffargs의 -g 와 같아야 한다 (구간 경계가 GOP 경계)
+SEGMENT_MIN_FRAMES = 10 * GOP_FRAMES
+_SNAP_RANGE = 0.1             # 이상적인 경계에서 구간 길이의 이 비율 안에서만 키프레임 쪽으로 옮긴다
+
+SEQ_END_CODE = b"\x00\x00\x01\xb7"
+PICTURE_START_CODE = b"\x00\x00\x01\x00"
+
+def segment_jobs(state) -> int:
+  """동시에 인코딩할 구간 수. 0 이하면 CPU 코어 수 기준 자동 (mpeg1video 인코더 하나가 코어 ~4개를 씀)."""
+  try:
+    jobs = int(state.get("segment_jobs", 0))
+  except Exception:
+    jobs = 0
+  if jobs <= 0:
+    jobs = min(8, max(1, (os.cpu_count() or 1) // 4))
+  return jobs
+
+def plan_segments(total_frames: int, fps: float, jobs: int, keyframes: list[float] | None = None,
+                  gop: int = GOP_FRAMES) -> list[tuple[int, int]]:
+  """
+  [(시작 프레임, 프레임 수)] — 출력 프레임 기준. 마지막 구간의 프레임 수는 끝까지 (대략값).
+  모든 경계는 gop의 배수라서 이어 붙여도 GOP 주기가 한 번에 인코딩한 것과 같다.
+  """
+  n = max(1, min(int(jobs), total_frames // max(1, SEGMENT_MIN_FRAMES)))
+  if n <= 1 or fps <= 0:
+    return [(0, total_frames)]
+  keys = sorted(keyframes or [])
+  seg_len = total_frames / n
+  bounds = [0]
+  for i in range(1, n):
+    ideal = total_frames * i / n
+    lo = max(bounds[-1] + gop, int((ideal - seg_len * _SNAP_RANGE) // gop + 1) * gop)
+    hi = min(total_frames - gop, int((ideal + seg_len * _SNAP_RANGE) // gop) * gop)
+    if lo > hi:
+      continue
+    best, best_cost = lo, None
+    for g in range(lo, hi + 1, gop):
+      cost = (_seek_waste(keys, g / fps), abs(g - ideal))
+      if best_cost is None or cost < best_cost:
+        best, best_cost = g, cost
+    bounds.append(best)
+  bounds.append(total_frames)
+  return [(a, b - a) for a, b in zip(bounds, bounds[1:])]
+
+def _seek_waste(keys: list[float], t: float) -> float:
+  """t로 정확 탐색할 때 직전 키프레임부터 버리며 디코드해야 하는 길이(초). 키프레임 정보가 없으면 0."""
+  if not keys:
+    return 0.0
+  i = bisect.bisect_right(keys, t + 1e-6)
+  return t - keys[i - 1] if i > 0 else t
+
+def join_elementary(parts: list[str], out_path: str, chunk: int = 1024 * 1024) -> list[int]:
+  """parts를 순서대로 out_path에 이어 붙인다. 구간별 picture 수를 반환."""
+  counts: list[int] = []
+  with open(out_path, "wb") as out:
+    for idx, path in enumerate(parts):
+      size = os.path.getsize(path)
+      with open(path, "rb") as f:
+        if idx < len(parts) - 1 and size >= 4:
+          f.seek(size - 4)
+          if f.read(4) == SEQ_END_CODE:
+            size -= 4     # 다음 구간의 sequence header가 바로 이어지므로 중간의 끝 표시는 뺀다
+          f.seek(0)
+        pictures, tail, left = 0, b"", size
+        while left > 0:
+          data = f.read(min(chunk, left))
+          if not data:
+            break
+          left -= len(data)
+          out.write(data)
+          # 청크 경계에 걸친 start code도 세도록 앞 청크의 끝 3바이트를 붙여서 센다
+          pictures += (tail + data).count(PICTURE_START_CODE)
+          tail = data[-3:]
+      counts.append(pictures)
+  return counts
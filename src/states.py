@@ -1,40 +1,165 @@
-from typing import Any, Callable, Dict, Optional
-
-global_state = {
-  "input_path": "",
-  "output_dir": "",
-  "output_name": "",
-  "res_preset": "512x512",
-  "width": 512,
-  "height": 512,
-  "fps_locked": True,
-  "fps": 30,
-  "bitrate_k": 1600,
-  "buffer_locked": True,
-  "buffer_k": 2900,
-  "mux_k": 2100,
-  "mux_auto": True,
-  "codec": "MPEG1",
-  "source_width": 0,
-  "source_height": 0,
-  "letterbox_mode": "black",
-  "letterbox_color": (255, 255, 255),
-  "letterbox_blur_radius": 20,
-  "letterbox_blur_brightness": 100,
-  "verbose": True,
-  "auto_max_attempts": 0
-}
-ffmpeg_cmd = "";
-_on_change: Optional[Callable[[], None]] = None
+import threading
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, Iterator, Optional
+
+Listener = Callable[[frozenset], None]   # 바뀐 키 집합
+
+@dataclass(slots=True, eq=False)
+class AppState(MutableMapping):
+  """
+  GUI 설정 상태. 키는 타입이 있는 속성이고, dict처럼도 읽고 쓸 수 있다 (ffargs/ConvertOptions 호환).
+  값이 실제로 바뀔 때만 키별 version이 오르고 구독자에게 바뀐 키 집합을 알린다.
+  `with state.batch():` 안의 변경은 블록이 끝날 때 한 번에 알린다.
+  """
+  input_path: str = ""
+  output_dir: str = ""
+  output_name: str = ""
+  res_preset: str = "512x512"
+  width: int = 512
+  height: int = 512
+  fps_locked: bool = True
+  fps: float = 30
+  bitrate_k: int = 1600
+  buffer_locked: bool = True
+  buffer_k: int = 2900
+  mux_k: int = 2100
+  mux_auto: bool = True
+  codec: str = "MPEG1"
+  source_width: int = 0
+  source_height: int = 0
+  letterbox_mode: str = "black"
+  letterbox_color: tuple = (255, 255, 255)
+  letterbox_blur_radius: int = 20
+  letterbox_blur_brightness: int = 100
+  verbose: bool = True
+  auto_max_attempts: int = 0
+  mux_probe_remux: bool = True
+  mux_promote_probe: bool = True
+  mux_parallel_jobs: int = 0
+  mux_solver: bool = True
+  mux_cache: bool = True
+  mux_warm_start: bool = True
+  scratch_dir: str = ""
+  mux_window_probe: bool = True
+  mux_window_sec: float = 10
+  mux_window_count: int = 1
+  queue_workers: int = 2
+  stream_copy: bool = True
+  segment_jobs: int = 0
+  segment_min_sec: float = 120
+  resume_segments: bool = False
+  mezzanine_cache: bool = False
+  mezzanine_budget_mb: int = 4096
+  mezzanine_dir: str = ""
+  output_store: bool = False
+  output_store_budget_mb: int = 8192
+  output_store_dir: str = ""
+  extra_outputs: str = ""   # 같은 디코드로 함께 만들 출력 (multiout 프로필, 쉼표로 구분. 예: "beatoraja")
+
+  _versions: Dict[str, int] = field(default_factory=dict, repr=False)
+  _listeners: list = field(default_factory=list, repr=False)
+  _batch: int = field(default=0, repr=False)
+  _changed: set = field(default_factory=set, repr=False)
+  _lock: Any = field(default_factory=threading.Lock, repr=False)
+
+  def __setattr__(self, name: str, value: Any) -> None:
+    # 생성 중(__init__)에는 그대로, 이후 공개 키 대입은 set()으로 (알림 포함)
+    if name in _KEYS and getattr(self, "_lock", None) is not None:
+      self.set(name, value)
+    else:
+      object.__setattr__(self, name, value)
+
+  # ── 쓰기
+  def set(self, key: str, value: Any) -> bool:
+    """값이 바뀌었으면 True. 배치 중이 아니면 바로 구독자에게 알린다."""
+    if key not in _KEYS:
+      raise KeyError(key)
+    with self._lock:
+      if getattr(self, key) == value:
+        return False
+      object.__setattr__(self, key, value)
+      self._versions[key] = self._versions.get(key, 0) + 1
+      self._changed.add(key)
+      if self._batch:
+        return True
+      changed = self._take_changed()
+    self._notify(changed)
+    return True
+
+  def update(self, other=(), /, **kw) -> None:
+    with self.batch():
+      for k, v in dict(other, **kw).items():
+        self.set(k, v)
+
+  @contextmanager
+  def batch(self):
+    """블록 안의 변경을 모아 끝날 때 한 번만 알린다 (중첩 가능)."""
+    with self._lock:
+      self._batch += 1
+    try:
+      yield self
+    finally:
+      with self._lock:
+        self._batch -= 1
+        changed = self._take_changed() if self._batch == 0 else frozenset()
+      if changed:
+        self._notify(changed)
+
+  def _take_changed(self) -> frozenset:
+    # lock 보유 상태에서 호출
+    changed = frozenset(self._changed)
+    self._changed.clear()
+    return changed
+
+  # ── 구독/버전
+  def subscribe(self, cb: Listener) -> None:
+    self._listeners.append(cb)
+
+  def _notify(self, changed: frozenset) -> None:
+    for cb in list(self._listeners):
+      try:
+        cb(changed)
+      except Exception:
+        pass
+
+  def versions(self, keys) -> tuple:
+    """keys의 현재 version 묶음. 파생값 메모이즈의 캐시 키로 쓴다."""
+    v = self._versions
+    return tuple(v.get(k, 0) for k in keys)
+
+  # ── dict 호환
+  def __getitem__(self, key: str) -> Any:
+    if key not in _KEYS:
+      raise KeyError(key)
+    return getattr(self, key)
+
+  def __setitem__(self, key: str, value: Any) -> None:
+    self.set(key, value)
+
+  def __delitem__(self, key: str) -> None:
+    raise TypeError("state keys cannot be deleted")
+
+  def __iter__(self) -> Iterator[str]:
+    return iter(_KEY_ORDER)
+
+  def __len__(self) -> int:
+    return len(_KEY_ORDER)
+
+  def __contains__(self, key) -> bool:
+    return key in _KEYS
+
+_KEY_ORDER = tuple(f.name for f in fields(AppState) if not f.name.startswith("_"))
+_KEYS = frozenset(_KEY_ORDER)
+
+global_state = AppState()
 
 def set_update_callback(cb: Callable[[], None]) -> None:
-  global _on_change
-  _on_change = cb
+  global_state.subscribe(lambda _changed: cb())
 
-def get_state() -> Dict[str, Any]:
+def get_state() -> AppState:
   return global_state
 
 def set_state(key: str, value: Any) -> None:
-  global_state[key] = value
-  if _on_change is not None:
-    _on_change()
\ No newline at end of file
+  global_state.set(key, value)
@@ -0,0 +1,255 @@
+# supervisor.py
+"""
+ffmpeg/ffprobe 자식 프로세스 감독자.
+전용 스레드 하나에서 asyncio 이벤트 루프를 돌리고, 모든 자식의 stdout/stderr를 그 루프에서
+논블로킹으로 읽는다 (프로세스마다 리더 스레드 2개를 띄우지 않는다).
+
+  h = ProcHandle(cmd)
+  h.subscribe(lambda stream, line: ...)   # stream = "stdout" | "stderr"
+  h.subscribe_raw(lambda stream, data: ...)  # 바이트 그대로 (예: -progress 파서)
+  start(h)
+  code = h.wait()          # 스레드에서
+  code = await h           # 코루틴에서 (어느 이벤트 루프든)
+
+구독자 콜백은 감독자 루프 스레드에서 호출되므로 가볍게 유지할 것 (막히면 모든 프로세스 읽기가 멈춘다).
+종료 대기: Python 3.12+ Linux는 pidfd, Windows는 Proactor라 추가 스레드가 없다.
+3.11 이하/macOS는 asyncio 기본 watcher가 자식마다 waitpid 스레드를 하나 둔다 (파이프는 읽지 않고 잠만 잔다).
+"""
+import asyncio, re, signal, subprocess, threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable
+
+from src.env import IS_WINDOWS
+
+LineFn = Callable[[str, str], None]       # (stream, 디코드된 줄)
+RawFn = Callable[[str, bytes], None]       # (stream, 받은 바이트 그대로)
+
+STOP_GRACE_SEC = 1.5        # stop(): SIGTERM 후 이 시간 안에 안 끝나면 kill
+_LINE_SPLIT = re.compile(rb"\r\n|\r|\n")
+_STREAMS = {1: "stdout", 2: "stderr"}
+_FDS = {"stdout": 1, "stderr": 2}
+
+class ProcHandle:
+  """자식 프로세스 하나. Popen과 비슷한 최소 API(pid/returncode/poll/wait/terminate/kill)에 stop()과 await를 더했다."""
+
+  def __init__(self, cmd: list[str], *, capture: bool = False):
+    self.cmd = [str(c) for c in cmd]
+    self.capture = capture            # True면 stdout을 통째로 모으고 stderr는 버림 (ffprobe용)
+    self.pid = 0
+    self.returncode: int | None = None
+    self.output = b""
+    self._subs: dict[int, list[LineFn]] = {1: [], 2: []}
+    self._raw: dict[int, list[RawFn]] = {1: [], 2: []}
+    self._proc: asyncio.SubprocessTransport | None = None
+    self._loop: asyncio.AbstractEventLoop | None = None
+    self._started: Future = Future()
+    self._exit: Future = Future()
+    self._stop_pending = False
+
+  # ── 구독 (start() 전에 등록해야 처음부터 받는다)
+  def subscribe(self, cb: LineFn, streams: tuple[str, ...] = ("stdout", "stderr")) -> None:
+    """줄 단위 출력 구독."""
+    for name in streams:
+      self._subs[_FDS[name]].append(cb)
+
+  def subscribe_raw(self, cb: RawFn, streams: tuple[str, ...] = ("stdout",)) -> None:
+    """받은 바이트 덩어리 그대로 구독 (줄 자르기/디코드 없음). 그 스트림에 줄 구독자가 없으면 줄 자르기도 생략된다."""
+    for name in streams:
+      self._raw[_FDS[name]].append(cb)
+
+  def _emit(self, fd: int, raw: bytes) -> None:
+    line = raw.decode("utf-8", "replace")
+    for cb in self._subs[fd]:
+      try:
+        cb(_STREAMS[fd], line)
+      except Exception:
+        pass
+
+  def _emit_raw(self, fd: int, data: bytes) -> None:
+    for cb in self._raw[fd]:
+      try:
+        cb(_STREAMS[fd], data)
+      except Exception:
+        pass
+
+  # ── 대기
+  def poll(self) -> int | None:
+    return self.returncode
+
+  def wait(self, timeout: float | None = None) -> int:
+    try:
+      return self._exit.result(timeout)
+    except FutureTimeout:
+      raise subprocess.TimeoutExpired(self.cmd, timeout)
+
+  def __await__(self):
+    return asyncio.wrap_future(self._exit).__await__()
+
+  # ── 종료 (스레드 안전, 막히지 않음)
+  def _call(self, fn, *args) -> None:
+    if self._loop is None or self._exit.done():
+      return
+    try:
+      self._loop.call_soon_threadsafe(fn, *args)
+    except RuntimeError:
+      pass
+
+  def send_signal(self, sig: int) -> None:
+    self._call(self._signal, sig)
+
+  def terminate(self) -> None:
+    self._call(self._signal, None)
+
+  def kill(self) -> None:
+    self._call(self._kill)
+
+  def stop(self, grace: float = STOP_GRACE_SEC) -> None:
+    """SIGTERM(Windows는 terminate) 후 grace초 안에 끝나지 않으면 kill."""
+    self._call(self._stop, grace)
+
+  # 아래는 루프 스레드에서만 호출
+  def _signal(self, sig) -> None:
+    if self._proc is None or self._proc.get_returncode() is not None:
+      return
+    try:
+      if sig is None:
+        if IS_WINDOWS:
+          self._proc.terminate()
+        else:
+          self._proc.send_signal(signal.SIGTERM)
+      else:
+        self._proc.send_signal(sig)
+    except ProcessLookupError:
+      pass
+
+  def _kill(self) -> None:
+    if self._proc is None or self._proc.get_returncode() is not None:
+      return
+    try:
+      self._proc.kill()
+    except ProcessLookupError:
+      pass
+
+  def _stop(self, grace: float) -> None:
+    if self._stop_pending:
+      return
+    self._stop_pending = True
+    self._signal(None)
+    self._loop.call_later(grace, self._kill)
+
+class Supervisor:
+  """이벤트 루프 스레드 하나가 모든 자식 프로세스를 관리한다."""
+
+  def __init__(self):
+    self.loop = asyncio.new_event_loop()   # Windows는 기본이 Proactor (서브프로세스 지원)
+    self._ready = threading.Event()
+    self._active: set[ProcHandle] = set()
+    self._thread = threading.Thread(target=self._main, name="ff-supervisor", daemon=True)
+    self._thread.start()
+    self._ready.wait()
+
+  def _main(self) -> None:
+    asyncio.set_event_loop(self.loop)
+    self._ready.set()
+    self.loop.run_forever()
+
+  @property
+  def active(self) -> int:
+    return len(self._active)
+
+  def start(self, h: ProcHandle) -> ProcHandle:
+    """프로세스를 띄우고 실행이 시작될 때까지 기다린다. 실행 실패(파일 없음 등)는 그대로 raise."""
+    h._loop = self.loop
+    asyncio.run_coroutine_threadsafe(self._run(h), self.loop)
+    h._started.result()
+    return h
+
+  async def _run(self, h: ProcHandle) -> None:
+    proto = _PipeProtocol(h, self.loop)
+    try:
+      transport, _ = await self.loop.subprocess_exec(
+        lambda: proto, *h.cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL if h.capture else subprocess.PIPE,
+      )
+    except BaseException as e:
+      h._started.set_exception(e)
+      h._exit.set_exception(e)
+      return
+    h._proc = transport
+    h.pid = transport.get_pid()
+    self._active.add(h)
+    h._started.set_result(h.pid)
+    try:
+      await proto.done
+    finally:
+      self._active.discard(h)
+    h.output = b"".join(proto.chunks)
+    h.returncode = transport.get_returncode()
+    transport.close()
+    h._exit.set_result(h.returncode)
+
+class _PipeProtocol(asyncio.SubprocessProtocol):
+  """받은 덩어리를 바로 줄로 잘라 구독자에게 넘긴다 (StreamReader/코루틴 왕복 없음).
+  readline()과 달리 \r 진행 줄도 나누고 줄 길이 한도도 없다."""
+
+  def __init__(self, h: ProcHandle, loop: asyncio.AbstractEventLoop):
+    self.h = h
+    self.bufs = {1: b"", 2: b""}
+    self.chunks: list[bytes] = []
+    self.done = loop.create_future()
+
+  def pipe_data_received(self, fd: int, data: bytes) -> None:
+    if self.h.capture:
+      self.chunks.append(data)
+      return
+    h = self.h
+    if h._raw[fd]:
+      h._emit_raw(fd, data)
+    if not h._subs[fd]:
+      return
+    *lines, self.bufs[fd] = _LINE_SPLIT.split(self.bufs[fd] + data)
+    for raw in lines:
+      if raw:
+        h._emit(fd, raw)
+
+  def pipe_connection_lost(self, fd: int, exc) -> None:
+    rest = self.bufs.pop(fd, b"")
+    if rest and not self.h.capture:
+      self.h._emit(fd, rest)
+
+  def connection_lost(self, exc) -> None:
+    # 프로세스가 끝나고 모든 파이프가 닫힌 뒤에 한 번 불린다
+    if not self.done.done():
+      self.done.set_result(None)
+
+_sup: Supervisor | None = None
+_sup_lock = threading.Lock()
+
+def get_supervisor() -> Supervisor:
+  global _sup
+  with _sup_lock:
+    if _sup is None:
+      _sup = Supervisor()
+    return _sup
+
+def start(h: ProcHandle) -> ProcHandle:
+  return get_supervisor().start(h)
+
+def spawn(cmd: list[str], on_line: LineFn | None = None) -> ProcHandle:
+  h = ProcHandle(cmd)
+  if on_line is not None:
+    h.subscribe(on_line)
+  return start(h)
+
+def check_output(cmd: list[str], *, text: bool = True, timeout: float | None = None):
+  """subprocess.check_output(cmd, stderr=DEVNULL) 대응. 0이 아닌 종료 코드는 CalledProcessError."""
+  h = start(ProcHandle(cmd, capture=True))
+  try:
+    code = h.wait(timeout)
+  except subprocess.TimeoutExpired:
+    h.kill()
+    raise
+  if code != 0:
+    raise subprocess.CalledProcessError(code, h.cmd, output=h.output)
+  return h.output.decode("utf-8", "replace") if text else h.output
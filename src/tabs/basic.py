@@ -1,7 +1,7 @@
 import dearpygui.dearpygui as dpg
 from src.explorer import open_dir_native, open_file_native
 from src.states import set_state
-from src.cmdline import update_command, _fmt_estimated_size_value
+from src.cmdline import _fmt_estimated_size_value
 from src.ui_components import p, \
      make_lock_pair_float, make_lock_pair_int, apply_lock_pair
 from src.ui_callbacks import (
@@ -84,11 +84,11 @@ def init():
         with dpg.group(horizontal=True):
           # Custom 폭/높이 (입력/표시 페어)
           dpg.add_input_int(tag="w_custom", default_value=512, width=120, step=1, min_value=1, min_clamped=True,
-                            callback=lambda s,a: (set_state("width", int(a)), refresh_letterbox_controls(), update_command()))
+                            callback=lambda s,a: (set_state("width", int(a)), refresh_letterbox_controls()))
           p("", tag="w_display", show=True)  # 초기엔 프리셋=락 → 표시용 보이기
           p("x")
           dpg.add_input_int(tag="h_custom", default_value=512, width=120, step=1, min_value=1, min_clamped=True,
-                            callback=lambda s,a: (set_state("height", int(a)), refresh_letterbox_controls(), update_command()))
+                            callback=lambda s,a: (set_state("height", int(a)), refresh_letterbox_controls()))
           p("", tag="h_display", show=True)
           dpg.bind_item_theme("w_display", "theme_locked_text")
           dpg.bind_item_theme("h_display", "theme_locked_text")
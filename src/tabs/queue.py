@@ -0,0 +1,222 @@
+import dearpygui.dearpygui as dpg
+import dataclasses, os
+
+from src.states import global_state, set_state
+from src.engine import ConvertOptions
+from src.ffargs import preset_resolution
+from src.jobqueue import JobQueue, QUEUED, RUNNING, DONE, FAILED, CANCELLED
+from src.mediainfo import media_info
+from src.explorer import pick_files_native, pick_folder_native, list_media_files
+from src.ui_components import p
+from src.util import nfc
+from src.ui_update import on_frame
+import src.ui_dispatch as ui_dispatch
+from src import i18n
+
+queue = JobQueue(workers=int(global_state.get("queue_workers", 2) or 2))
+_selected: int | None = None
+_log_shown: tuple[int | None, int] = (None, -1)   # (항목 id, 그 로그의 version) — 화면에 그린 상태
+
+_STATUS_KEYS = {
+  QUEUED: "msg.queue_queued",
+  RUNNING: "msg.queue_running",
+  DONE: "msg.queue_done",
+  FAILED: "msg.queue_failed",
+  CANCELLED: "msg.queue_cancelled",
+}
+_STATUS_COLORS = {
+  QUEUED: (150, 150, 150),
+  RUNNING: (255, 255, 0),
+  DONE: (120, 220, 120),
+  FAILED: (255, 110, 110),
+  CANCELLED: (150, 150, 150),
+}
+
+def snapshot_options(path: str, root: str | None = None) -> ConvertOptions:
+  """현재 기본 탭 설정을 파일 하나에 맞춰 고정한 스냅샷.
+  출력 폴더가 정해져 있고 폴더째 추가한 경우(root)에는 root 아래 하위 폴더 구조를 출력 폴더에 그대로 만든다."""
+  info = media_info(path)
+  output_dir = global_state.get("output_dir") or os.path.dirname(path)
+  if global_state.get("output_dir") and root:
+    rel = os.path.relpath(os.path.dirname(path), root)
+    if rel != "." and not rel.startswith(".."):
+      output_dir = os.path.join(output_dir, rel)
+  overrides = {
+    "input_path": path,
+    "output_dir": output_dir,
+    "output_name": os.path.splitext(os.path.basename(path))[0],
+    "source_width": info.width,
+    "source_height": info.height,
+  }
+  size = preset_resolution(str(global_state.get("res_preset", "")), info.width, info.height)
+  if size is not None:
+    overrides["width"], overrides["height"] = size
+  if dpg.does_item_exist("mux_auto_chk"):
+    overrides["mux_auto"] = bool(dpg.get_value("mux_auto_chk"))
+  return ConvertOptions.from_state(global_state, **overrides)
+
+def _path_key(path: str) -> str:
+  return os.path.normcase(os.path.realpath(path))
+
+def enqueue(paths: list[str], root: str | None = None):
+  """
+  출력 경로가 입력 파일 자신이면(.mpg 입력을 같은 폴더로) 건너뛰고,
+  대기/실행 중인 다른 항목과 출력 경로가 겹치면 이름 뒤에 _2, _3...을 붙인다.
+  """
+  taken = {_path_key(it.options.output_path()) for it in queue.items() if it.status in (QUEUED, RUNNING)}
+  skipped = 0
+  for path in paths:
+    if not (path and os.path.isfile(path)):
+      continue
+    opts = snapshot_options(os.path.abspath(path), root)
+    if _path_key(opts.output_path()) == _path_key(path):
+      skipped += 1
+      continue
+    base, n = opts.output_name, 2
+    while _path_key(opts.output_path()) in taken:
+      opts = dataclasses.replace(opts, output_name=f"{base}_{n}")
+      n += 1
+    taken.add(_path_key(opts.output_path()))
+    os.makedirs(opts.output_dir, exist_ok=True)
+    queue.add(opts)
+  if dpg.does_item_exist("queue_notice"):
+    dpg.set_value("queue_notice", i18n.t("msg.queue_skipped_same", n=skipped) if skipped else "")
+
+def on_add_files(sender=None, app_data=None, user_data=None):
+  enqueue(pick_files_native())
+
+def on_add_folder(sender=None, app_data=None, user_data=None):
+  folder = pick_folder_native()
+  if folder:
+    enqueue(list_media_files(folder), root=folder)
+
+def on_workers(sender, app_data):
+  n = max(1, min(16, int(app_data)))
+  set_state("queue_workers", n)
+  queue.set_workers(n)
+
+def _select(item_id: int):
+  global _selected
+  _selected = item_id
+  ui_dispatch.wake()
+
+def _refresh_log():
+  """프레임마다 호출: 선택 항목이나 그 로그가 바뀐 경우에만 다시 그린다."""
+  global _log_shown
+  if not dpg.does_item_exist("queue_log"):
+    return False
+  it = queue.get(_selected) if _selected is not None else None
+  state = (it.id, it.log.version) if it else (None, -1)
+  if state == _log_shown:
+    return False
+  _log_shown = state
+  dpg.set_value("queue_log", it.log.text() if it else "")
+  return True
+on_frame(_refresh_log)
+
+def _add_row(item_id: int):
+  it = queue.get(item_id)
+  if it is None or dpg.does_item_exist(f"q_row_{item_id}"):
+    return
+  with dpg.table_row(parent="queue_table", tag=f"q_row_{item_id}"):
+    dpg.add_selectable(label=nfc(it.name), span_columns=False, callback=lambda s, a, u: _select(u),
+                       user_data=item_id, tag=f"q_name_{item_id}")
+    p("", tag=f"q_status_{item_id}")
+    dpg.add_progress_bar(tag=f"q_prog_{item_id}", default_value=0.0, width=-1, height=10)
+    with dpg.group(horizontal=True):
+      dpg.add_button(label=i18n.t("button.cancel"), tag=f"q_cancel_{item_id}",
+                     callback=lambda s, a, u: queue.cancel(u), user_data=item_id)
+      dpg.add_button(label=i18n.t("button.retry"), tag=f"q_retry_{item_id}", show=False,
+                     callback=lambda s, a, u: queue.retry(u), user_data=item_id)
+      dpg.add_button(label=i18n.t("button.remove"), tag=f"q_remove_{item_id}", show=False,
+                     callback=lambda s, a, u: queue.remove(u), user_data=item_id)
+  _update_row(item_id)
+
+def _update_row(item_id: int):
+  it = queue.get(item_id)
+  if it is None or not dpg.does_item_exist(f"q_row_{item_id}"):
+    return
+  dpg.set_value(f"q_status_{item_id}", i18n.t(_STATUS_KEYS[it.status]))
+  dpg.configure_item(f"q_status_{item_id}", color=_STATUS_COLORS[it.status])
+  dpg.set_value(f"q_prog_{item_id}", max(0.0, min(1.0, it.progress)))
+  active = it.status in (QUEUED, RUNNING)
+  dpg.configure_item(f"q_cancel_{item_id}", show=active)
+  dpg.configure_item(f"q_retry_{item_id}", show=it.status in (FAILED, CANCELLED))
+  dpg.configure_item(f"q_remove_{item_id}", show=not active)
+  _update_summary()
+
+def _update_summary():
+  if not dpg.does_item_exist("queue_summary"):
+    return
+  c = queue.counts()
+  dpg.set_value("queue_summary", i18n.t("msg.queue_summary", done=c[DONE], total=sum(c.values()),
+                                        running=c[RUNNING], failed=c[FAILED]))
+
+def _remove_row(item_id: int):
+  if dpg.does_item_exist(f"q_row_{item_id}"):
+    dpg.delete_item(f"q_row_{item_id}")
+  _update_summary()
+
+def _on_queue_change(item_id: int, kind: str):
+  # 워커 스레드에서 호출됨 → 위젯 조작은 다음 프레임에 메인 스레드에서 (같은 행 갱신은 하나로 합침)
+  if kind == "added":
+    ui_dispatch.post(_add_row, item_id, key=("q_add", item_id))
+  elif kind == "removed":
+    ui_dispatch.post(_remove_row, item_id, key=("q_remove", item_id))
+  elif kind in ("status", "progress"):
+    ui_dispatch.post(_update_row, item_id, key=("q_row", item_id))
+  elif kind == "log" and item_id == _selected:
+    ui_dispatch.wake()
+
+def _refresh_labels(_lang: str):
+  for it in queue.items():
+    for tag, key in ((f"q_cancel_{it.id}", "button.cancel"), (f"q_retry_{it.id}", "button.retry"),
+                     (f"q_remove_{it.id}", "button.remove")):
+      if dpg.does_item_exist(tag):
+        dpg.configure_item(tag, label=i18n.t(key))
+    _update_row(it.id)
+i18n.on_change(_refresh_labels)
+
+def init():
+  queue.on_change(_on_queue_change)
+  with dpg.tab(label=i18n.t("tab.queue"), tag="tab_queue"):
+    i18n.bind_label("tab_queue", "tab.queue")
+
+    with dpg.group(horizontal=True):
+      dpg.add_button(label=i18n.t("button.add_files"), tag="btn_queue_add_files", callback=on_add_files)
+      i18n.bind_label("btn_queue_add_files", "button.add_files")
+      dpg.add_button(label=i18n.t("button.add_folder"), tag="btn_queue_add_folder", callback=on_add_folder)
+      i18n.bind_label("btn_queue_add_folder", "button.add_folder")
+      dpg.add_spacer(width=20)
+      p("label.queue_workers")
+      p("(?)", color=(150,150,150))
+      with dpg.tooltip(dpg.last_item()):
+        p("tooltip.queue_workers")
+      dpg.add_input_int(tag="queue_workers_input", default_value=queue.workers, width=90, step=1,
+                        min_value=1, max_value=16, min_clamped=True, max_clamped=True, callback=on_workers)
+      dpg.add_spacer(width=20)
+      dpg.add_button(label=i18n.t("button.cancel_all"), tag="btn_queue_cancel_all",
+                     callback=lambda: queue.cancel_all())
+      i18n.bind_label("btn_queue_cancel_all", "button.cancel_all")
+      dpg.add_button(label=i18n.t("button.clear_finished"), tag="btn_queue_clear",
+                     callback=lambda: queue.clear_finished())
+      i18n.bind_label("btn_queue_clear", "button.clear_finished")
+
+    p("", tag="queue_summary", color=(150,150,150))
+    _update_summary()
+    p("", tag="queue_notice", color=(255,180,80))
+
+    with dpg.child_window(height=300, width=-1):
+      with dpg.table(tag="queue_table", header_row=False, policy=dpg.mvTable_SizingStretchProp,
+                     resizable=False, borders_innerV=False, borders_innerH=True,
+                     borders_outerV=False, borders_outerH=False, row_background=True):
+        dpg.add_table_column(init_width_or_weight=1)
+        dpg.add_table_column(width_fixed=True, init_width_or_weight=90)
+        dpg.add_table_column(width_fixed=True, init_width_or_weight=160)
+        dpg.add_table_column(width_fixed=True, init_width_or_weight=150)
+
+    dpg.add_separator()
+    p("label.queue_log_hint", color=(150,150,150))
+    dpg.add_input_text(tag="queue_log", multiline=True, readonly=True,
+                       width=-1, height=-1, default_value="", tab_input=True)
+    dpg.bind_item_font(dpg.last_item(), "mono")
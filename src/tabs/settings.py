@@ -1,6 +1,8 @@
 import dearpygui.dearpygui as dpg
 from src.ui_components import h1, h2, p
-from src.ui_callbacks import on_lang_change
+from src.ui_callbacks import on_lang_change, on_clear_mux_cache, on_mezz_cache_toggle, on_clear_mezz_cache, \
+     refresh_mezz_status, on_extra_outputs, on_out_store_toggle, on_clear_out_store, refresh_store_status
+from src.states import get_state
 from src import i18n
 
 def init():
@@ -11,7 +13,7 @@ def init():
     with dpg.table(header_row=False, policy=dpg.mvTable_SizingStretchProp,
                    resizable=False, borders_innerV=False, borders_innerH=False,
                    borders_outerV=False, borders_outerH=False):
-      dpg.add_table_column(width_fixed=True, init_width_or_weight=90)
+      dpg.add_table_column(width_fixed=True, init_width_or_weight=160)
       dpg.add_table_column(init_width_or_weight=1)
 
       with dpg.table_row():
@@ -24,6 +26,59 @@ def init():
           callback=on_lang_change
         )
 
+      with dpg.table_row():
+        with dpg.group(horizontal=True):
+          p("label.mux_cache")
+          p("(?)", color=(150,150,150))
+          with dpg.tooltip(dpg.last_item()):
+            p("tooltip.mux_cache")
+        with dpg.group(horizontal=True):
+          dpg.add_button(label=i18n.t("button.clear_cache"), width=120, tag="btn_clear_mux_cache",
+                         callback=on_clear_mux_cache)
+          i18n.bind_label("btn_clear_mux_cache", "button.clear_cache")
+          p("", tag="mux_cache_status", color=(150,150,150))
+
+      with dpg.table_row():
+        with dpg.group(horizontal=True):
+          p("label.mezz_cache")
+          p("(?)", color=(150,150,150))
+          with dpg.tooltip(dpg.last_item()):
+            p("tooltip.mezz_cache")
+        with dpg.group(horizontal=True):
+          dpg.add_checkbox(tag="mezz_cache_chk", label=i18n.t("checkbox.mezz_cache"),
+                           default_value=bool(get_state().get("mezzanine_cache", False)), callback=on_mezz_cache_toggle)
+          i18n.bind_label("mezz_cache_chk", "checkbox.mezz_cache")
+          dpg.add_button(label=i18n.t("button.clear_cache"), width=120, tag="btn_clear_mezz_cache",
+                         callback=on_clear_mezz_cache)
+          i18n.bind_label("btn_clear_mezz_cache", "button.clear_cache")
+          p("", tag="mezz_cache_status", color=(150,150,150))
+
+      with dpg.table_row():
+        with dpg.group(horizontal=True):
+          p("label.out_store")
+          p("(?)", color=(150,150,150))
+          with dpg.tooltip(dpg.last_item()):
+            p("tooltip.out_store")
+        with dpg.group(horizontal=True):
+          dpg.add_checkbox(tag="out_store_chk", label=i18n.t("checkbox.out_store"),
+                           default_value=bool(get_state().get("output_store", False)), callback=on_out_store_toggle)
+          i18n.bind_label("out_store_chk", "checkbox.out_store")
+          dpg.add_button(label=i18n.t("button.clear_cache"), width=120, tag="btn_clear_out_store",
+                         callback=on_clear_out_store)
+          i18n.bind_label("btn_clear_out_store", "button.clear_cache")
+          p("", tag="out_store_status", color=(150,150,150))
+
+      with dpg.table_row():
+        with dpg.group(horizontal=True):
+          p("label.extra_outputs")
+          p("(?)", color=(150,150,150))
+          with dpg.tooltip(dpg.last_item()):
+            p("tooltip.extra_outputs")
+        dpg.add_input_text(tag="extra_outputs_input", hint="beatoraja", width=240,
+                           default_value=str(get_state().get("extra_outputs", "")), callback=on_extra_outputs)
+    refresh_mezz_status()
+    refresh_store_status()
+
     dpg.add_separator()
     dpg.add_spacer(height=10)
 
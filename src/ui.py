@@ -1,12 +1,14 @@
 import dearpygui.dearpygui as dpg
+import time
 from src import i18n
 
 from src.cmdline import update_command
 from src.ui_map import bind_ui
 import src.ui_update as ui_update
+import src.ui_dispatch as ui_dispatch
 
 import src.tabs.basic as basic, src.tabs.manual as manual, \
-       src.tabs.settings as settings
+       src.tabs.settings as settings, src.tabs.queue as queue
 
 def init_ui():
   with dpg.window(tag="main",
@@ -15,6 +17,7 @@ def init_ui():
 
     with dpg.tab_bar():
       basic.init()     # 기본 설정 탭
+      queue.init()     # 대기열 탭
       manual.init()    # 직접 설정 탭
       settings.init()  # 환결 설정 탭
 
@@ -27,18 +30,39 @@ def init_ui():
   # apply_lock_pair("buf_input", "buf_display", True)
   update_command()
 
+  # 워커 스레드에서 불리는 함수들: 로그는 저장소(스레드 안전)로, 위젯 조작은 디스패치 큐로
   bind_ui(
     log_append_fn=ui_update.log_append,
     log_clear_fn=ui_update.log_clear,
-    set_progress_fn=ui_update.set_progress,
-    set_service_msg_fn=ui_update.set_service_msg,
-    set_convert_buttons_active_fn=ui_update.set_convert_buttons_active,
+    set_progress_fn=ui_dispatch.deferred(ui_update.set_progress, key="progress"),
+    set_service_msg_fn=ui_dispatch.deferred(ui_update.set_service_msg, key="service_msg"),
+    set_convert_buttons_active_fn=ui_dispatch.deferred(ui_update.set_convert_buttons_active, key="convert_buttons"),
   )
 
+  # 입력이 있으면 렌더 루프가 한동안 쉬지 않도록
+  with dpg.handler_registry():
+    dpg.add_mouse_move_handler(callback=ui_dispatch.mark_active)
+    dpg.add_mouse_click_handler(callback=ui_dispatch.mark_active)
+    dpg.add_mouse_wheel_handler(callback=ui_dispatch.mark_active)
+    dpg.add_key_press_handler(callback=ui_dispatch.mark_active)
+
   # ────────────────────────────── 실행 ──────────────────────────────
   dpg.create_viewport(title=i18n.t("app.title"), width=800, height=860)
   dpg.setup_dearpygui()
   dpg.set_primary_window("main", True)
   dpg.show_viewport()
-  dpg.start_dearpygui()
+  run_render_loop()
   dpg.destroy_context()
+
+ACTIVE_HOLD_SEC = 1.0   # 마지막 입력 후 이 시간 동안은 매 프레임 렌더
+IDLE_FPS = 15           # 변화도 입력도 없을 때의 프레임 수 (post/입력이 오면 바로 깨어남)
+
+def run_render_loop():
+  """dpg.start_dearpygui() 대체: 프레임마다 디스패치 큐와 로그를 반영하고, 한가하면 잔다."""
+  while dpg.is_dearpygui_running():
+    t0 = time.monotonic()
+    changed = ui_dispatch.drain() > 0
+    changed = ui_update.refresh_frame() or changed
+    dpg.render_dearpygui_frame()
+    if not changed and ui_dispatch.idle_for() > ACTIVE_HOLD_SEC:
+      ui_dispatch.wait(max(0.0, 1.0 / IDLE_FPS - (time.monotonic() - t0)))
@@ -2,8 +2,13 @@ import dearpygui.dearpygui as dpg
 
 from src.states import set_state, get_state
 from src.ui_components import apply_lock_pair
-from src.cmdline import update_command, update_estimated_size, is_letterbox_needed
+from src.cmdline import is_letterbox_needed
+from src.ffargs import preset_resolution
 from src import i18n
+import src.muxcache as muxcache
+import src.mezzanine as mezzanine
+import src.outstore as outstore
+from src.util import bytes_to_human
 
 LETTERBOX_MODES = ["black", "solid", "blur"]
 
@@ -136,14 +141,12 @@ def on_letterbox_mode(sender, app_data):
   mode = _label_to_letterbox_mode(str(app_data))
   set_state("letterbox_mode", mode)
   refresh_letterbox_controls()
-  update_command()
 
 def on_letterbox_color(sender, app_data):
   if not isinstance(app_data, (list, tuple)) or len(app_data) < 3:
     return
   color = _sanitize_letterbox_color(app_data)
   set_state("letterbox_color", color)
-  update_command()
 
 def on_letterbox_blur(sender, app_data):
   try:
@@ -154,7 +157,6 @@ def on_letterbox_blur(sender, app_data):
   set_state("letterbox_blur_radius", radius)
   if dpg.does_item_exist("letterbox_blur_slider"):
     dpg.set_value("letterbox_blur_slider", radius)
-  update_command()
 
 def on_letterbox_blur_brightness(sender, app_data):
   try:
@@ -165,62 +167,45 @@ def on_letterbox_blur_brightness(sender, app_data):
   set_state("letterbox_blur_brightness", brightness)
   if dpg.does_item_exist("letterbox_blur_brightness_slider"):
     dpg.set_value("letterbox_blur_brightness_slider", brightness)
-  update_command()
 
 def on_custom_width(sender, app_data):
   set_state("width", int(app_data))
   refresh_letterbox_controls()
-  update_command()
 def on_custom_height(sender, app_data):
   set_state("height", int(app_data))
   refresh_letterbox_controls()
-  update_command()
 
 def on_fps_lock_toggle(sender, app_data):
   locked = dpg.get_value("fps_lock")
-  set_state("fps_locked", locked)
-  if locked:
-    dpg.set_value("fps_input", 30.0)
-    set_state("fps", 30.0)
+  with get_state().batch():
+    set_state("fps_locked", locked)
+    if locked:
+      dpg.set_value("fps_input", 30.0)
+      set_state("fps", 30.0)
   apply_lock_pair("fps_input", "fps_display", locked)
 def on_buffer_lock_toggle(sender, app_data):
   locked = dpg.get_value("buf_lock")
-  set_state("buffer_locked", locked)
-  if locked:
-    dpg.set_value("buf_input", 2900)
-    set_state("buffer_k", 2900)
+  with get_state().batch():
+    set_state("buffer_locked", locked)
+    if locked:
+      dpg.set_value("buf_input", 2900)
+      set_state("buffer_k", 2900)
   apply_lock_pair("buf_input", "buf_display", locked)
 def on_res_preset(sender, app_data):
   preset = app_data
-  set_state("res_preset", preset)
+  state = get_state()
   is_custom = (preset == "Custom")
   apply_lock_pair("w_custom", "w_display", not is_custom)
   apply_lock_pair("h_custom", "h_display", not is_custom)
-  if not is_custom:
-    preset_lower = str(preset).lower()
-    if preset in ("720p", "1080p"):
-      target_h = 720 if preset == "720p" else 1080
-      state = get_state()
-      src_w = int(state.get("source_width", 0) or 0)
-      src_h = int(state.get("source_height", 0) or 0)
-      if src_w > 0 and src_h > 0:
-        aspect = src_w / src_h
-        target_w = int(round(target_h * aspect))
-        if target_w % 2:
-          target_w += 1
-      else:
-        target_w = 1280 if target_h == 720 else 1920
-      w, h = max(1, target_w), target_h
-    else:
-      try:
-        w, h = map(int, preset_lower.split("x"))
-      except Exception:
-        w, h = 512, 512
-    dpg.set_value("w_custom", w); dpg.set_value("h_custom", h)
-    dpg.set_value("w_display", str(w)); dpg.set_value("h_display", str(h))
-    set_state("width", w); set_state("height", h)
+  # 프리셋/가로/세로는 한 번에 바뀐 것으로 알린다 (미리보기 재계산 1회)
+  with state.batch():
+    set_state("res_preset", preset)
+    if not is_custom:
+      w, h = preset_resolution(preset, int(state.get("source_width", 0) or 0), int(state.get("source_height", 0) or 0))
+      dpg.set_value("w_custom", w); dpg.set_value("h_custom", h)
+      dpg.set_value("w_display", str(w)); dpg.set_value("h_display", str(h))
+      set_state("width", w); set_state("height", h)
   refresh_letterbox_controls()
-  update_command()
 
 def _configure_mux_tooltips(disabled: bool):
   if dpg.does_item_exist("tooltip_mux_container"):
@@ -256,8 +241,6 @@ def on_codec_change(sender, app_data):
 
   _configure_mux_tooltips(use_h264)
 
-  update_command()
-
 def _bind_mux_tooltips(mux_key: str, auto_key: str):
   if dpg.does_item_exist("tooltip_mux_text"):
     dpg.set_value("tooltip_mux_text", i18n.t(mux_key))
@@ -272,7 +255,6 @@ def on_float_value(key, item_tag):
     except Exception:
       v = 0
     dpg.set_value(item_tag, v)
-    update_estimated_size()
     set_state(key, v)
   return _cb
 def on_int_value(key, item_tag):
@@ -282,10 +264,50 @@ def on_int_value(key, item_tag):
     except Exception:
       v = 0
     dpg.set_value(item_tag, v)
-    update_estimated_size()
     set_state(key, v)
   return _cb
 
+def on_clear_mux_cache(sender=None, app_data=None, user_data=None):
+  n = muxcache.invalidate()
+  if dpg.does_item_exist("mux_cache_status"):
+    dpg.set_value("mux_cache_status", i18n.t("msg.cache_cleared", n=n))
+
+def refresh_mezz_status():
+  if not dpg.does_item_exist("mezz_cache_status"):
+    return
+  st = mezzanine.stats()
+  dpg.set_value("mezz_cache_status", i18n.t("msg.mezz_stats", entries=st["entries"], size=bytes_to_human(st["bytes"]),
+                                            hits=st["hits"], misses=st["misses"]))
+
+def on_mezz_cache_toggle(sender, app_data):
+  set_state("mezzanine_cache", bool(app_data))
+  refresh_mezz_status()
+
+def on_clear_mezz_cache(sender=None, app_data=None, user_data=None):
+  n = mezzanine.invalidate()
+  if dpg.does_item_exist("mezz_cache_status"):
+    dpg.set_value("mezz_cache_status", i18n.t("msg.cache_cleared", n=n))
+
+def refresh_store_status():
+  if not dpg.does_item_exist("out_store_status"):
+    return
+  st = outstore.stats()
+  dpg.set_value("out_store_status", i18n.t("msg.store_stats", entries=st["entries"], size=bytes_to_human(st["bytes"]),
+                                           hits=st["hits"], saved=bytes_to_human(st["bytes_saved"]),
+                                           cpu=f"{st['cpu_saved'] / 60:.1f}"))
+
+def on_out_store_toggle(sender, app_data):
+  set_state("output_store", bool(app_data))
+  refresh_store_status()
+
+def on_clear_out_store(sender=None, app_data=None, user_data=None):
+  n = outstore.invalidate()
+  if dpg.does_item_exist("out_store_status"):
+    dpg.set_value("out_store_status", i18n.t("msg.cache_cleared", n=n))
+
+def on_extra_outputs(sender, app_data):
+  set_state("extra_outputs", str(app_data or "").strip())
+
 def on_lang_change(sender, app_data, user_data):
   """라디오 버튼 선택 시 언어 변경"""
   # app_data 는 선택된 문자열(예: "한국어")
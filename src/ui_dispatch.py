@@ -0,0 +1,64 @@
+# ui_dispatch.py
+"""
+워커 스레드 → GUI 갱신 디스패치 큐.
+워커는 post()로 호출을 맡기기만 하고, 메인 렌더 루프가 프레임마다 drain()에서 실행한다.
+같은 key로 여러 번 post하면 마지막 것만 남는다 (예: 진행률은 프레임당 한 번만 set_value).
+"""
+import threading, time
+from typing import Any, Callable, Hashable
+
+_lock = threading.Lock()
+_pending: dict[Hashable, tuple[Callable, tuple, dict]] = {}
+_seq = 0
+_wake = threading.Event()
+_last_active = 0.0
+
+def post(fn: Callable, *args, key: Hashable | None = None, **kwargs) -> None:
+  """fn(*args, **kwargs)를 다음 프레임에 메인 스레드에서 실행. key가 같으면 이전 것을 대체한다."""
+  global _seq
+  with _lock:
+    if key is None:
+      _seq += 1
+      key = ("_seq", _seq)
+    else:
+      _pending.pop(key, None)   # 대체된 호출은 순서상 맨 뒤로
+    _pending[key] = (fn, args, kwargs)
+  _wake.set()
+
+def deferred(fn: Callable, key: Hashable | None = None) -> Callable[..., None]:
+  """fn을 post로 감싼 함수 (ui_map 바인딩용)."""
+  def _post(*args: Any, **kwargs: Any) -> None:
+    post(fn, *args, key=key, **kwargs)
+  return _post
+
+def drain() -> int:
+  """쌓인 호출을 실행 (메인 스레드 전용). 실행한 개수."""
+  global _pending
+  _wake.clear()
+  with _lock:
+    if not _pending:
+      return 0
+    batch, _pending = _pending, {}
+  for fn, args, kwargs in batch.values():
+    try:
+      fn(*args, **kwargs)
+    except Exception:
+      pass
+  return len(batch)
+
+def wake() -> None:
+  """화면을 다시 그려야 할 일이 생겼음을 렌더 루프에 알린다 (post 없이)."""
+  _wake.set()
+
+def mark_active(*_args) -> None:
+  """사용자 입력이 있었음. 한동안 렌더 루프가 쉬지 않는다."""
+  global _last_active
+  _last_active = time.monotonic()
+  _wake.set()
+
+def idle_for() -> float:
+  return time.monotonic() - _last_active
+
+def wait(timeout: float) -> None:
+  """post/wake/입력이 오거나 timeout이 지날 때까지 잔다."""
+  _wake.wait(timeout)
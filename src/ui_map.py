@@ -6,7 +6,7 @@ class LogAppendFn(Protocol):
   def __call__(self, msg: str) -> None: ...
 
 class LogClearFn(Protocol):
-  def __call__(self) -> None: ...
+  def __call__(self, job_name: str = "") -> None: ...
 
 class SetProgressFn(Protocol):
   def __call__(self, frac: float) -> None: ...
@@ -20,7 +20,7 @@ class SetConvertButtonsActiveFn(Protocol):
 
 # ── 기본은 no-op (키워드 인수도 안전하게 수용)
 log_append: LogAppendFn = lambda msg: None
-log_clear: LogClearFn = lambda: None
+log_clear: LogClearFn = lambda job_name="": None
 set_progress: SetProgressFn = lambda frac: None
 set_service_msg: SetServiceMsgFn = lambda msg_or_key, **fmt: None
 set_convert_buttons_active: SetConvertButtonsActiveFn = lambda active: None
@@ -1,16 +1,47 @@
 import dearpygui.dearpygui as dpg
-from src.util import nfc
+from typing import Callable
 from src.convert import run_convert, run_convert_custom, cancel_encoding
+from src.logstore import LogStore
+import src.ui_dispatch as ui_dispatch
 from src import i18n
 
-def log_clear():
-  dpg.set_value("ffmpeg_log", "")
-  dpg.set_value("ffmpeg_log2", "")
+# 로그는 저장소에만 쌓고(어느 스레드에서든), 화면은 프레임마다 바뀐 경우에만 다시 그린다
+main_log = LogStore()
+_log_shown = -1
+
+def log_clear(job_name: str = ""):
+  main_log.clear()
+  if job_name:
+    main_log.open_file(job_name)
+  else:
+    main_log.close_file()
+  ui_dispatch.wake()
 def log_append(msg: str, color=None):
-  prev = dpg.get_value("ffmpeg_log") or ""
-  new = prev + (msg.rstrip() + "\n")
-  dpg.set_value("ffmpeg_log", nfc(new))
-  dpg.set_value("ffmpeg_log2", nfc(new))
+  main_log.append(msg)
+  ui_dispatch.wake()
+
+_frame_hooks: list[Callable[[], bool | None]] = []
+def on_frame(fn: Callable[[], bool | None]):
+  """매 프레임 렌더 직전에 호출할 함수 등록 (메인 스레드)."""
+  _frame_hooks.append(fn)
+
+def refresh_frame() -> bool:
+  """화면에 반영할 변화가 있었으면 True. 훅은 다시 그렸을 때 True를 돌려준다."""
+  global _log_shown
+  changed = False
+  if main_log.version != _log_shown:
+    _log_shown = main_log.version
+    txt = main_log.text()
+    for tag in ("ffmpeg_log", "ffmpeg_log2"):
+      if dpg.does_item_exist(tag):
+        dpg.set_value(tag, txt)
+    changed = True
+  for fn in _frame_hooks:
+    try:
+      changed = bool(fn()) or changed
+    except Exception:
+      pass
+  return changed
 def set_progress(frac: float):
   v = max(0.0, min(1.0, float(frac)))
   if dpg.does_item_exist("progress"):
@@ -1,5 +1,5 @@
 import unicodedata
-import secrets, string
+import secrets, string, hashlib, os
 
 _generated_ids = set()
 def random_string(length=9):
@@ -24,4 +24,13 @@ def bytes_to_human(n: int) -> str:
   while s >= 1024.0 and i < len(units) - 1:
     s /= 1024.0
     i += 1
-  return f"{s:.2f} {units[i]}"
\ No newline at end of file
+  return f"{s:.2f} {units[i]}"
+def file_fingerprint(path: str, sample_size: int = 64 * 1024) -> str:
+  """빠른 입력 식별자: 크기 + mtime + 앞/중간/끝 샘플 해시 (전체를 읽지 않음)."""
+  st = os.stat(path)
+  h = hashlib.blake2b(digest_size=16)
+  with open(path, "rb") as f:
+    for off in (0, max(0, st.st_size // 2 - sample_size // 2), max(0, st.st_size - sample_size)):
+      f.seek(off)
+      h.update(f.read(sample_size))
+  return f"{st.st_size}:{st.st_mtime_ns}:{h.hexdigest()}"